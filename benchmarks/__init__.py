@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks dos scanners de memoria (rodam sem o client.exe)
+"""
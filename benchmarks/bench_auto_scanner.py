@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: AutoScanner._scan_for_hp_candidates - leituras vivas vs buffer
+
+Caminho antigo: para cada inteiro no range de HP, _validate_player_struct
+faz 4 leituras no processo. Caminho novo: as 12 regras sao avaliadas no
+proprio buffer (vector_scanner.scan_hp_candidates) e so os sobreviventes
+sao confirmados com leituras vivas.
+
+Roda os dois caminhos sobre um heap sintetico (dump), com HP/MP conhecidos
+e no modo sem valores (range 50-500000), e reporta tempo, MB/s, leituras
+no processo e se os candidatos sao identicos.
+
+O caminho antigo no modo range e muito lento, entao ele roda sobre uma
+amostra (--legacy-sample-mb) e o tempo e extrapolado.
+
+Uso:
+    python -m benchmarks.bench_auto_scanner --size-mb 256
+"""
+
+import argparse
+import os
+import struct
+import tempfile
+import time
+
+from benchmarks.synthetic_heap import SyntheticHeap, PLAYER
+from memory.auto_scanner import AutoScanner
+from memory.sources import DumpFileSource
+
+
+class CountingSource(DumpFileSource):
+    """
+    Dump que conta as leituras (cada read_bytes/read_into seria uma
+    ReadProcessMemory no processo vivo)
+    """
+
+    reads = 0
+
+    def read_bytes(self, address, size):
+        self.reads += 1
+        return super().read_bytes(address, size)
+
+    def read_into(self, address, buffer):
+        self.reads += 1
+        return super().read_into(address, buffer)
+
+
+def legacy_scan(scanner, regions, min_hp=50, max_hp=500000, expected_hp=None, expected_mp=None):
+    """Loop original do _scan_for_hp_candidates (validacao com leituras vivas)"""
+    if expected_hp is not None:
+        min_hp = max_hp = expected_hp
+
+    candidates = []
+    for base, size in regions:
+        try:
+            data = scanner.source.read_bytes(base, size)
+        except Exception:
+            continue
+
+        for offset in range(0, len(data) - 4, 4):
+            value = struct.unpack('<i', data[offset:offset + 4])[0]
+            if min_hp <= value <= max_hp:
+                addr = base + offset
+                if scanner._validate_player_struct(addr, expected_hp, expected_mp):
+                    candidates.append(addr)
+    return candidates
+
+
+def run(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=256, help='tamanho do heap sintetico')
+    parser.add_argument('--region-mb', type=int, default=16, help='tamanho de cada regiao')
+    parser.add_argument('--legacy-sample-mb', type=int, default=16,
+                        help='MB escaneados pelo caminho antigo no modo range (0 = heap inteiro)')
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    heap = SyntheticHeap(args.size_mb, args.region_mb, seed=args.seed)
+    total_mb = heap.total_size / 1024 / 1024
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'heap.dmp')
+        print(f"Gravando heap sintetico: {total_mb:.0f} MB em {heap.region_count} regioes...")
+        heap.write_dump(path)
+
+        source = CountingSource(path)
+        scanner = AutoScanner(source=source)
+        regions = scanner._get_memory_regions()
+
+        sample = regions
+        if args.legacy_sample_mb:
+            sample = regions[:max(1, args.legacy_sample_mb // args.region_mb)]
+
+        modes = [
+            ('HP/MP conhecidos', {'expected_hp': PLAYER['hp'], 'expected_mp': PLAYER['mp']}, regions),
+            ('range 50-500000', {}, sample),
+        ]
+
+        try:
+            for label, kwargs, legacy_regions in modes:
+                legacy_mb = sum(size for _, size in legacy_regions) / 1024 / 1024
+
+                source.reads = 0
+                old, old_time = run(lambda: legacy_scan(scanner, legacy_regions, **kwargs))
+                old_reads = source.reads
+
+                # Mesma amostra para conferir que os candidatos sao identicos
+                scanner._get_memory_regions = lambda heap_only=True: legacy_regions
+                source.reads = 0
+                same_set, _ = run(lambda: scanner._scan_for_hp_candidates(**kwargs))
+                same_reads = source.reads
+
+                del scanner._get_memory_regions
+                source.reads = 0
+                new, new_time = run(lambda: scanner._scan_for_hp_candidates(**kwargs))
+                new_reads = source.reads
+
+                old_total = old_time * total_mb / legacy_mb
+                print()
+                print(f"[{label}]")
+                print(f"  antigo: {old_time:8.2f}s  {legacy_mb / old_time:8.1f} MB/s  "
+                      f"{old_reads} leituras em {legacy_mb:.0f} MB  {len(old)} candidatos"
+                      + (f"  (~{old_total:.1f}s para {total_mb:.0f} MB)" if legacy_mb != total_mb else ""))
+                print(f"  buffer: {new_time:8.2f}s  {total_mb / new_time:8.1f} MB/s  "
+                      f"{new_reads} leituras em {total_mb:.0f} MB  {len(new)} candidatos  "
+                      f"player={'OK' if heap.player_addr in new else 'NAO ENCONTRADO'}")
+                print(f"  speedup: {old_total / new_time:.1f}x  |  leituras na amostra: "
+                      f"{old_reads} -> {same_reads}  |  candidatos identicos: "
+                      f"{'SIM' if same_set == old else 'NAO'}")
+        finally:
+            source.close()
+
+
+if __name__ == '__main__':
+    main()
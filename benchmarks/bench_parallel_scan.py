@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: ParallelScanner - escalabilidade por numero de nucleos
+
+Grava um heap sintetico como dump (DumpFileSource), e roda a busca do
+player (mesmo kernel do SmartScanner.find_player_auto) e a busca de valor
+exato (AdvancedScanner.scan_all_memory) com 1, 2, 4, ... workers, em
+threads e em processos. Reporta tempo, MB/s e speedup sobre 1 worker, e
+confere que os resultados sao identicos aos da varredura sequencial.
+
+Uso:
+    python -m benchmarks.bench_parallel_scan --size-mb 1024
+    python -m benchmarks.bench_parallel_scan --workers 1 2 4 8 --modes thread
+"""
+
+import argparse
+import os
+import struct
+import tempfile
+import time
+from functools import partial
+
+from benchmarks.synthetic_heap import SyntheticHeap, PLAYER
+from memory.parallel_scan import ParallelScanner, find_bytes
+from memory.sources import DumpFileSource
+from memory.vector_scanner import STRUCT_SPAN, player_kernel
+
+
+def core_counts():
+    """1, 2, 4, ... ate os nucleos da maquina"""
+    cpus = os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < cpus:
+        counts.append(n)
+        n *= 2
+    counts.append(cpus)
+    return counts
+
+
+def run(source, regions, kernel, overlap, workers, mode):
+    scheduler = ParallelScanner(source, workers=workers, mode=mode)
+    start = time.perf_counter()
+    results = scheduler.scan(regions, kernel, overlap=overlap)
+    return results, time.perf_counter() - start, scheduler.last_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=1024, help='tamanho do heap sintetico')
+    parser.add_argument('--region-mb', type=int, default=16, help='tamanho de cada regiao')
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help='numeros de workers (padrao: 1, 2, 4... ate os nucleos)')
+    parser.add_argument('--modes', nargs='+', default=['thread', 'process'],
+                        choices=['thread', 'process'])
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    heap = SyntheticHeap(args.size_mb, args.region_mb, seed=args.seed)
+    total_mb = heap.total_size / 1024 / 1024
+    counts = args.workers or core_counts()
+
+    kernels = [
+        ('player', player_kernel(), STRUCT_SPAN),
+        ('valor', partial(find_bytes, needle=struct.pack('<i', PLAYER['mp_max'])), 3),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'heap.dmp')
+        print(f"Gravando heap sintetico: {total_mb:.0f} MB em {heap.region_count} regioes...")
+        heap.write_dump(path)
+
+        source = DumpFileSource(path)
+        regions = [(r.base, r.size) for r in source.regions()]
+        print(f"Nucleos da maquina: {os.cpu_count()}")
+
+        try:
+            for name, kernel, overlap in kernels:
+                # Referencia: varredura sequencial regiao por regiao
+                reference = []
+                start = time.perf_counter()
+                for base, size in regions:
+                    reference.extend(kernel(source.read_bytes(base, size), base))
+                seq_time = time.perf_counter() - start
+
+                print()
+                print(f"[{name.upper()}] sequencial: {seq_time:7.2f}s  "
+                      f"{total_mb / seq_time:8.1f} MB/s  {len(reference)} resultados")
+
+                for mode in args.modes:
+                    base_time = None
+                    for workers in counts:
+                        results, elapsed, stats = run(source, regions, kernel, overlap, workers, mode)
+                        base_time = base_time or elapsed
+                        same = 'SIM' if results == reference else 'NAO'
+                        print(f"  {mode:7s} {workers:3d} workers: {elapsed:7.2f}s  "
+                              f"{total_mb / elapsed:8.1f} MB/s  speedup {base_time / elapsed:5.2f}x  "
+                              f"({stats['units']} unidades, identico: {same})")
+        finally:
+            source.close()
+
+
+if __name__ == '__main__':
+    main()
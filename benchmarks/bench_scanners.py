@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: todos os scanners de memory/ sobre o mesmo heap sintetico
+
+Grava um heap sintetico como dump (DumpFileSource) com decoys e UMA
+estrutura real do player (HP / +0x8 / +0x620 / +0x628) e roda cada scanner
+em um processo separado (pico de RSS isolado):
+
+    smart          SmartScanner.find_player_auto
+    v3             smart_scanner_v3.find_player_v3
+    auto           AutoScanner._scan_for_hp_candidates (HP/MP conhecidos)
+    pattern        PatternScanner.find_with_values (HP/MP conhecidos)
+    pattern_sig    PatternScanner.find_by_pattern (padrao criado do player)
+    pattern_v2     PatternScanner.find_by_pattern (player_pattern.json
+                   distribuido, ponteiros de outra sessao: variante mascarada)
+    advanced       AdvancedScanner.scan_all_memory (valor exato do HP)
+    pointer        PointerScanner.scan_for_pointers (ponteiro plantado)
+
+Para cada um reporta tempo, MB/s, candidatos, falsos positivos, se o
+player (ou o ponteiro) esta entre os candidatos, se a resposta final do
+scanner e o player e o pico de RSS. --json grava os resultados e
+--compare confere contra um JSON anterior (regressao = codigo de saida 1).
+
+Uso:
+    python -m benchmarks.bench_scanners --size-mb 256 --json bench.json
+    python -m benchmarks.bench_scanners --scanners smart v3 --compare bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from benchmarks.synthetic_heap import SyntheticHeap, PLAYER, POINTER_DELTA, PATTERN_FILE
+
+
+# Formato do JSON (incrementar se os campos mudarem)
+RESULTS_VERSION = 1
+
+# Queda de MB/s considerada regressao no --compare
+DEFAULT_TOLERANCE = 0.10
+
+
+def peak_rss_mb():
+    """
+    Pico de RSS deste processo (MB) ou None se a plataforma nao informa.
+    Workers de processo (AdvancedScanner) nao entram na conta.
+    """
+    # Linux: VmHWM zera no exec (ru_maxrss herda o pico do processo pai)
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    except Exception:
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS informa em bytes, os outros em KB
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
+
+
+# ============================================
+# CASOS (cada um devolve candidatos e a resposta final)
+# ============================================
+
+def case_smart(source, truth):
+    from memory.smart_scanner import SmartScanner
+    scanner = SmartScanner(source=source)
+    best = scanner.find_player_auto(progress_callback=lambda pct, msg: None)
+    return [c['addr'] for c in scanner.last_candidates], best and best['addr']
+
+
+def case_v3(source, truth):
+    from smart_scanner_v3 import find_player_v3
+    ranked = find_player_v3(source)
+    return [c['addr'] for c in ranked], ranked[0]['addr'] if ranked else None
+
+
+def case_auto(source, truth):
+    from memory.auto_scanner import AutoScanner
+    scanner = AutoScanner(source=source)
+    found = scanner._scan_for_hp_candidates(expected_hp=PLAYER['hp'], expected_mp=PLAYER['mp'])
+    return found, found[0] if found else None
+
+
+def case_pattern(source, truth):
+    from memory.pattern_scanner import PatternScanner
+    scanner = PatternScanner(source=source)
+    best = scanner.find_with_values(PLAYER['hp'], PLAYER['mp'])
+    return scanner.last_candidates, best and best['hp']
+
+
+def setup_pattern_sig(source, truth):
+    from memory.pattern_scanner import PatternScanner
+    scanner = PatternScanner(source=source)
+    return scanner, scanner.create_pattern_from_address(truth['player_addr'])
+
+
+def case_pattern_sig(source, truth, prepared):
+    scanner, pattern = prepared
+    best = scanner.find_by_pattern(pattern)
+    return scanner.last_candidates, best and best['hp']
+
+
+def setup_pattern_v2(source, truth):
+    from memory.pattern_scanner import PatternScanner
+    with open(PATTERN_FILE) as f:
+        return PatternScanner(source=source), json.load(f)
+
+
+def case_advanced(source, truth):
+    from memory.scanner_advanced import AdvancedScanner
+    scanner = AdvancedScanner(source=source)
+    found = scanner.scan_all_memory(PLAYER['hp'])
+    return found, None
+
+
+def case_pointer(source, truth):
+    from memory.pointer_scanner import PointerScanner
+    scanner = PointerScanner(source=source)
+    found = scanner.scan_for_pointers(truth['player_addr'])
+    return found, None
+
+
+# nome -> (caso, preparacao fora do tempo medido, resultado esperado)
+CASES = {
+    'smart': (case_smart, None, 'player_addr'),
+    'v3': (case_v3, None, 'player_addr'),
+    'auto': (case_auto, None, 'player_addr'),
+    'pattern': (case_pattern, None, 'player_addr'),
+    'pattern_sig': (case_pattern_sig, setup_pattern_sig, 'player_addr'),
+    'pattern_v2': (case_pattern_sig, setup_pattern_v2, 'player_addr'),
+    'advanced': (case_advanced, None, 'player_addr'),
+    'pointer': (case_pointer, None, 'pointer'),
+}
+
+
+def run_case(name, dump_path, truth, verbose=False):
+    """
+    Roda um caso e devolve o dict de resultados (executado em um processo
+    novo, assim o pico de RSS e so deste scanner).
+    """
+    from memory.sources import DumpFileSource
+
+    func, setup, expected_key = CASES[name]
+    expected = truth[expected_key]
+    if expected_key == 'pointer':
+        expected = tuple(expected)
+
+    source = DumpFileSource(dump_path)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    try:
+        with output:
+            prepared = setup(source, truth) if setup else None
+            rss_before = peak_rss_mb()
+
+            start = time.perf_counter()
+            if setup:
+                candidates, answer = func(source, truth, prepared)
+            else:
+                candidates, answer = func(source, truth)
+            elapsed = time.perf_counter() - start
+
+            rss_after = peak_rss_mb()
+    finally:
+        source.close()
+
+    candidates = [tuple(c) if isinstance(c, (list, tuple)) else c for c in candidates]
+    hit = expected in candidates
+    total_mb = truth['total_size'] / 1024 / 1024
+
+    return {
+        'name': name,
+        'seconds': elapsed,
+        'mb_per_s': total_mb / elapsed if elapsed else None,
+        'candidates': len(candidates),
+        'false_positives': len(candidates) - (1 if hit else 0),
+        'hit': hit,
+        'top': None if answer is None and name in ('advanced', 'pointer') else answer == expected,
+        'peak_rss_mb': rss_after,
+        'scan_rss_mb': None if rss_after is None or rss_before is None else rss_after - rss_before,
+    }
+
+
+# ============================================
+# RELATORIO
+# ============================================
+
+def git_revision():
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def format_row(r):
+    def yes_no(value):
+        return '-' if value is None else ('SIM' if value else 'NAO')
+
+    rss = '-' if r['peak_rss_mb'] is None else f"{r['peak_rss_mb']:.0f}"
+    return (f"{r['name']:12s} {r['seconds']:8.2f}s {r['mb_per_s']:9.1f} MB/s "
+            f"{r['candidates']:7d} {r['false_positives']:7d}   "
+            f"{yes_no(r['hit']):5s} {yes_no(r['top']):5s} {rss:>7s}")
+
+
+def compare(results, previous, tolerance):
+    """
+    Compara com um JSON anterior. Regressao: MB/s caiu mais que
+    tolerance, mais falsos positivos, ou o player deixou de ser achado.
+    """
+    old = {r['name']: r for r in previous.get('results', [])}
+    regressions = []
+
+    print()
+    print(f"Comparando com {previous.get('git') or '?'} ({previous.get('timestamp', '?')}):")
+
+    for r in results:
+        before = old.get(r['name'])
+        if not before:
+            continue
+
+        notes = []
+        if before.get('mb_per_s') and r['mb_per_s']:
+            change = r['mb_per_s'] / before['mb_per_s'] - 1
+            notes.append(f"{change * 100:+.1f}% MB/s")
+            if change < -tolerance:
+                regressions.append(f"{r['name']}: MB/s {before['mb_per_s']:.1f} -> {r['mb_per_s']:.1f}")
+        if r['false_positives'] > before.get('false_positives', 0):
+            regressions.append(f"{r['name']}: falsos positivos "
+                               f"{before['false_positives']} -> {r['false_positives']}")
+        if before.get('hit') and not r['hit']:
+            regressions.append(f"{r['name']}: player nao encontrado")
+        if before.get('top') and r['top'] is False:
+            regressions.append(f"{r['name']}: player deixou de ser a resposta")
+
+        print(f"  {r['name']:12s} {', '.join(notes)}")
+
+    for line in regressions:
+        print(f"  [REGRESSAO] {line}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=256, help='tamanho do heap sintetico')
+    parser.add_argument('--region-mb', type=int, default=16, help='tamanho de cada regiao')
+    parser.add_argument('--regions', type=int, default=None,
+                        help='numero de regioes (padrao: size-mb / region-mb)')
+    parser.add_argument('--decoys', type=int, default=64, help='decoys por regiao')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--scanners', nargs='+', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--json', help='grava os resultados neste arquivo')
+    parser.add_argument('--compare', help='JSON de uma execucao anterior')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='queda de MB/s tolerada no --compare (0.10 = 10%%)')
+    parser.add_argument('--inline', action='store_true',
+                        help='roda tudo neste processo (RSS acumulado)')
+    parser.add_argument('--verbose', action='store_true', help='mostra a saida dos scanners')
+    args = parser.parse_args()
+
+    heap = SyntheticHeap(args.size_mb, args.region_mb, args.decoys, args.seed,
+                         region_count=args.regions)
+    total_mb = heap.total_size / 1024 / 1024
+    truth = {
+        'player_addr': heap.player_addr,
+        'pointer': (heap.pointer_addr, POINTER_DELTA),
+        'total_size': heap.total_size,
+    }
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'heap.dmp')
+        print(f"Gravando heap sintetico: {total_mb:.0f} MB em {heap.region_count} regioes "
+              f"({args.decoys} decoys/regiao)...")
+        heap.write_dump(path)
+        print(f"Player em {hex(heap.player_addr)}, ponteiro em {hex(heap.pointer_addr)}")
+        print()
+        print(f"{'scanner':12s} {'tempo':>9s} {'MB/s':>14s} {'cand.':>7s} {'falsos':>7s}   "
+              f"{'achou':5s} {'topo':5s} {'RSS MB':>7s}")
+
+        for name in args.scanners:
+            if args.inline:
+                result = run_case(name, path, truth, args.verbose)
+            else:
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    result = pool.submit(run_case, name, path, truth, args.verbose).result()
+            results.append(result)
+            print(format_row(result))
+
+    report = {
+        'version': RESULTS_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'heap': {
+            'size_mb': total_mb,
+            'region_mb': args.region_mb,
+            'regions': heap.region_count,
+            'decoys_per_region': args.decoys,
+            'seed': args.seed,
+            'player_addr': heap.player_addr,
+        },
+        'results': results,
+    }
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResultados gravados em {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if previous.get('heap', {}).get('size_mb') != total_mb:
+            print("[AVISO] Heap de tamanho diferente da execucao anterior")
+        if compare(results, previous, args.tolerance):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
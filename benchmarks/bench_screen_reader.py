@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: ScreenReader - amostras, bissecao e captura da barra inteira
+
+Le as duas barras de cada frame de um corpus (benchmarks/synthetic_bars.py;
+por padrao gerado num diretorio temporario, ou --corpus com capturas
+reais) e compara, para cada caminho, tempo por leitura, leituras de pixel
+por barra e erro contra o preenchimento real:
+
+    sampled   30 amostras com get_pixel_color (aqui lendo do frame, sem o
+              custo do GetDC/GetPixel/ReleaseDC de cada pixel no Windows)
+    bisect    borda do trecho cheio por bissecao (get_pixel_color)
+    capture   ImageCapture -> uma captura + linha inteira classificada
+
+e o BarLocator: barras achadas no recorte == retangulos do corpus.
+
+Uso:
+    python -m benchmarks.bench_screen_reader --frames 101
+    python -m benchmarks.bench_screen_reader --corpus capturas/
+"""
+
+import argparse
+import tempfile
+import time
+
+from benchmarks.synthetic_bars import bar_endpoints, load_corpus, write_corpus
+from screen.bar_locator import BarLocator
+from screen.capture import ImageCapture
+from screen.screen_reader import ScreenReader
+
+
+def make_reader(capture, entry, probe_mode='bisect'):
+    reader = ScreenReader(capture=capture)
+    reader.probe_mode = probe_mode
+    reader.set_hp_bar(*bar_endpoints(entry["hp_bar"]))
+    reader.set_mp_bar(*bar_endpoints(entry["mp_bar"]))
+    reader._update_interval = 0
+    return reader
+
+
+def read_probed(reader, frame):
+    """Caminhos sem captura: cada pixel via get_pixel_color"""
+    probes = [0]
+
+    def pixel(x, y):
+        probes[0] += 1
+        return frame.pixel(x, y)
+
+    reader.get_pixel_color = pixel
+    reader._last_update = 0
+    reader.update()
+    return reader._hp_percent, reader._mp_percent, probes[0]
+
+
+def read_capture(reader, frame):
+    reader._last_update = 0
+    reader.update()
+    return reader._hp_percent, reader._mp_percent, 0
+
+
+def truth(filled, width):
+    """Percentual que uma leitura exata (por pixel) deve devolver"""
+    return int(filled * 100 / width)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', help='diretorio com corpus.json (padrao: sintetico)')
+    parser.add_argument('--frames', type=int, default=101, help='frames do corpus sintetico')
+    parser.add_argument('--repeat', type=int, default=20, help='leituras por frame')
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    if args.corpus:
+        entries = load_corpus(args.corpus)
+    else:
+        directory = tempfile.mkdtemp(prefix="bars_")
+        write_corpus(directory, args.frames, args.seed)
+        entries = load_corpus(directory)
+
+    paths = ('sampled', 'bisect', 'capture')
+    located = 0
+    locate_seconds = 0.0
+    results = {name: {'seconds': 0.0, 'error': 0, 'exact': 0, 'probes': 0} for name in paths}
+
+    for entry in entries:
+        capture = ImageCapture.from_file(entry["path"], entry["width"], entry["height"],
+                                         entry["left"], entry["top"])
+        expected = (truth(entry["hp_filled"], entry["hp_bar"][2]),
+                    truth(entry["mp_filled"], entry["mp_bar"][2]))
+
+        readers = {
+            'sampled': (read_probed, make_reader(None, entry, 'sampled')),
+            'bisect': (read_probed, make_reader(None, entry, 'bisect')),
+            'capture': (read_capture, make_reader(capture, entry)),
+        }
+        for name, (func, reader) in readers.items():
+            reader.capture = capture if name == 'capture' else None
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                hp, mp, probes = func(reader, capture.frame)
+            result = results[name]
+            result['seconds'] += (time.perf_counter() - start) / args.repeat
+            result['probes'] += probes
+            error = max(abs(hp - expected[0]), abs(mp - expected[1]))
+            result['error'] = max(result['error'], error)
+            result['exact'] += error == 0
+
+        locator = BarLocator(readers['capture'][1].color_table)
+        start = time.perf_counter()
+        bars = locator.locate(capture.frame)
+        locate_seconds += time.perf_counter() - start
+        # Barra vazia (0%) nao tem como ser achada
+        located += ((bars['hp'] == tuple(entry["hp_bar"]) or not entry["hp_filled"]) and
+                    (bars['mp'] == tuple(entry["mp_bar"]) or not entry["mp_filled"]))
+
+    count = len(entries)
+    print(f"{count} frames")
+    print(f"{'caminho':10} {'ms/leitura':>11} {'pixels/barra':>13} {'erro max (%)':>13} {'exatos':>8}")
+    for name, result in results.items():
+        print(f"{name:10} {result['seconds'] * 1000 / count:11.3f} "
+              f"{result['probes'] / count / 2:13.1f} {result['error']:13d} "
+              f"{result['exact']:5d}/{count}")
+    print(f"locator: {located}/{count} frames com as barras certas, "
+          f"{locate_seconds * 1000 / count:.2f} ms/frame")
+
+
+if __name__ == '__main__':
+    main()
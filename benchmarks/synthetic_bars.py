@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de frames sinteticos do client com as barras de HP/MP
+
+Cada frame imita a area do client: fundo com textura (mapa, sidebar) e
+as duas barras empilhadas, com borda escura, trecho vazio quase preto e
+trecho cheio com a cor da faixa de vida (verde, amarelo, laranja,
+vermelho) ou de mana (azul), com um leve degrade vertical.
+
+write_corpus grava recortes desses frames + o preenchimento real de cada
+barra (corpus.json), o mesmo formato usado para capturas reais.
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+# Retangulos das barras no frame padrao: (x, y, largura, altura)
+HP_BAR = (1630, 48, 94, 11)
+MP_BAR = (1630, 62, 94, 11)
+
+FRAME_SIZE = (1920, 1080)
+
+# Cor cheia por faixa de HP (percentual minimo, RGB)
+HP_COLORS = [
+    (92, (0, 192, 0)),
+    (60, (96, 192, 96)),
+    (30, (192, 192, 0)),
+    (10, (192, 96, 0)),
+    (4, (192, 48, 48)),
+    (0, (160, 0, 0)),
+]
+
+MP_COLOR = (70, 70, 220)
+
+EMPTY_COLOR = (36, 36, 36)
+BORDER_COLOR = (16, 16, 16)
+
+
+def hp_color(percent):
+    """Cor da barra de HP para o percentual"""
+    for minimum, color in HP_COLORS:
+        if percent >= minimum:
+            return color
+    return HP_COLORS[-1][1]
+
+
+def filled_pixels(percent, width):
+    """Pixels cheios de uma barra de `width` pixels no percentual dado"""
+    return int(round(percent * width / 100))
+
+
+def draw_bar(frame, rect, percent, color, rng=None):
+    """Desenha uma barra (borda de 1 pixel, vazio + trecho cheio)"""
+    x, y, width, height = rect
+    frame[y - 1:y + height + 1, x - 1:x + width + 1] = BORDER_COLOR
+    frame[y:y + height, x:x + width] = EMPTY_COLOR
+
+    filled = filled_pixels(percent, width)
+    if filled:
+        # Degrade vertical: mais claro no meio da barra
+        shade = 1.0 - 0.25 * np.abs(np.linspace(-1, 1, height))
+        fill = (np.array(color, dtype=np.float32)[None, :] * shade[:, None])
+        fill = np.clip(fill, 0, 255).astype(np.uint8)
+        frame[y:y + height, x:x + filled] = fill[:, None, :]
+
+    if rng is not None:
+        # Ruido de compressao / escala do client
+        noise = rng.integers(-3, 4, size=(height, width, 3))
+        area = frame[y:y + height, x:x + width].astype(np.int16) + noise
+        frame[y:y + height, x:x + width] = np.clip(area, 0, 255).astype(np.uint8)
+
+
+def render_frame(hp_percent, mp_percent, size=FRAME_SIZE, hp_rect=HP_BAR, mp_rect=MP_BAR,
+                 seed=None):
+    """
+    Frame (altura, largura, 3) RGB com as duas barras.
+    seed: textura/ruido reproduziveis (None = sem ruido, fundo liso)
+    """
+    width, height = size
+    rng = np.random.default_rng(seed) if seed is not None else None
+
+    if rng is None:
+        frame = np.full((height, width, 3), 60, dtype=np.uint8)
+    else:
+        # Textura grossa (blocos de 32 px, como tiles do mapa)
+        tiles = rng.integers(0, 256, size=((height + 31) // 32, (width + 31) // 32, 3),
+                             dtype=np.uint8)
+        frame = np.repeat(np.repeat(tiles, 32, axis=0), 32, axis=1)[:height, :width].copy()
+
+    draw_bar(frame, hp_rect, hp_percent, hp_color(hp_percent), rng)
+    draw_bar(frame, mp_rect, mp_percent, MP_COLOR, rng)
+    return frame
+
+
+def bar_endpoints(rect):
+    """(inicio, fim) no formato do ScreenReader.set_hp_bar (linha do meio)"""
+    x, y, width, height = rect
+    middle = y + height // 2
+    return (x, middle), (x + width - 1, middle)
+
+
+# ============================================
+# CORPUS EM DISCO
+# ============================================
+
+CORPUS_INDEX = "corpus.json"
+
+
+def write_corpus(directory, count=101, seed=1234, margin=24):
+    """
+    Grava um corpus de recortes (barras + margem de fundo) como RGB cru
+    e o indice corpus.json com o preenchimento real de cada barra.
+
+    Capturas reais podem entrar no mesmo indice (PNG, com Pillow):
+        {"file", "width", "height", "left", "top",
+         "hp_bar": [x, y, w, h], "mp_bar": [...], "hp_filled", "mp_filled"}
+    """
+    os.makedirs(directory, exist_ok=True)
+    left = min(HP_BAR[0], MP_BAR[0]) - margin
+    top = min(HP_BAR[1], MP_BAR[1]) - margin
+    right = max(HP_BAR[0] + HP_BAR[2], MP_BAR[0] + MP_BAR[2]) + margin
+    bottom = max(HP_BAR[1] + HP_BAR[3], MP_BAR[1] + MP_BAR[3]) + margin
+
+    entries = []
+    for i in range(count):
+        hp = i * 100 // max(1, count - 1)
+        mp = (100 - hp + 37 * i) % 101
+        frame = render_frame(hp, mp, seed=seed + i)[top:bottom, left:right]
+
+        name = f"bars_{i:03d}.rgb"
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(np.ascontiguousarray(frame).tobytes())
+
+        entries.append({
+            "file": name,
+            "width": right - left,
+            "height": bottom - top,
+            "left": left,
+            "top": top,
+            "hp_bar": list(HP_BAR),
+            "mp_bar": list(MP_BAR),
+            "hp_filled": filled_pixels(hp, HP_BAR[2]),
+            "mp_filled": filled_pixels(mp, MP_BAR[2]),
+        })
+
+    with open(os.path.join(directory, CORPUS_INDEX), 'w') as f:
+        json.dump(entries, f, indent=1)
+    return entries
+
+
+def load_corpus(directory):
+    """Le o indice corpus.json -> lista de entradas (caminho absoluto em 'path')"""
+    with open(os.path.join(directory, CORPUS_INDEX)) as f:
+        entries = json.load(f)
+    for entry in entries:
+        entry["path"] = os.path.join(directory, entry["file"])
+    return entries
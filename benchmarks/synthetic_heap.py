@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de heaps sinteticos para benchmarks dos scanners
+
+Cada regiao imita o heap do client.exe: muitos zeros, inteiros pequenos,
+ponteiros de 64 bits e alguns "decoys" (HP == HP_MAX com MP/level
+plausiveis ou quase plausiveis). Uma unica regiao recebe a estrutura
+real do player com o layout HP / +0x8 HP_MAX / +0x620 MP / +0x628 MP_MAX,
+e outra regiao recebe um ponteiro de 64 bits para ela (PointerScanner).
+
+Em volta do player ficam as amostras do player_pattern.json distribuido
+com o bot, com os ponteiros deslocados como em outra sessao do client:
+o padrao exato nao bate mais, so a variante mascarada (pointer_masked).
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from memory.vector_scanner import (
+    OFFSET_HP_MAX, OFFSET_MP, OFFSET_MP_MAX, OFFSET_LEVEL, STRUCT_SPAN
+)
+
+# Base do heap sintetico (acima de 4GB, como no client real)
+HEAP_BASE = 0x1E900000000
+
+# Player "real" plantado no heap
+PLAYER = {
+    'hp': 3320,
+    'hp_max': 3320,
+    'mp': 17710,
+    'mp_max': 18900,
+    'level': 412,
+}
+
+# O ponteiro plantado aponta para o inicio do objeto, antes do HP
+# (PointerScanner.scan_for_pointers deve devolver este offset)
+POINTER_DELTA = 0x28
+
+# Padrao exato (versao 2) distribuido com o bot
+PATTERN_FILE = os.path.join(os.path.dirname(__file__), "..", "player_pattern.json")
+
+# Deslocamento dos ponteiros do padrao (heap em outro lugar nesta "sessao")
+SESSION_DELTA = 0x2350000
+
+
+def fill_region(rng, size):
+    """
+    Gera o conteudo de uma regiao (bytearray) com distribuicao parecida
+    com a de um heap real.
+    """
+    words = np.zeros(size // 4, dtype='<i4')
+    kind = rng.random(words.size, dtype=np.float32)
+
+    # ~30% inteiros pequenos (contadores, ids, HPs de criaturas...)
+    small = kind < 0.30
+    words[small] = rng.integers(0, 40000, small.sum(), dtype=np.int32)
+
+    # ~15% lixo aleatorio (ponteiros, floats, flags)
+    noise = (kind >= 0.30) & (kind < 0.45)
+    words[noise] = rng.integers(-2**31, 2**31 - 1, noise.sum(), dtype=np.int32)
+
+    return bytearray(words.tobytes())
+
+
+def plant_struct(buf, offset, hp, hp_max, mp, mp_max, level):
+    """Escreve uma estrutura de player no buffer (offset relativo ao HP)"""
+    words = np.frombuffer(buf, dtype='<i4')
+    i = offset // 4
+    words[i] = hp
+    words[i + OFFSET_HP_MAX // 4] = hp_max
+    words[i + OFFSET_LEVEL // 4] = level
+    words[i + OFFSET_MP // 4] = mp
+    words[i + OFFSET_MP_MAX // 4] = mp_max
+
+
+def pattern_samples(path=PATTERN_FILE):
+    """
+    Amostras do padrao como (offset relativo ao HP, bytes), com os qwords
+    que parecem ponteiros deslocados de SESSION_DELTA. [] sem o arquivo.
+    """
+    from memory.multi_pattern import mask_pointers, sample_values
+
+    try:
+        with open(path) as f:
+            pattern_data = json.load(f)
+    except (OSError, ValueError):
+        return []
+
+    samples = []
+    for sample in pattern_data.get("samples", []):
+        values = sample_values(sample)
+        if None in values:
+            continue
+        data = bytearray(values)
+        masked = mask_pointers(values, sample["offset"])
+        for i in range(0, len(values) - 7, 8):
+            if masked[i] is None:
+                pointer = int.from_bytes(data[i:i + 8], 'little') + SESSION_DELTA
+                data[i:i + 8] = pointer.to_bytes(8, 'little')
+        samples.append((sample["offset"], bytes(data)))
+    return samples
+
+
+def plant_decoys(rng, buf, count):
+    """
+    Planta estruturas falsas que passam em parte dos criterios:
+    HP == HP_MAX com MP_MAX suspeito, level fora do range, MP > MP_MAX...
+    e algumas que passam em todos (falsos positivos, como no heap real).
+    """
+    limit = len(buf) - STRUCT_SPAN - 8
+    for _ in range(count):
+        offset = int(rng.integers(0, limit // 8)) * 8
+        hp = int(rng.integers(150, 30000))
+        kind = int(rng.integers(0, 5))
+        if kind == 0:
+            plant_struct(buf, offset, hp, hp, 100, 4096, 50)
+        elif kind == 1:
+            plant_struct(buf, offset, hp, hp, 500, 900, 5000)
+        elif kind == 2:
+            plant_struct(buf, offset, hp, hp, 2000, 1000, 80)
+        elif kind == 3:
+            plant_struct(buf, offset, hp, hp, 0, hp, hp)
+        else:
+            # Passa em todos os criterios, mas com score menor que o do
+            # player (MP_MAX < HP_MAX): falso positivo que nao empata
+            mp_max = hp - 37
+            plant_struct(buf, offset, hp, hp, mp_max // 2, mp_max, 1 + hp % 1999)
+
+
+class SyntheticHeap:
+    """
+    Heap sintetico de tamanho configuravel.
+
+    As regioes sao geradas uma a uma (mesma seed = mesmo conteudo), entao
+    heaps de varios GB nao precisam ficar inteiros na RAM.
+    """
+
+    def __init__(self, size_mb=256, region_mb=16, decoys_per_region=64, seed=1234,
+                 region_count=None):
+        """
+        region_count: numero de regioes (padrao: size_mb / region_mb)
+        """
+        self.region_size = region_mb * 1024 * 1024
+        self.region_count = region_count or max(1, (size_mb * 1024 * 1024) // self.region_size)
+        self.decoys_per_region = decoys_per_region
+        self.seed = seed
+
+        # Player fica no meio da regiao central
+        self.player_region = self.region_count // 2
+        self.player_offset = (self.region_size // 2) & ~7
+        self.player_addr = self.region_base(self.player_region) + self.player_offset
+
+        # Ponteiro para o player no inicio da primeira regiao
+        self.pointer_region = 0
+        self.pointer_offset = 0x100
+        self.pointer_addr = self.region_base(self.pointer_region) + self.pointer_offset
+
+    @property
+    def total_size(self):
+        return self.region_count * self.region_size
+
+    def region_base(self, index):
+        """Endereco base da regiao (com um gap de 64KB entre regioes)"""
+        return HEAP_BASE + index * (self.region_size + 0x10000)
+
+    def regions(self, limit=None):
+        """Gera (base, data) para cada regiao do heap"""
+        rng = np.random.default_rng(self.seed)
+        count = self.region_count if limit is None else min(limit, self.region_count)
+
+        for i in range(count):
+            data = fill_region(rng, self.region_size)
+            plant_decoys(rng, data, self.decoys_per_region)
+
+            if i == self.player_region:
+                for offset, sample in pattern_samples():
+                    start = self.player_offset + offset
+                    data[start:start + len(sample)] = sample
+                plant_struct(data, self.player_offset, PLAYER['hp'], PLAYER['hp_max'],
+                             PLAYER['mp'], PLAYER['mp_max'], PLAYER['level'])
+
+            if i == self.pointer_region:
+                struct.pack_into('<Q', data, self.pointer_offset, self.player_addr - POINTER_DELTA)
+
+            yield self.region_base(i), data
+
+    def write_dump(self, path):
+        """
+        Grava o heap como dump (memory.sources.DumpFileSource), para
+        benchmarks que precisam de um MemorySource real.
+        """
+        from memory.sources import (MemoryRegion, write_dump,
+                                    MEM_COMMIT, MEM_PRIVATE, PAGE_READWRITE)
+
+        def regions():
+            for base, data in self.regions():
+                yield MemoryRegion(base, len(data), base, MEM_COMMIT,
+                                   PAGE_READWRITE, MEM_PRIVATE), data
+
+        return write_dump(path, regions())
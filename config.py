@@ -83,5 +83,18 @@ HOTKEYS = {
 TIMERS = {
     "main_loop": 50,             # Loop principal (50ms - mais rapido)
     "healing_cooldown": 150,     # Cooldown minimo entre curas (150ms)
-    "memory_read": 30,           # Intervalo de leitura de memoria
+    "memory_read": 30,           # Intervalo de leitura de memoria (inicial)
+    "state_bus": 5,              # PlayerStateBus: intervalo minimo (5ms, apos mudanca)
+}
+
+# Intervalo adaptativo de leitura (memory/adaptive_poll.py)
+# Aperta para min_interval quando HP/MP mudam e cresce x backoff
+# a cada leitura sem mudanca, ate max_interval
+ADAPTIVE_POLLING = {
+    "min_interval": 10,          # Apos mudanca de HP/MP (10ms)
+    "max_interval": 250,         # Valores estaveis (ex: parado em PZ)
+    "backoff": 1.5,              # Multiplicador por leitura sem mudanca
+    "pause_when_minimized": True,  # Nao le com o client minimizado
+    "pause_check": 500,          # Re-verifica janela/conexao quando pausado
+    "state_bus_max_interval": 40,  # Teto do PlayerStateBus (healing reage em ate 40ms)
 }
@@ -5,10 +5,11 @@ O ponteiro pode apontar para o inicio de uma estrutura maior
 """
 import pymem
 import struct
-import ctypes
-from ctypes import wintypes
+
+from memory.sources import PymemSource
 
 pm = pymem.Pymem('client.exe')
+source = PymemSource(pm)
 
 PLAYER_ADDR = 0x1e9edc87d70
 base_addr = pm.base_address
@@ -30,16 +31,8 @@ MEM_COMMIT = 0x1000
 PAGE_READWRITE = 0x04
 PAGE_READONLY = 0x02
 
-class MBI(ctypes.Structure):
-    _fields_ = [
-        ('BaseAddress', ctypes.c_void_p),
-        ('AllocationBase', ctypes.c_void_p),
-        ('AllocationProtect', wintypes.DWORD),
-        ('RegionSize', ctypes.c_size_t),
-        ('State', wintypes.DWORD),
-        ('Protect', wintypes.DWORD),
-        ('Type', wintypes.DWORD),
-    ]
+# Enumera as regioes UMA vez (todos os targets reutilizam o mesmo mapa)
+rmap = source.region_map
 
 # Buscar ponteiros para cada possivel base
 print(f'\n=== BUSCANDO PONTEIROS ===')
@@ -48,35 +41,24 @@ for target in possible_bases:
     target_bytes = struct.pack('<Q', target)
     pointers = []
     
-    address = base_addr  # Comecar do modulo client.exe
-    mbi = MBI()
-    
     # Buscar apenas no modulo client.exe e areas estaticas
-    while address < base_addr + 0x10000000:  # ~256MB
-        result = ctypes.windll.kernel32.VirtualQueryEx(
-            pm.process_handle, ctypes.c_void_p(address),
-            ctypes.byref(mbi), ctypes.sizeof(mbi))
-        if result == 0:
-            break
-        
-        if mbi.State == MEM_COMMIT:
-            if mbi.RegionSize and mbi.RegionSize < 50*1024*1024:
+    for region in rmap.regions(base_addr, base_addr + 0x10000000):  # ~256MB
+        if region.state == MEM_COMMIT:
+            if region.size and region.size < 50*1024*1024:
                 try:
-                    data = pm.read_bytes(mbi.BaseAddress, mbi.RegionSize)
+                    data = pm.read_bytes(region.base, region.size)
                     pos = 0
                     while True:
                         pos = data.find(target_bytes, pos)
                         if pos == -1:
                             break
-                        ptr_addr = mbi.BaseAddress + pos
+                        ptr_addr = region.base + pos
                         rel = ptr_addr - base_addr
                         if 0 < rel < 0x2000000:  # Dentro do modulo
                             pointers.append((ptr_addr, rel))
                         pos += 8
                 except:
                     pass
-        
-        address = (mbi.BaseAddress or 0) + (mbi.RegionSize or 0x10000)
     
     if pointers:
         offset = PLAYER_ADDR - target
@@ -91,31 +73,20 @@ for target in possible_bases[:5]:
     target_bytes = struct.pack('<Q', target)
     pointers = []
     
-    address = 0x100000000  # Heap
-    mbi = MBI()
-    
-    while address < 0x300000000:
-        result = ctypes.windll.kernel32.VirtualQueryEx(
-            pm.process_handle, ctypes.c_void_p(address),
-            ctypes.byref(mbi), ctypes.sizeof(mbi))
-        if result == 0:
-            break
-        
-        if mbi.State == MEM_COMMIT and mbi.Protect == PAGE_READWRITE:
-            if mbi.RegionSize and mbi.RegionSize < 50*1024*1024:
+    for region in rmap.regions(0x100000000, 0x300000000):  # Heap
+        if region.state == MEM_COMMIT and region.protect == PAGE_READWRITE:
+            if region.size and region.size < 50*1024*1024:
                 try:
-                    data = pm.read_bytes(mbi.BaseAddress, mbi.RegionSize)
+                    data = pm.read_bytes(region.base, region.size)
                     pos = 0
                     while True:
                         pos = data.find(target_bytes, pos)
                         if pos == -1:
                             break
-                        pointers.append(mbi.BaseAddress + pos)
+                        pointers.append(region.base + pos)
                         pos += 8
                 except:
                     pass
-        
-        address = (mbi.BaseAddress or 0) + (mbi.RegionSize or 0x10000)
     
     if pointers:
         offset = PLAYER_ADDR - target
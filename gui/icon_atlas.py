@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Icon Atlas - Icones pre-redimensionados em uma unica imagem por tamanho
+
+O IconManager abria cada PNG e fazia um resize LANCZOS no primeiro uso;
+a lista de healing, o seletor de spells e o menu pedem dezenas de icones
+em varios tamanhos, e a janela demorava para abrir.
+
+O IconAtlas:
+1. Na primeira vez, redimensiona todos os icones conhecidos para um
+   tamanho e cola em uma grade (um PNG por tamanho: icon_cache/icons_32.png)
+2. Grava um indice (icons_32.json) com a posicao de cada icone e o
+   mtime/tamanho de cada arquivo de origem
+3. Nas proximas, se nenhum arquivo de origem mudou (so os.stat, sem abrir),
+   carrega o PNG inteiro uma vez e recorta os PhotoImage dele no proprio Tk
+   (image copy -from), sem I/O nem resample por icone
+
+Um arquivo novo ou alterado (mtime) reconstroi o atlas daquele tamanho.
+"""
+
+import json
+import math
+import os
+
+from PIL import Image, ImageTk
+import tkinter as tk
+
+
+ATLAS_VERSION = 1
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "icon_cache")
+
+
+def _source_key(path):
+    """Identidade do arquivo de origem: [mtime_ns, tamanho] ou None se nao existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class IconAtlas:
+    """
+    Uso:
+        atlas = IconAtlas.load_or_build(ICONS_PATH, filenames, 32)
+        if atlas and "Mana_Potion.png" in atlas:
+            photo = atlas.photo("Mana_Potion.png")
+    """
+
+    def __init__(self, image, size, slots):
+        """
+        image: atlas RGBA (PIL), icones de size x size em grade
+        slots: filename -> posicao na grade
+        """
+        self.image = image
+        self.size = size
+        self.slots = slots
+        self.columns = max(1, image.width // size)
+        self._sheet = None
+
+    def __contains__(self, filename):
+        return filename in self.slots
+
+    def __len__(self):
+        return len(self.slots)
+
+    def box(self, filename):
+        """(x1, y1, x2, y2) do icone no atlas"""
+        row, column = divmod(self.slots[filename], self.columns)
+        x, y = column * self.size, row * self.size
+        return (x, y, x + self.size, y + self.size)
+
+    def crop(self, filename):
+        """Icone como imagem PIL"""
+        return self.image.crop(self.box(filename))
+
+    def photo(self, filename):
+        """
+        Icone como PhotoImage: recorte feito pelo Tk a partir do atlas
+        inteiro (convertido para PhotoImage uma unica vez)
+        """
+        if self._sheet is None:
+            self._sheet = ImageTk.PhotoImage(self.image)
+
+        x1, y1, x2, y2 = self.box(filename)
+        photo = tk.PhotoImage(width=self.size, height=self.size)
+        photo.tk.call(photo, 'copy', self._sheet, '-from', x1, y1, x2, y2, '-to', 0, 0)
+        return photo
+
+    # ============================================
+    # CONSTRUCAO / CACHE
+    # ============================================
+
+    @staticmethod
+    def paths(size, cache_dir=CACHE_DIR):
+        """(PNG do atlas, indice JSON) de um tamanho"""
+        return (os.path.join(cache_dir, f"icons_{size}.png"),
+                os.path.join(cache_dir, f"icons_{size}.json"))
+
+    @classmethod
+    def build(cls, icons_path, filenames, size):
+        """
+        Redimensiona os icones e monta o atlas.
+        Retorna (atlas, sources) com sources: filename -> _source_key
+        (arquivos que nao existem ficam de fora do atlas)
+        """
+        sources = {}
+        images = []
+        for filename in sorted(set(filenames)):
+            path = os.path.join(icons_path, filename)
+            sources[filename] = _source_key(path)
+            if sources[filename] is None:
+                continue
+            try:
+                with Image.open(path) as img:
+                    icon = img.convert("RGBA").resize((size, size), Image.Resampling.LANCZOS)
+            except Exception as e:
+                print(f"Erro ao carregar {filename}: {e}")
+                sources[filename] = None
+                continue
+            images.append((filename, icon))
+
+        columns = max(1, math.ceil(math.sqrt(len(images))))
+        rows = max(1, math.ceil(len(images) / columns))
+        sheet = Image.new("RGBA", (columns * size, rows * size), (0, 0, 0, 0))
+
+        slots = {}
+        for index, (filename, icon) in enumerate(images):
+            row, column = divmod(index, columns)
+            sheet.paste(icon, (column * size, row * size))
+            slots[filename] = index
+
+        return cls(sheet, size, slots), sources
+
+    def save(self, icons_path, sources, cache_dir=CACHE_DIR):
+        """Grava o PNG do atlas e o indice"""
+        os.makedirs(cache_dir, exist_ok=True)
+        image_path, index_path = self.paths(self.size, cache_dir)
+
+        self.image.save(image_path)
+        with open(index_path, 'w') as f:
+            json.dump({
+                "version": ATLAS_VERSION,
+                "icons_path": os.path.abspath(icons_path),
+                "size": self.size,
+                "columns": self.columns,
+                "slots": self.slots,
+                "sources": sources,
+            }, f, indent=1)
+
+    @classmethod
+    def load(cls, icons_path, filenames, size, cache_dir=CACHE_DIR):
+        """Atlas do cache, ou None se nao existe ou algum arquivo mudou"""
+        image_path, index_path = cls.paths(size, cache_dir)
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if index.get("version") != ATLAS_VERSION or index.get("size") != size:
+            return None
+        if index.get("icons_path") != os.path.abspath(icons_path):
+            return None
+
+        # Mesmo conjunto de icones e nenhum arquivo alterado
+        sources = index.get("sources", {})
+        if set(sources) != set(filenames):
+            return None
+        for filename, key in sources.items():
+            if _source_key(os.path.join(icons_path, filename)) != key:
+                return None
+
+        try:
+            with Image.open(image_path) as img:
+                image = img.convert("RGBA")
+        except Exception:
+            return None
+
+        atlas = cls(image, size, index.get("slots", {}))
+        if atlas.columns != index.get("columns"):
+            return None
+        return atlas
+
+    @classmethod
+    def load_or_build(cls, icons_path, filenames, size, cache_dir=CACHE_DIR):
+        """Atlas do cache ou reconstruido (None se nenhum icone existe)"""
+        atlas = cls.load(icons_path, filenames, size, cache_dir)
+        if atlas is not None:
+            return atlas
+
+        atlas, sources = cls.build(icons_path, filenames, size)
+        if not len(atlas):
+            return None
+
+        try:
+            atlas.save(icons_path, sources, cache_dir)
+        except OSError as e:
+            print(f"Erro ao gravar o atlas de icones: {e}")
+        return atlas
@@ -16,6 +16,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from memory.reader_v2 import TibiaMemoryReader
 from modules.healing_v2 import HealingModuleV2
+from memory.player_state import PlayerStateBus
+from gui.icon_atlas import IconAtlas
 
 
 # Caminho dos ícones
@@ -110,6 +112,12 @@ MENU_ICONS = {
 }
 
 
+# Ícones que vão para o atlas (um PNG por tamanho, ver gui/icon_atlas.py)
+ATLAS_ICONS = sorted(set(SPELL_TO_ICON.values()) | set(MENU_ICONS.values()) | {
+    "Category_Potions.png",
+})
+
+
 class IconManager:
     """Gerencia carregamento de ícones"""
     
@@ -118,6 +126,19 @@ class IconManager:
         self.size = size
         self.cache = {}
         self.default_icon = None
+        
+        # Atlas por tamanho (None = sem ícones / atlas indisponível)
+        self.atlases = {}
+    
+    def _get_atlas(self, size):
+        """Atlas do tamanho (carregado do cache ou montado na primeira vez)"""
+        if size not in self.atlases:
+            try:
+                self.atlases[size] = IconAtlas.load_or_build(self.icons_path, ATLAS_ICONS, size)
+            except Exception as e:
+                print(f"Erro no atlas de ícones ({size}px): {e}")
+                self.atlases[size] = None
+        return self.atlases[size]
     
     def get_icon(self, filename, size=None):
         """Carrega e retorna um ícone"""
@@ -129,6 +150,16 @@ class IconManager:
         if cache_key in self.cache:
             return self.cache[cache_key]
         
+        # Ícone conhecido: recorte do atlas (sem abrir o PNG nem redimensionar)
+        atlas = self._get_atlas(size) if filename in ATLAS_ICONS else None
+        if atlas is not None and filename in atlas:
+            try:
+                photo = atlas.photo(filename)
+                self.cache[cache_key] = photo
+                return photo
+            except Exception as e:
+                print(f"Erro ao recortar {filename} do atlas: {e}")
+        
         filepath = os.path.join(self.icons_path, filename)
         
         try:
@@ -181,6 +212,7 @@ class BotWindowWithIcons:
     def __init__(self):
         # Componentes
         self.memory = TibiaMemoryReader()
+        self.state_bus = PlayerStateBus(self.memory)  # Leitor unico (GUI + healing)
         self.healing = None
         
         # Estado
@@ -1255,7 +1287,7 @@ class BotWindowWithIcons:
             # Verifica se offsets são válidos
             if self.memory._verify_offsets():
                 # Cache válido, conecta direto
-                self.healing = HealingModuleV2(self.memory)
+                self.healing = HealingModuleV2(self.memory, state_bus=self.state_bus)
                 self.healing.find_tibia_window()
                 self._on_connect_success()
             else:
@@ -1483,7 +1515,7 @@ class BotWindowWithIcons:
             pass
         
         # Configura healing após scan bem sucedido
-        self.healing = HealingModuleV2(self.memory)
+        self.healing = HealingModuleV2(self.memory, state_bus=self.state_bus)
         self.healing.find_tibia_window()
         
         self.connect_btn.configure(state='normal', text="Reconnect")
@@ -1515,11 +1547,15 @@ class BotWindowWithIcons:
     
     def _update_loop(self):
         """Loop de update"""
+        seq = None
         while self.running:
             try:
-                if self.memory and self.memory.is_connected() and self.memory.has_offsets():
-                    hp_pct = self.memory.get_player_hp_percent()
-                    mp_pct = self.memory.get_player_mp_percent()
+                # Ultimo snapshot do PlayerStateBus (sem leitura de memoria)
+                state = self.state_bus.latest
+                if state.seq != seq and state.valid:
+                    seq = state.seq
+                    hp_pct = state.hp_percent
+                    mp_pct = state.mp_percent
                     
                     self.hp_bar['value'] = hp_pct
                     self.hp_label.configure(text=f"{hp_pct}%")
@@ -1533,6 +1569,7 @@ class BotWindowWithIcons:
     
     def _start_update_thread(self):
         """Inicia thread"""
+        self.state_bus.start()
         thread = threading.Thread(target=self._update_loop, daemon=True)
         thread.start()
     
@@ -1544,6 +1581,8 @@ class BotWindowWithIcons:
         if self.healing:
             self.healing.stop_loop()
         
+        self.state_bus.stop()
+        
         if self.memory:
             self.memory.disconnect()
         
@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from memory.reader_v2 import TibiaMemoryReader
 from modules.healing_v2 import HealingModuleV2
+from memory.player_state import PlayerStateBus
 
 
 # Mapeamento de spells para ícones (emoji/unicode)
@@ -122,6 +123,7 @@ class ModernBotWindow:
     def __init__(self):
         # Componentes
         self.memory = TibiaMemoryReader()
+        self.state_bus = PlayerStateBus(self.memory)  # Leitor unico (GUI + healing)
         self.healing = None
         
         # Estado
@@ -740,7 +742,7 @@ class ModernBotWindow:
     def _on_connect(self):
         """Conecta ao Tibia"""
         if self.memory.connect():
-            self.healing = HealingModuleV2(self.memory)
+            self.healing = HealingModuleV2(self.memory, state_bus=self.state_bus)
             self.healing.find_tibia_window()
             
             self.status_label.configure(text="🟢 Connected", fg=self.colors['btn_green'])
@@ -767,11 +769,15 @@ class ModernBotWindow:
     
     def _update_loop(self):
         """Loop de update"""
+        seq = None
         while self.running:
             try:
-                if self.memory and self.memory.is_connected() and self.memory.has_offsets():
-                    hp_pct = self.memory.get_player_hp_percent()
-                    mp_pct = self.memory.get_player_mp_percent()
+                # Ultimo snapshot do PlayerStateBus (sem leitura de memoria)
+                state = self.state_bus.latest
+                if state.seq != seq and state.valid:
+                    seq = state.seq
+                    hp_pct = state.hp_percent
+                    mp_pct = state.mp_percent
                     
                     self.hp_bar['value'] = hp_pct
                     self.hp_label.configure(text=f"{hp_pct}%")
@@ -785,6 +791,7 @@ class ModernBotWindow:
     
     def _start_update_thread(self):
         """Inicia thread"""
+        self.state_bus.start()
         thread = threading.Thread(target=self._update_loop, daemon=True)
         thread.start()
     
@@ -796,6 +803,8 @@ class ModernBotWindow:
         if self.healing:
             self.healing.stop_loop()
         
+        self.state_bus.stop()
+        
         if self.memory:
             self.memory.disconnect()
         
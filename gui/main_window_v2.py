@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from memory.reader_v2 import TibiaMemoryReader
 from modules.healing_v2 import HealingModuleV2
+from memory.player_state import PlayerStateBus
 
 
 class BotWindowV2:
@@ -26,6 +27,7 @@ class BotWindowV2:
     def __init__(self):
         # Componentes
         self.memory = TibiaMemoryReader()
+        self.state_bus = PlayerStateBus(self.memory)  # Leitor unico (GUI + healing)
         self.healing = None  # Criado apos conectar
         
         # Estado
@@ -305,7 +307,7 @@ class BotWindowV2:
             self.connect_btn.configure(text="Reconectar")
             
             # Cria modulo de healing
-            self.healing = HealingModuleV2(self.memory)
+            self.healing = HealingModuleV2(self.memory, state_bus=self.state_bus)
             self.healing.find_tibia_window()
             
             # Configura callback de cura
@@ -438,23 +440,24 @@ class BotWindowV2:
         """
         Loop de atualizacao da interface
         """
+        seq = None
         while self.running:
             try:
-                if self.memory and self.memory.is_connected() and self.memory.has_offsets():
-                    # Le HP
-                    hp = self.memory.get_player_hp()
-                    hp_max = self.memory.get_player_hp_max()
-                    hp_pct = self.memory.get_player_hp_percent()
+                # Ultimo snapshot do PlayerStateBus (sem leitura de memoria)
+                state = self.state_bus.latest
+                if state.seq != seq and state.valid:
+                    seq = state.seq
                     
-                    self.hp_label.configure(text=f"{hp} / {hp_max} ({hp_pct}%)")
+                    # HP
+                    hp_pct = state.hp_percent
+                    
+                    self.hp_label.configure(text=f"{state.hp} / {state.hp_max} ({hp_pct}%)")
                     self.hp_bar['value'] = hp_pct
                     
-                    # Le MP
-                    mp = self.memory.get_player_mp()
-                    mp_max = self.memory.get_player_mp_max()
-                    mp_pct = self.memory.get_player_mp_percent()
+                    # MP
+                    mp_pct = state.mp_percent
                     
-                    self.mp_label.configure(text=f"{mp} / {mp_max} ({mp_pct}%)")
+                    self.mp_label.configure(text=f"{state.mp} / {state.mp_max} ({mp_pct}%)")
                     self.mp_bar['value'] = mp_pct
                     
             except Exception as e:
@@ -466,6 +469,7 @@ class BotWindowV2:
         """
         Inicia thread de update
         """
+        self.state_bus.start()
         self._update_thread = threading.Thread(target=self._update_loop, daemon=True)
         self._update_thread.start()
     
@@ -479,6 +483,8 @@ class BotWindowV2:
         if self.healing:
             self.healing.stop_loop()
         
+        self.state_bus.stop()
+        
         if self.memory:
             self.memory.disconnect()
         
@@ -14,6 +14,8 @@ import ctypes
 import ctypes.wintypes as wintypes
 from pathlib import Path
 
+from memory.adaptive_poll import AdaptivePoller
+
 # Constantes Windows
 PROCESS_ALL_ACCESS = 0x1F0FFF
 PROCESS_VM_READ = 0x0010
@@ -51,6 +53,9 @@ class AutoInjector:
         self._mp_max = 0
         self._last_read = 0
         
+        # Intervalo de leitura adaptativo (config.ADAPTIVE_POLLING)
+        self._poller = AdaptivePoller("INJECTOR")
+        
         # Caminho da DLL
         self.dll_path = self._find_dll()
         
@@ -237,10 +242,12 @@ class AutoInjector:
         Atualiza dados do player
         """
         now = time.time()
-        if now - self._last_read < 0.05:  # 50ms
+        if not self._poller.due(now):
             return
         self._last_read = now
         
+        start = self._poller.begin()
+        
         # Tenta shared memory primeiro
         if self.shared_data:
             try:
@@ -248,6 +255,7 @@ class AutoInjector:
                 data = self.shared_data.read(32)
                 if len(data) >= 16:
                     self._hp, self._hp_max, self._mp, self._mp_max = struct.unpack('<IIII', data[:16])
+                    self._poller.observe((self._hp, self._hp_max, self._mp, self._mp_max), start)
                     return
             except:
                 self.shared_data = None
@@ -257,7 +265,17 @@ class AutoInjector:
             self.connect_shared_memory()
         
         # Fallback para arquivo
-        self.read_from_file()
+        if self.read_from_file():
+            self._poller.observe((self._hp, self._hp_max, self._mp, self._mp_max), start)
+        else:
+            # Sem dados da DLL: so tenta de novo a cada pause_check
+            self._poller.pause("desconectado")
+    
+    def get_poll_stats(self, reset=False):
+        """
+        Taxa efetiva de leitura e custo de CPU (ver AdaptivePoller.stats)
+        """
+        return self._poller.stats(reset)
     
     @property
     def hp(self):
@@ -364,7 +382,8 @@ if __name__ == "__main__":
         try:
             while True:
                 print(f"\rHP: {injector.hp:>5}/{injector.hp_max:<5} ({injector.hp_percent:>3}%) | "
-                      f"MP: {injector.mp:>5}/{injector.mp_max:<5} ({injector.mp_percent:>3}%)", end='')
+                      f"MP: {injector.mp:>5}/{injector.mp_max:<5} ({injector.mp_percent:>3}%) | "
+                      f"{injector._poller.format_stats()}   ", end='')
                 time.sleep(0.1)
         except KeyboardInterrupt:
             print("\n\nFinalizado!")
@@ -13,6 +13,8 @@ import struct
 import mmap
 from pathlib import Path
 
+from memory.adaptive_poll import AdaptivePoller
+
 # Constantes Windows
 PROCESS_ALL_ACCESS = 0x1F0FFF
 MEM_COMMIT = 0x1000
@@ -40,6 +42,9 @@ class BotBridge:
         self._last_update = 0
         self._connected = False
         
+        # Intervalo de leitura adaptativo (config.ADAPTIVE_POLLING)
+        self._poller = AdaptivePoller("BRIDGE")
+        
     def connect(self):
         """
         Conecta ao shared memory ou arquivo de dados
@@ -67,10 +72,11 @@ class BotBridge:
         Atualiza dados do player
         """
         now = time.time()
-        if now - self._last_update < 0.05:  # 50ms
+        if not self._poller.due(now):
             return
         self._last_update = now
         
+        start = self._poller.begin()
         data = None
         
         # Le de shared memory
@@ -94,8 +100,19 @@ class BotBridge:
             try:
                 self._hp, self._hp_max, self._mp, self._mp_max = struct.unpack('<IIII', data[:16])
                 self._connected = True
+                self._poller.observe((self._hp, self._hp_max, self._mp, self._mp_max), start)
+                return
             except:
                 pass
+        
+        # Sem dados da DLL: so tenta de novo a cada pause_check
+        self._poller.pause("desconectado")
+    
+    def get_poll_stats(self, reset=False):
+        """
+        Taxa efetiva de leitura e custo de CPU (ver AdaptivePoller.stats)
+        """
+        return self._poller.stats(reset)
     
     @property
     def hp(self):
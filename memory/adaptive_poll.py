@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive Poll - Intervalo de leitura que se adapta a volatilidade do HP
+
+Os readers (SmartMemoryReader, BotBridge, AutoInjector) limitavam as
+leituras com constantes fixas (30-50ms): parado em protection zone o bot
+gastava a mesma CPU que em uma hunt.
+
+O AdaptivePoller:
+1. Volta para o intervalo minimo assim que os valores mudam
+2. Aumenta o intervalo exponencialmente enquanto ficam estaveis
+3. Pausa as leituras com o client minimizado ou desconectado
+   (so re-verifica a cada pause_check)
+4. Mede a taxa efetiva de amostragem e o custo de CPU das leituras
+
+Configuracao em config.ADAPTIVE_POLLING.
+"""
+
+import time
+
+try:
+    import win32gui
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
+try:
+    from config import ADAPTIVE_POLLING, TIMERS
+except ImportError:
+    ADAPTIVE_POLLING = {}
+    TIMERS = {}
+
+
+def _setting(key, default):
+    return ADAPTIVE_POLLING.get(key, default)
+
+
+def find_client_window(title="Tibia"):
+    """Handle da janela do client (None se nao encontrada)"""
+    if not WIN32_AVAILABLE:
+        return None
+
+    result = []
+
+    def callback(hwnd, _):
+        if win32gui.IsWindowVisible(hwnd):
+            text = win32gui.GetWindowText(hwnd)
+            if title in text and "Bot" not in text:
+                result.append(hwnd)
+                return False
+        return True
+
+    try:
+        win32gui.EnumWindows(callback, None)
+    except:
+        pass
+
+    return result[0] if result else None
+
+
+class AdaptivePoller:
+    """
+    Decide quando um reader deve realmente ler a memoria.
+
+    Uso (dentro de update()):
+        if not self._poller.due():
+            return
+        start = self._poller.begin()
+        ... le os valores ...
+        self._poller.observe((hp, hp_max, mp, mp_max), start)
+    """
+
+    def __init__(self, name="POLL", min_interval=None, base_interval=None,
+                 max_interval=None, backoff=None, watch_window=None):
+        """
+        Intervalos em segundos (padrao: config.ADAPTIVE_POLLING / TIMERS)
+        watch_window: pausa com o client minimizado
+        """
+        self.name = name
+        self.min_interval = min_interval or _setting("min_interval", 10) / 1000.0
+        self.base_interval = base_interval or TIMERS.get("memory_read", 30) / 1000.0
+        self.max_interval = max_interval or _setting("max_interval", 250) / 1000.0
+        self.backoff = backoff or _setting("backoff", 1.5)
+        self.pause_check = _setting("pause_check", 500) / 1000.0
+        if watch_window is None:
+            watch_window = _setting("pause_when_minimized", True)
+        self.watch_window = watch_window and WIN32_AVAILABLE
+
+        self.interval = self.base_interval
+        self.paused = None  # None, "minimizado" ou "desconectado"
+
+        self._last_poll = 0
+        self._last_values = None
+        self._hwnd = None
+        self._last_window_check = 0
+
+        # Estatisticas (janela corrente)
+        self._stats_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._samples = 0
+        self._read_time = 0.0
+
+    # ============================================
+    # DECISAO
+    # ============================================
+
+    def due(self, now=None):
+        """True se ja esta na hora de ler (e o client esta visivel)"""
+        now = time.time() if now is None else now
+
+        wait = self.pause_check if self.paused else self.interval
+        if now - self._last_poll < wait:
+            return False
+        self._last_poll = now
+
+        if self.watch_window and now - self._last_window_check >= self.pause_check:
+            self._last_window_check = now
+            if self._window_minimized():
+                self.pause("minimizado")
+                return False
+            if self.paused == "minimizado":
+                self.resume()
+
+        return self.paused != "minimizado"
+
+    def remaining(self, now=None):
+        """Segundos ate o proximo due() poder ler (0 se ja esta na hora)"""
+        now = time.time() if now is None else now
+        wait = self.pause_check if self.paused else self.interval
+        return max(0.0, wait - (now - self._last_poll))
+
+    def begin(self):
+        """Marca o inicio de uma leitura (para medir o custo)"""
+        return time.perf_counter()
+
+    def observe(self, values, start=None):
+        """
+        Registra os valores lidos: mudou -> intervalo minimo,
+        estavel -> backoff exponencial ate max_interval
+        """
+        if start is not None:
+            self._read_time += time.perf_counter() - start
+        self._samples += 1
+
+        if self.paused == "desconectado":
+            self.resume()
+
+        if values != self._last_values:
+            self._last_values = values
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def pause(self, reason="desconectado"):
+        """Para de ler ate resume() (due() so re-verifica a cada pause_check)"""
+        if self.paused != reason:
+            self.paused = reason
+            print(f"[{self.name}] Leituras pausadas ({reason})")
+
+    def resume(self):
+        if self.paused:
+            print(f"[{self.name}] Leituras retomadas")
+        self.paused = None
+        self.interval = self.base_interval
+
+    def _window_minimized(self):
+        try:
+            if not self._hwnd or not win32gui.IsWindow(self._hwnd):
+                self._hwnd = find_client_window()
+            return bool(self._hwnd) and bool(win32gui.IsIconic(self._hwnd))
+        except:
+            return False
+
+    # ============================================
+    # ESTATISTICAS
+    # ============================================
+
+    def stats(self, reset=False):
+        """
+        Retorna dict com:
+            rate_hz: leituras por segundo efetivas
+            interval_ms: intervalo atual
+            read_ms_per_s: tempo gasto lendo por segundo (custo das leituras)
+            cpu_percent: CPU do processo inteiro no periodo
+            paused: motivo da pausa ou None
+        """
+        elapsed = max(1e-6, time.perf_counter() - self._stats_start)
+        cpu = time.process_time() - self._cpu_start
+
+        result = {
+            "rate_hz": self._samples / elapsed,
+            "interval_ms": self.interval * 1000,
+            "read_ms_per_s": self._read_time * 1000 / elapsed,
+            "cpu_percent": 100 * cpu / elapsed,
+            "paused": self.paused,
+        }
+
+        if reset:
+            self._stats_start = time.perf_counter()
+            self._cpu_start = time.process_time()
+            self._samples = 0
+            self._read_time = 0.0
+
+        return result
+
+    def format_stats(self, reset=False):
+        s = self.stats(reset)
+        state = f" [pausado: {s['paused']}]" if s['paused'] else ""
+        return (f"{s['rate_hz']:.1f} leituras/s, intervalo {s['interval_ms']:.0f}ms, "
+                f"leitura {s['read_ms_per_s']:.2f}ms/s, CPU {s['cpu_percent']:.1f}%{state}")
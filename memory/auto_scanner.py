@@ -9,8 +9,6 @@ Offsets confirmados para Tibia 15.11 (BaiakZika):
 - MP_MAX = HP + 0x628
 """
 
-import ctypes
-from ctypes import wintypes
 import struct
 import time
 import json
@@ -23,6 +21,10 @@ try:
 except ImportError:
     PYMEM_AVAILABLE = False
 
+from memory.sources import PymemSource
+from memory.stream_reader import StreamReader
+from memory.vector_scanner import STRUCT_SPAN, validate_player_values, hp_candidates_kernel
+
 
 # Windows API
 MEM_COMMIT = 0x1000
@@ -32,18 +34,6 @@ PAGE_EXECUTE_READ = 0x20
 PAGE_EXECUTE_READWRITE = 0x40
 
 
-class MEMORY_BASIC_INFORMATION(ctypes.Structure):
-    _fields_ = [
-        ("BaseAddress", ctypes.c_void_p),
-        ("AllocationBase", ctypes.c_void_p),
-        ("AllocationProtect", wintypes.DWORD),
-        ("RegionSize", ctypes.c_size_t),
-        ("State", wintypes.DWORD),
-        ("Protect", wintypes.DWORD),
-        ("Type", wintypes.DWORD),
-    ]
-
-
 class AutoScanner:
     """
     Scanner automático que encontra HP/MP do jogador.
@@ -57,9 +47,14 @@ class AutoScanner:
     - Scan automático com validação rigorosa
     """
     
-    def __init__(self, process_name="client.exe"):
+    def __init__(self, process_name="client.exe", source=None):
+        """
+        source: MemorySource opcional (dump, /proc/pid/mem...).
+                Se None, conecta ao processo via pymem.
+        """
         self.process_name = process_name
         self.pm = None
+        self._source = source
         self.cache_file = os.path.join(os.path.dirname(__file__), "..", "offsets_cache.json")
         
         # Offsets CONFIRMADOS da estrutura do player (Tibia 15.11)
@@ -69,9 +64,26 @@ class AutoScanner:
         self.OFFSET_HP_MAX = 0x8
         self.OFFSET_MP = 0x620
         self.OFFSET_MP_MAX = 0x628
+        
+        # Estatisticas do ultimo scan (validados no buffer / confirmados no processo)
+        self.scan_stats = {"buffer_hits": 0, "live_checks": 0}
+    
+    @property
+    def source(self):
+        """Backend de memória (MemorySource explícito ou o pymem conectado)"""
+        if self._source is None and self.pm is not None:
+            self._source = PymemSource(self.pm)
+        return self._source
+    
+    @source.setter
+    def source(self, value):
+        self._source = value
     
     def connect(self):
         """Conecta ao processo"""
+        if self._source is not None:
+            return True
+        
         if not PYMEM_AVAILABLE:
             return False
         
@@ -88,6 +100,7 @@ class AutoScanner:
                 self.pm.close_process()
             except:
                 pass
+            self._source = None
         self.pm = None
     
     def _get_memory_regions(self, heap_only=True):
@@ -97,29 +110,13 @@ class AutoScanner:
         heap_only: Se True, foca em regiões de heap (muito mais rápido)
         """
         regions = []
-        address = 0
-        mbi = MEMORY_BASIC_INFORMATION()
-        mbi_size = ctypes.sizeof(mbi)
-        
-        VirtualQueryEx = ctypes.windll.kernel32.VirtualQueryEx
-        
-        while address < 0x7FFFFFFFFFFF:
-            result = VirtualQueryEx(
-                self.pm.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(mbi),
-                mbi_size
-            )
-            
-            if result == 0:
-                break
-            
-            base = mbi.BaseAddress
-            size = mbi.RegionSize
+        
+        for region in self.source.region_map.regions():
+            base = region.base
+            size = region.size
             
             # Pula se base é None
-            if base is None or size is None or size == 0:
-                address += 0x10000  # Pula 64KB
+            if not base or not size:
                 continue
             
             # Filtros para acelerar o scan
@@ -127,25 +124,20 @@ class AutoScanner:
                 # Foca em heaps: regiões grandes em endereços altos
                 # Heaps do Tibia geralmente estão acima de 0x100000000
                 if base < 0x100000000:
-                    address = base + size
                     continue
                 
                 # Ignora regiões muito pequenas (< 64KB)
                 if size < 0x10000:
-                    address = base + size
                     continue
                 
                 # Ignora regiões muito grandes (> 100MB) - provavelmente não são dados do player
                 if size > 100 * 1024 * 1024:
-                    address = base + size
                     continue
             
-            if (mbi.State == MEM_COMMIT and 
-                mbi.Protect in [PAGE_READWRITE, PAGE_READONLY, PAGE_EXECUTE_READ, PAGE_EXECUTE_READWRITE] and
+            if (region.state == MEM_COMMIT and 
+                region.protect in [PAGE_READWRITE, PAGE_READONLY, PAGE_EXECUTE_READ, PAGE_EXECUTE_READWRITE] and
                 size < 100 * 1024 * 1024):
                 regions.append((base, size))
-            
-            address = base + size
         
         return regions
     
@@ -155,82 +147,20 @@ class AutoScanner:
         verificando a estrutura completa.
         
         expected_hp/expected_mp: valores esperados para validação mais precisa
+        
+        Le a estrutura do processo (4 leituras): usado so para confirmar
+        os poucos sobreviventes da validacao no buffer.
         """
         try:
-            hp = self.pm.read_int(hp_addr)
-            hp_max = self.pm.read_int(hp_addr + self.OFFSET_HP_MAX)
-            mp = self.pm.read_int(hp_addr + self.OFFSET_MP)
-            mp_max = self.pm.read_int(hp_addr + self.OFFSET_MP_MAX)
-            
-            # Se temos valores esperados, verifica correspondência EXATA
-            if expected_hp is not None and hp != expected_hp:
-                return False
-            if expected_mp is not None and mp != expected_mp:
-                return False
-            
-            # ===============================================
-            # VALIDAÇÕES RIGOROSAS
-            # ===============================================
-            
-            # 1. HP deve ser positivo e razoável (personagens têm 50-500k HP)
-            if hp <= 0 or hp > 500000:
-                return False
-            
-            # 2. HP_MAX deve ser positivo e razoável
-            if hp_max <= 0 or hp_max > 500000:
-                return False
-            
-            # 3. HP <= HP_MAX (não pode ter mais HP que o máximo)
-            if hp > hp_max:
-                return False
-            
-            # 4. HP_MAX deve ser pelo menos 100 (mínimo level 8+)
-            # Personagens de Tibia não têm menos que ~150 HP
-            if hp_max < 100:
-                return False
-            
-            # 5. MP não pode ser negativo
-            if mp < 0:
-                return False
-            
-            # 6. MP_MAX não pode ser negativo e deve ser razoável
-            if mp_max < 0 or mp_max > 500000:
-                return False
-            
-            # 7. MP <= MP_MAX
-            if mp_max > 0 and mp > mp_max:
-                return False
-            
-            # 8. HP% deve estar entre 1% e 100%
-            hp_percent = (hp / hp_max) * 100
-            if hp_percent < 1 or hp_percent > 100:
-                return False
-            
-            # 9. IMPORTANTE: Personagens de Tibia SEMPRE têm mana
-            # Mesmo knights level baixo têm pelo menos 50-100 MP_MAX
-            # MP_MAX = 0 é definitivamente falso positivo
-            if mp_max == 0:
-                return False
-            
-            # 10. MP_MAX deve ser pelo menos 30 (mínimo para qualquer personagem)
-            if mp_max < 30:
-                return False
-            
-            # 11. HP e HP_MAX devem ter proporção razoável
-            if hp_max > 0 and hp > 0:
-                ratio = hp_max / hp
-                if ratio > 50:  # HP_MAX não pode ser 50x maior que HP atual
-                    return False
-            
-            # 12. Verifica que o endereço não está em região baixa da memória
-            # Endereços do player geralmente estão em regiões heap (altos)
-            if hp_addr < 0x100000000:  # 4GB - muito baixo para heap
-                return False
-            
-            return True
-            
-        except Exception as e:
+            hp = self.source.read_int(hp_addr)
+            hp_max = self.source.read_int(hp_addr + self.OFFSET_HP_MAX)
+            mp = self.source.read_int(hp_addr + self.OFFSET_MP)
+            mp_max = self.source.read_int(hp_addr + self.OFFSET_MP_MAX)
+        except Exception:
             return False
+        
+        # 12 regras (memory/vector_scanner.validate_player_values)
+        return validate_player_values(hp_addr, hp, hp_max, mp, mp_max, expected_hp, expected_mp)
     
     def _scan_for_hp_candidates(self, min_hp=50, max_hp=500000, expected_hp=None, expected_mp=None):
         """
@@ -246,35 +176,92 @@ class AutoScanner:
             min_hp = expected_hp
             max_hp = expected_hp
         
-        candidates = []
+        kernel = hp_candidates_kernel()
+        found = []
         regions = self._get_memory_regions()
         total_regions = len(regions)
         
+        # Janelas com overlap de STRUCT_SPAN: toda estrutura que comeca
+        # dentro da regiao e validada no buffer (sem ler o processo)
+        stream = StreamReader(self.source, overlap=STRUCT_SPAN)
+        self.scan_stats = {"buffer_hits": 0, "live_checks": 0}
+        
         for idx, (base, size) in enumerate(regions):
             if idx % 50 == 0:
                 print(f"[AUTO] Região {idx+1}/{total_regions}...", end="\r")
             
-            try:
-                data = self.pm.read_bytes(base, size)
-                
-                # Procura por inteiros de 4 bytes
-                for offset in range(0, len(data) - 4, 4):
-                    value = struct.unpack('<i', data[offset:offset+4])[0]
-                    
-                    # Filtra valores plausíveis de HP
-                    if min_hp <= value <= max_hp:
-                        addr = base + offset
-                        
-                        # Verifica estrutura completa
-                        if self._validate_player_struct(addr, expected_hp, expected_mp):
-                            candidates.append(addr)
-                            
-            except:
-                continue
+            found.extend(stream.scan(base, size, lambda data, address: kernel(
+                data, address, min_hp, max_hp, expected_hp, expected_mp)))
+            found.extend(self._scan_region_tail(base, base + size, kernel, min_hp, max_hp,
+                                                expected_hp, expected_mp))
+        
+        self.scan_stats["buffer_hits"] = len(found)
+        
+        # Confirma os sobreviventes no processo (a memoria e viva)
+        candidates = self._confirm_candidates(found, expected_hp, expected_mp)
         
         print(f"[AUTO] Scan completo - {len(candidates)} candidatos encontrados")
         return candidates
     
+    def _confirm_candidates(self, found, expected_hp=None, expected_mp=None, batch=4096):
+        """
+        Rele HP/HP_MAX/MP/MP_MAX dos sobreviventes no processo e reaplica
+        as 12 regras. Os campos vao em lotes pelo read_many (candidatos
+        vizinhos viram uma leitura so).
+        """
+        offsets = (0, self.OFFSET_HP_MAX, self.OFFSET_MP, self.OFFSET_MP_MAX)
+        candidates = []
+        
+        for i in range(0, len(found), batch):
+            chunk = found[i:i + batch]
+            raw = self.source.read_many([(addr + offset, 4) for addr in chunk for offset in offsets])
+            self.scan_stats["live_checks"] += len(chunk)
+            
+            for j, addr in enumerate(chunk):
+                fields = raw[j * 4:j * 4 + 4]
+                if None in fields:
+                    continue
+                hp, hp_max, mp, mp_max = (struct.unpack('<i', value)[0] for value in fields)
+                if validate_player_values(addr, hp, hp_max, mp, mp_max, expected_hp, expected_mp):
+                    candidates.append(addr)
+        
+        return candidates
+    
+    def _scan_region_tail(self, base, end, kernel, min_hp, max_hp, expected_hp, expected_mp):
+        """
+        Estruturas que comecam nos ultimos STRUCT_SPAN bytes da regiao e
+        terminam na regiao vizinha: le o fim da regiao + o inicio da
+        vizinha em um buffer so. Se a vizinha nao for legivel, valida os
+        valores no range direto no processo (poucos enderecos).
+        """
+        start = max(base, end - STRUCT_SPAN)
+        try:
+            data = self.source.read_bytes(start, end - start + STRUCT_SPAN)
+        except Exception:
+            data = None
+        
+        if data is not None and len(data) == end - start + STRUCT_SPAN:
+            return [addr for addr in kernel(data, start, min_hp, max_hp, expected_hp, expected_mp)
+                    if addr < end]
+        
+        # Vizinha ilegivel: a estrutura so e valida se a leitura viva funcionar
+        if expected_hp is not None:
+            min_hp = max_hp = expected_hp
+        
+        try:
+            data = self.source.read_bytes(start, end - start)
+        except Exception:
+            return []
+        
+        found = []
+        for offset in range(0, len(data) - 3, 4):
+            value = struct.unpack_from('<i', data, offset)[0]
+            if min_hp <= value <= max_hp:
+                self.scan_stats["live_checks"] += 1
+                if self._validate_player_struct(start + offset, expected_hp, expected_mp):
+                    found.append(start + offset)
+        return found
+    
     def _verify_candidate(self, addr, wait_time=2.0):
         """
         Verifica se um candidato é realmente o HP
@@ -285,8 +272,8 @@ class AutoScanner:
             start = time.time()
             
             while time.time() - start < wait_time:
-                hp = self.pm.read_int(addr)
-                hp_max = self.pm.read_int(addr + self.OFFSET_HP_MAX)
+                hp = self.source.read_int(addr)
+                hp_max = self.source.read_int(addr + self.OFFSET_HP_MAX)
                 
                 # Verifica consistência
                 if hp <= 0 or hp_max <= 0 or hp > hp_max:
@@ -317,7 +304,7 @@ class AutoScanner:
         
         Retorna: dict com hp, hp_max, mp, mp_max ou None
         """
-        if not self.pm:
+        if not self.source:
             if not self.connect():
                 return None
         
@@ -344,10 +331,10 @@ class AutoScanner:
             # Verifica cada um para confirmar
             for addr in candidates[:20]:
                 try:
-                    hp = self.pm.read_int(addr)
-                    hp_max = self.pm.read_int(addr + self.OFFSET_HP_MAX)
-                    mp = self.pm.read_int(addr + self.OFFSET_MP)
-                    mp_max = self.pm.read_int(addr + self.OFFSET_MP_MAX)
+                    hp = self.source.read_int(addr)
+                    hp_max = self.source.read_int(addr + self.OFFSET_HP_MAX)
+                    mp = self.source.read_int(addr + self.OFFSET_MP)
+                    mp_max = self.source.read_int(addr + self.OFFSET_MP_MAX)
                     
                     # Dupla verificação
                     if hp == hp_value:
@@ -368,10 +355,10 @@ class AutoScanner:
             # Sem valores específicos, usa método original
             for addr in candidates[:100]:
                 if self._verify_candidate(addr, wait_time=0.5 if quick else 2.0):
-                    hp = self.pm.read_int(addr)
-                    hp_max = self.pm.read_int(addr + self.OFFSET_HP_MAX)
-                    mp = self.pm.read_int(addr + self.OFFSET_MP)
-                    mp_max = self.pm.read_int(addr + self.OFFSET_MP_MAX)
+                    hp = self.source.read_int(addr)
+                    hp_max = self.source.read_int(addr + self.OFFSET_HP_MAX)
+                    mp = self.source.read_int(addr + self.OFFSET_MP)
+                    mp_max = self.source.read_int(addr + self.OFFSET_MP_MAX)
                     
                     print(f"[AUTO] ✓ Encontrado!")
                     print(f"       HP: {hp}/{hp_max} @ {hex(addr)}")
@@ -438,7 +425,7 @@ class AutoScanner:
         Verifica se os offsets do cache ainda são válidos.
         Retorna True se válido.
         """
-        if not self.pm:
+        if not self.source:
             if not self.connect():
                 return False
         
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Multi Pattern - Busca de varias assinaturas em uma unica leitura da memoria
+
+Antes o PatternScanner buscava so a primeira amostra do padrao com
+data.find e relia as outras amostras do processo (read_bytes por
+candidato), e cada versao de padrao exigia uma varredura propria.
+
+O MultiPatternMatcher:
+1. Compila cada assinatura (player_pattern.json versao 1, 2, ...) em
+   amostras (offset relativo ao HP, bytes, curingas)
+2. Escolhe de cada assinatura a ancora: o trecho literal mais raro
+   (mais bytes diferentes de zero) entre todas as amostras
+3. Pre-filtro: uma passada de bytes.find (memchr/SIMD na libc) por
+   ancora distinta sobre a janela ja lida (cache quente); assinaturas
+   com a mesma ancora compartilham a passada. A memoria e lida uma vez,
+   mas o buffer e percorrido uma vez por ancora distinta (poucas: uma
+   por versao de padrao), nao em uma passada so
+4. Verifica TODAS as amostras de todas as assinaturas no proprio buffer
+   (StreamReader com overlap = maior span das assinaturas)
+
+Curingas: no JSON, bytes com valor null (ou "??") nao sao comparados.
+Versao 3 grava cada amostra como AOB ("00 08 ?? ?? A3 01 00 00"); uma
+amostra tambem pode ter "bytes" + "mask" ("xx??xxxx"). auto_mask monta a
+mascara comparando snapshots e marcando qwords com cara de ponteiro.
+"""
+
+from collections import namedtuple
+
+
+# Trecho literal de uma amostra: (offset relativo ao HP, bytes)
+Run = namedtuple('Run', 'offset data')
+
+# Faixa de ponteiros de user-space em 64 bits
+POINTER_MIN = 0x10000
+POINTER_MAX = 0x7FFFFFFFFFFF
+
+# Sem mapa de regioes, so valores acima disso contam como ponteiro de heap
+# (o heap do client fica em 0x1xx_xxxx_xxxx; pares de ints pequenos nao)
+HEAP_POINTER_MIN = 0x10000000000
+
+# Trechos literais menores que isso nao identificam nada
+MIN_LITERAL_BYTES = 4
+
+
+def _parse_bytes(values):
+    """Lista do JSON -> lista de ints (None = curinga)"""
+    parsed = []
+    for value in values:
+        if value is None or value in ("?", "??"):
+            parsed.append(None)
+        else:
+            parsed.append(int(value) & 0xFF)
+    return parsed
+
+
+def parse_aob(text):
+    """ "00 08 ?? A3" -> [0, 8, None, 163] """
+    return [None if token in ("?", "??") else int(token, 16) for token in text.split()]
+
+
+def format_aob(values):
+    """[0, 8, None, 163] -> "00 08 ?? A3" """
+    return " ".join("??" if value is None else f"{value:02X}" for value in values)
+
+
+def sample_values(sample):
+    """
+    Bytes de uma amostra do JSON (lista de ints/None), em qualquer formato:
+    "aob", ou "bytes" (com null/"??") e "mask" opcional ("x" = compara)
+    """
+    if "aob" in sample:
+        return parse_aob(sample["aob"])
+
+    values = _parse_bytes(sample["bytes"])
+    mask = sample.get("mask")
+    if mask is not None:
+        values = [value if keep not in ("?", 0, False) else None
+                  for value, keep in zip(values, mask)]
+    return values
+
+
+def literal_count(values):
+    """Bytes que identificam algo (nem curinga nem zero)"""
+    return sum(1 for value in values if value)
+
+
+def looks_like_pointer(value, is_mapped=None):
+    """
+    Qword com cara de ponteiro. is_mapped(endereco) -> bool (ex: o
+    RegionMap do processo) confirma que aponta para memoria valida.
+    """
+    if not POINTER_MIN <= value <= POINTER_MAX:
+        return False
+    if is_mapped is not None:
+        return is_mapped(value)
+    return value >= HEAP_POINTER_MIN
+
+
+def mask_pointers(values, address, is_mapped=None):
+    """Troca por curingas os qwords alinhados que parecem ponteiros"""
+    values = list(values)
+    for i in range((-address) % 8, len(values) - 7, 8):
+        qword = values[i:i + 8]
+        if None in qword:
+            continue
+        if looks_like_pointer(int.from_bytes(bytes(qword), 'little'), is_mapped):
+            values[i:i + 8] = [None] * 8
+    return values
+
+
+def auto_mask(snapshots, address, is_mapped=None):
+    """
+    Mascara de uma amostra a partir de varias leituras dela.
+
+    snapshots: bytes da mesma amostra lidos em instantes diferentes
+    address: endereco do primeiro byte (alinhamento dos dwords/qwords)
+
+    - dword alinhado com algum byte que mudou -> curinga (contadores,
+      timers: o byte alto vai mudar em outra sessao)
+    - qword alinhado com cara de ponteiro -> curinga (muda a cada sessao)
+    """
+    first = snapshots[0]
+    values = list(first)
+
+    for i in range(len(first)):
+        if any(snapshot[i] != first[i] for snapshot in snapshots[1:]):
+            start = i - (address + i) % 4
+            for j in range(max(0, start), min(len(values), start + 4)):
+                values[j] = None
+
+    return mask_pointers(values, address, is_mapped)
+
+
+def pointer_masked(pattern_data):
+    """
+    Variante de um padrao exato (versao 2, gravado sem mascara) com os
+    qwords que parecem ponteiros trocados por curingas. O HP e alinhado em
+    8, entao o offset da amostra da o alinhamento. None se nada mudou ou
+    se nao sobra nenhum byte nao-zero para ancora.
+
+    Trechos zerados continuam na variante como bytes so de verificacao: a
+    Signature nunca escolhe uma ancora so de zeros, e a estrutura
+    HP..MP_MAX e conferida de qualquer forma pelo validate do matcher.
+    """
+    if pattern_data.get("version", 1) != 2:
+        return None
+
+    samples = []
+    changed = False
+    anchored = False
+    for sample in pattern_data.get("samples", []):
+        values = sample_values(sample)
+        masked = mask_pointers(values, sample["offset"])
+        changed = changed or masked != values
+        if len(masked) - masked.count(None) >= MIN_LITERAL_BYTES:
+            anchored = anchored or literal_count(masked) > 0
+            samples.append({"name": sample.get("name"), "offset": sample["offset"],
+                            "aob": format_aob(masked)})
+
+    if not changed or not anchored:
+        return None
+
+    variant = dict(pattern_data, samples=samples)
+    variant["name"] = (pattern_data.get("name") or "v2") + "-masked"
+    variant["priority"] = pattern_data.get("priority", 0) - 1
+    return variant
+
+
+def _literal_runs(offset, values):
+    """Quebra uma amostra com curingas em trechos literais"""
+    runs = []
+    start = None
+    for i, value in enumerate(values + [None]):
+        if value is not None and start is None:
+            start = i
+        elif value is None and start is not None:
+            runs.append(Run(offset + start, bytes(values[start:i])))
+            start = None
+    return runs
+
+
+def _anchor_score(run):
+    """Ancora boa: muitos bytes nao-zero e diferentes, depois comprimento"""
+    return (len(set(run.data) - {0}), len(run.data))
+
+
+class Signature:
+    """
+    Assinatura compilada (uma versao de padrao).
+
+    runs: trechos literais com offset relativo ao endereco do HP
+    anchor: trecho usado no pre-filtro
+    origin: menor offset coberto (pode ser negativo, ex: prefixo v1)
+    span: bytes de origin ate o fim do ultimo trecho (ou de `reach`)
+    """
+
+    def __init__(self, name, version, samples, reach=0, priority=0):
+        """
+        samples: lista de (offset relativo ao HP, lista de ints/None)
+        reach: bytes apos o HP que o verificador precisa (ex: STRUCT_SPAN)
+        priority: desempate entre assinaturas da mesma versao
+        """
+        self.name = name
+        self.version = version
+        self.priority = priority
+        self.runs = []
+        for offset, values in samples:
+            self.runs.extend(run for run in _literal_runs(offset, values)
+                             if len(run.data) >= MIN_LITERAL_BYTES)
+
+        if not self.runs:
+            raise ValueError(f"Assinatura '{name}' sem bytes literais")
+
+        self.anchor = max(self.runs, key=_anchor_score)
+        if not any(self.anchor.data):
+            # Ancora so de zeros bate em qualquer pagina vazia
+            raise ValueError(f"Assinatura '{name}' so tem trechos zerados")
+        self.others = [run for run in self.runs if run is not self.anchor]
+
+        self.origin = min(0, min(run.offset for run in self.runs))
+        end = max(reach, max(run.offset + len(run.data) for run in self.runs))
+        self.span = end - self.origin
+
+    @classmethod
+    def from_pattern(cls, pattern_data, reach=0):
+        """
+        Compila um padrao do player_pattern.json.
+
+        Versao 1: prefixo de prefix_size bytes, HP em hp_offset_from_prefix
+        Versao 2+: lista de samples {offset, bytes|aob, mask}
+        """
+        version = pattern_data.get("version", 1)
+
+        if version == 1:
+            prefix = _parse_bytes(pattern_data.get("prefix_bytes", []))
+            hp_offset = pattern_data.get("hp_offset_from_prefix",
+                                         pattern_data.get("prefix_size", len(prefix)))
+            samples = [(-hp_offset, prefix)]
+        else:
+            samples = [(sample["offset"], sample_values(sample))
+                       for sample in pattern_data.get("samples", [])]
+
+        name = pattern_data.get("name") or f"v{version}"
+        return cls(name, version, samples, reach, pattern_data.get("priority", 0))
+
+    def matches(self, data, hp_pos):
+        """True se todos os trechos batem no buffer (HP em hp_pos)"""
+        for run in self.others:
+            start = hp_pos + run.offset
+            if data[start:start + len(run.data)] != run.data:
+                return False
+        return True
+
+
+class MultiPatternMatcher:
+    """
+    Uso:
+        matcher = MultiPatternMatcher.from_patterns(patterns, reach=STRUCT_SPAN)
+        stream = StreamReader(source, overlap=matcher.overlap)
+        results = stream.scan(base, size, matcher.scan)
+
+    Cada resultado e um dict {'addr', 'hp', 'name', 'version', 'priority'}; 'addr' e a
+    origem da assinatura (o StreamReader usa para decidir a janela dona).
+    """
+
+    def __init__(self, signatures, validate=None):
+        """
+        signatures: lista de Signature
+        validate: funcao(data, hp_pos) -> bool chamada depois das amostras
+                  (ex: conferir a estrutura no buffer)
+        """
+        self.signatures = list(signatures)
+        self.validate = validate
+
+        # Ancoras distintas -> assinaturas que usam cada uma
+        self._by_anchor = {}
+        for signature in self.signatures:
+            self._by_anchor.setdefault(signature.anchor.data, []).append(signature)
+
+    @classmethod
+    def from_patterns(cls, patterns, reach=0, validate=None):
+        """Compila varios padroes; padroes invalidos sao ignorados"""
+        signatures = []
+        for pattern_data in patterns:
+            try:
+                signatures.append(Signature.from_pattern(pattern_data, reach))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"[PATTERN] Padrao ignorado: {e}")
+        return cls(signatures, validate)
+
+    @property
+    def overlap(self):
+        """Overlap de leitura necessario para nao perder matches na fronteira"""
+        return max((signature.span for signature in self.signatures), default=1) - 1
+
+    def scan(self, data, base):
+        """
+        Kernel: todas as assinaturas sobre um buffer, em uma passada por
+        ancora distinta. Retorna dicts ordenados por endereco.
+        """
+        size = len(data)
+        results = []
+
+        for anchor, signatures in self._by_anchor.items():
+            pos = data.find(anchor)
+            while pos != -1:
+                for signature in signatures:
+                    hp_pos = pos - signature.anchor.offset
+                    start = hp_pos + signature.origin
+                    if start < 0 or start + signature.span > size:
+                        continue
+                    if not signature.matches(data, hp_pos):
+                        continue
+                    if self.validate and not self.validate(data, hp_pos):
+                        continue
+                    results.append({
+                        'addr': base + start,
+                        'hp': base + hp_pos,
+                        'name': signature.name,
+                        'version': signature.version,
+                        'priority': signature.priority,
+                    })
+                pos = data.find(anchor, pos + 1)
+
+        results.sort(key=lambda item: item['addr'])
+        return results
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Next Scan - Filtros incrementais ("next scan") no estilo Cheat Engine
+
+Antes o AdvancedScanner guardava os resultados como lista de ints do
+Python e cada filtro (filter_changed / filter_unchanged) relia endereco
+por endereco com read_int: um primeiro scan por um valor comum (ex: 100)
+da milhoes de enderecos, gigabytes de ints e milhoes de syscalls por
+filtro.
+
+O ScanResults:
+1. Guarda os resultados por regiao: offsets relativos a base
+   (uint32, 4 bytes por resultado) + o valor visto no ultimo passo
+2. Em cada next scan le UMA vez o trecho da regiao que contem os
+   resultados (do primeiro ao ultimo offset)
+3. Avalia o predicado (equal, changed, unchanged, increased, decreased,
+   increased_by, decreased_by) vetorizado contra o snapshot guardado
+   (NumPy; sem NumPy, array + struct sobre o mesmo buffer)
+
+Cada next scan devolve um ScanResults novo com o snapshot atualizado.
+"""
+
+import bisect
+import struct
+from array import array
+from itertools import islice
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# value_type -> (formato struct, dtype NumPy, typecode do array)
+VALUE_TYPES = {
+    "int4": ("<i", "<i4", "i"),
+    "int2": ("<h", "<i2", "h"),
+    "float": ("<f", "<f4", "f"),
+}
+
+# Predicados: (valor atual, valor do snapshot, argumento) -> bool
+# Funcionam com escalares e com arrays NumPy (operadores elemento a elemento)
+PREDICATES = {
+    "equal": lambda current, old, value: current == value,
+    "changed": lambda current, old, value: current != old,
+    "unchanged": lambda current, old, value: current == old,
+    "increased": lambda current, old, value: current > old,
+    "decreased": lambda current, old, value: current < old,
+    "increased_by": lambda current, old, value: current - old == value,
+    "decreased_by": lambda current, old, value: old - current == value,
+    "any": lambda current, old, value: current == current,
+}
+
+# Predicados que precisam de argumento
+VALUE_PREDICATES = ("equal", "increased_by", "decreased_by")
+
+
+def _value_size(value_type):
+    return struct.calcsize(VALUE_TYPES[value_type][0])
+
+
+def gather(data, offsets, value_type, use_numpy=NUMPY_AVAILABLE):
+    """
+    Valores nos offsets (quaisquer, nao precisam estar alinhados) de um
+    buffer. Com NumPy retorna array (int64/float64 para as contas dos
+    predicados nao estourarem), senao lista.
+    """
+    fmt, dtype, _ = VALUE_TYPES[value_type]
+
+    if use_numpy and NUMPY_AVAILABLE:
+        size = np.dtype(dtype).itemsize
+        raw = np.frombuffer(data, dtype=np.uint8)
+        index = np.asarray(offsets, dtype=np.intp)[:, None] + np.arange(size)
+        values = raw[index].view(dtype).ravel()
+        return values.astype(np.float64 if value_type == "float" else np.int64)
+
+    unpack = struct.Struct(fmt).unpack_from
+    return [unpack(data, offset)[0] for offset in offsets]
+
+
+class ScanResults:
+    """
+    Resultados de um scan, agrupados por regiao.
+
+    regions: dict base -> (offsets, values), offsets ordenados
+    Compativel com o uso antigo de lista: len(), iteracao (enderecos em
+    ordem) e fatias (results[:10] -> lista de enderecos).
+    """
+
+    def __init__(self, value_type="int4", regions=None, use_numpy=NUMPY_AVAILABLE):
+        self.value_type = value_type
+        self.regions = regions or {}
+        self.use_numpy = use_numpy and NUMPY_AVAILABLE
+
+        # Estatisticas do ultimo next scan
+        self.reads = 0
+        self.bytes_read = 0
+
+    # ============================================
+    # CONSTRUCAO
+    # ============================================
+
+    @classmethod
+    def from_addresses(cls, addresses, regions, value, value_type="int4",
+                       use_numpy=NUMPY_AVAILABLE):
+        """
+        Resultados de um primeiro scan por valor exato: o snapshot de cada
+        endereco e o proprio valor buscado (nada e lido de novo).
+
+        addresses: enderecos encontrados
+        regions: lista de (base, size) varrida pelo scan
+        """
+        results = cls(value_type, use_numpy=use_numpy)
+        bases = sorted(base for base, _ in regions)
+        if not bases or not len(addresses):
+            return results
+
+        if results.use_numpy:
+            addrs = np.unique(np.asarray(addresses, dtype=np.uint64))
+            starts = np.asarray(bases, dtype=np.uint64)
+            slots = np.searchsorted(starts, addrs, side='right') - 1
+            dtype = VALUE_TYPES[value_type][1]
+
+            # Cortes onde a regiao muda (addrs e slots ja estao ordenados)
+            cuts = np.flatnonzero(np.diff(slots)) + 1
+            for chunk, slot in zip(np.split(addrs, cuts), slots[np.r_[0, cuts]]):
+                if slot < 0:
+                    continue
+                base = bases[int(slot)]
+                offsets = (chunk - np.uint64(base)).astype(np.uint32)
+                results.regions[base] = (offsets, np.full(len(offsets), value, dtype=dtype))
+            return results
+
+        typecode = VALUE_TYPES[value_type][2]
+        grouped = {}
+        for address in sorted(set(addresses)):
+            slot = bisect.bisect_right(bases, address) - 1
+            if slot >= 0:
+                grouped.setdefault(bases[slot], []).append(address - bases[slot])
+        for base, offsets in grouped.items():
+            results.regions[base] = (array('I', offsets), array(typecode, [value] * len(offsets)))
+        return results
+
+    # ============================================
+    # COMPATIBILIDADE COM LISTA
+    # ============================================
+
+    def __len__(self):
+        return sum(len(offsets) for offsets, _ in self.regions.values())
+
+    def __bool__(self):
+        return any(len(offsets) for offsets, _ in self.regions.values())
+
+    def __iter__(self):
+        for base in sorted(self.regions):
+            for offset in self.regions[base][0]:
+                yield base + int(offset)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step is None and (index.start or 0) >= 0 and \
+                    (index.stop is None or index.stop >= 0):
+                return list(islice(self, index.start, index.stop))
+            return list(self)[index]
+        return list(self)[index]
+
+    def items(self):
+        """Gera (endereco, valor do ultimo snapshot)"""
+        for base in sorted(self.regions):
+            offsets, values = self.regions[base]
+            for offset, value in zip(offsets, values):
+                yield base + int(offset), value.item() if hasattr(value, 'item') else value
+
+    @property
+    def nbytes(self):
+        """Memoria usada pelos resultados"""
+        size = 4 + _value_size(self.value_type)
+        return len(self) * size
+
+    # ============================================
+    # NEXT SCAN
+    # ============================================
+
+    def next_scan(self, source, predicate, value=None):
+        """
+        Relê cada regiao uma vez e mantem os enderecos que satisfazem o
+        predicado. Retorna um ScanResults novo (snapshot = valores atuais).
+
+        predicate: equal, changed, unchanged, increased, decreased,
+                   increased_by, decreased_by, any
+        value: argumento de equal / increased_by / decreased_by
+        """
+        test = PREDICATES[predicate]
+        if predicate in VALUE_PREDICATES and value is None:
+            raise ValueError(f"Predicado '{predicate}' precisa de um valor")
+
+        size = _value_size(self.value_type)
+        typecode = VALUE_TYPES[self.value_type][2]
+        dtype = VALUE_TYPES[self.value_type][1]
+        result = ScanResults(self.value_type, use_numpy=self.use_numpy)
+
+        for base, (offsets, old) in self.regions.items():
+            if not len(offsets):
+                continue
+
+            first = int(offsets[0])
+            span = int(offsets[-1]) + size - first
+            try:
+                data = source.read_bytes(base + first, span)
+            except Exception:
+                # Regiao liberada / ilegivel: os enderecos somem
+                continue
+            result.reads += 1
+            result.bytes_read += span
+
+            if self.use_numpy:
+                current = gather(data, offsets - np.uint32(first), self.value_type, True)
+                keep = test(current, old, value)
+                if np.any(keep):
+                    result.regions[base] = (offsets[keep], current[keep].astype(dtype))
+                continue
+
+            current = gather(data, [offset - first for offset in offsets], self.value_type, False)
+            kept = [(offset, now) for offset, now, before in zip(offsets, current, old)
+                    if test(now, before, value)]
+            if kept:
+                result.regions[base] = (array('I', [offset for offset, _ in kept]),
+                                        array(typecode, [now for _, now in kept]))
+
+        return result
+
+    def refresh(self, source):
+        """Atualiza o snapshot com os valores atuais (descarta ilegiveis)"""
+        return self.next_scan(source, "any")
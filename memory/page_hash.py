@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Page Hash - Impressao digital por pagina (4 KB) entre passos de scan
+
+Com o client parado a maior parte do heap nao muda entre dois passos,
+mas cada passo descomprimia e reavaliava tudo. Guardando um hash por
+pagina (xxhash se instalado, senao zlib.crc32) no passo anterior, o passo
+seguinte:
+1. Le o bloco (a leitura do outro processo nao tem como ser evitada)
+2. Calcula os hashes das paginas e compara com os guardados
+3. Reavalia o predicado so nas paginas sujas; nas limpas o valor atual e
+   igual ao do snapshot, entao o resultado ja e conhecido
+
+Custo: 4 bytes (crc32) ou 8 (xxhash) por pagina, ~1 MB por GB varrido.
+"""
+
+import zlib
+from array import array
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+PAGE_SIZE = 0x1000
+
+# Typecode do array de hashes
+HASH_TYPECODE = 'Q' if XXHASH_AVAILABLE else 'I'
+
+
+def _hash(view):
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_intdigest(view)
+    return zlib.crc32(view)
+
+
+def page_hashes(data, page_size=PAGE_SIZE):
+    """Hash de cada pagina do buffer (a ultima pode ser parcial)"""
+    view = memoryview(data)
+    return array(HASH_TYPECODE, [_hash(view[i:i + page_size])
+                                 for i in range(0, len(view), page_size)])
+
+
+def dirty_pages(old_hashes, new_hashes):
+    """Indices das paginas cujo hash mudou (todas se nao ha hash anterior)"""
+    if old_hashes is None or len(old_hashes) != len(new_hashes):
+        return list(range(len(new_hashes)))
+    return [i for i, (old, new) in enumerate(zip(old_hashes, new_hashes)) if old != new]
+
+
+def dirty_runs(pages):
+    """Paginas sujas (ordenadas) -> trechos contiguos (primeira, fim)"""
+    runs = []
+    for page in pages:
+        if runs and runs[-1][1] == page:
+            runs[-1][1] = page + 1
+        else:
+            runs.append([page, page + 1])
+    return [(first, end) for first, end in runs]
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel Scan - Agendador de varreduras de memoria em varios nucleos
+
+Antes cada varredura completa (find_player_auto, scan_all_memory,
+find_player_v3) rodava em um unico nucleo, regiao por regiao.
+
+O ParallelScanner:
+1. Divide a lista de regioes em unidades de trabalho com ~o mesmo numero
+   de bytes (regioes grandes sao fatiadas, regioes pequenas agrupadas)
+2. Cada fatia le `overlap` bytes a mais para nao perder estruturas que
+   cruzam a fronteira (so conta resultados que COMECAM dentro da fatia)
+3. Roda o kernel em um pool de threads (kernels NumPy / leituras de
+   memoria liberam o GIL) ou de processos (kernels em Python puro)
+4. Cada worker le as proprias regioes do MemorySource em janelas, com um
+   buffer reutilizavel (memory.stream_reader), e devolve os resultados
+   por unidade, assim que termina
+5. Suporta cancelamento e progress_callback(pct, msg) como a GUI usa
+
+Os resultados finais ficam na mesma ordem (por endereco) da varredura
+sequencial.
+"""
+
+import os
+import sys
+import time
+import pickle
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, BrokenExecutor, as_completed
+
+from memory.stream_reader import StreamReader
+
+
+# Limites do tamanho de cada unidade de trabalho
+MIN_UNIT_SIZE = 1 * 1024 * 1024
+MAX_UNIT_SIZE = 16 * 1024 * 1024
+
+# Fatias sempre alinhadas em pagina (preserva o alinhamento dos kernels)
+UNIT_ALIGN = 0x1000
+
+# Unidades por worker (mais unidades = melhor balanceamento no final)
+UNITS_PER_WORKER = 8
+
+
+# spans: tupla de (base, size, read_size) - read_size inclui o overlap
+WorkUnit = namedtuple('WorkUnit', 'index spans size')
+
+# StreamReader de cada thread/processo worker
+_local = threading.local()
+
+
+def find_bytes(data, base, needle):
+    """
+    Kernel de busca de um valor exato (todas as ocorrencias, sem alinhamento).
+    Usar com functools.partial(find_bytes, needle=...).
+    """
+    results = []
+    pos = data.find(needle)
+    while pos != -1:
+        results.append(base + pos)
+        pos = data.find(needle, pos + 1)
+    return results
+
+
+def find_joined(data, base, keys):
+    """
+    Kernel de busca de varios valores com offsets fixos entre si
+    (ex: HP, HP_MAX, MP, MP_MAX em 0, +0x8, +0x620, +0x628), em uma
+    unica passada. Usar com functools.partial(find_joined, keys=...).
+
+    keys: tupla de (offset, bytes). A primeira chave (offset 0) e buscada
+          com find; as demais sao conferidas no proprio buffer.
+          Overlap da varredura: join_span(keys) - 1.
+
+    Retorna os enderecos da primeira chave com todas as chaves batendo.
+    """
+    (_, needle), others = keys[0], keys[1:]
+    end = len(data)
+    results = []
+
+    pos = data.find(needle)
+    while pos != -1:
+        for offset, value in others:
+            start = pos + offset
+            if start + len(value) > end or data[start:start + len(value)] != value:
+                break
+        else:
+            results.append(base + pos)
+        pos = data.find(needle, pos + 1)
+
+    return results
+
+
+def join_span(keys):
+    """Bytes cobertos pelas chaves de find_joined"""
+    return max(offset + len(value) for offset, value in keys)
+
+
+def plan_work_units(regions, unit_size, overlap=0):
+    """
+    Divide as regioes em unidades de trabalho de ~unit_size bytes.
+
+    regions: iteravel de (base, size) ou MemoryRegion, em ordem de endereco
+    overlap: bytes lidos alem do fim de cada fatia (dentro da regiao)
+
+    Returns:
+        lista de WorkUnit
+    """
+    unit_size = max(UNIT_ALIGN, unit_size - unit_size % UNIT_ALIGN)
+
+    units = []
+    spans = []
+    pending = 0
+
+    for region in regions:
+        base, size = region[0], region[1]
+        end = base + size
+        offset = 0
+
+        while offset < size:
+            piece = min(unit_size - pending, size - offset)
+            # Fatias do meio ficam alinhadas em pagina
+            if offset + piece < size:
+                piece = max(UNIT_ALIGN, piece - piece % UNIT_ALIGN)
+                piece = min(piece, size - offset)
+
+            start = base + offset
+            read_size = min(piece + overlap, end - start)
+            spans.append((start, piece, read_size))
+            pending += piece
+            offset += piece
+
+            if pending >= unit_size:
+                units.append(WorkUnit(len(units), tuple(spans), pending))
+                spans = []
+                pending = 0
+
+    if spans:
+        units.append(WorkUnit(len(units), tuple(spans), pending))
+
+    return units
+
+
+def _stream_reader(source, overlap):
+    """StreamReader reutilizado por thread/processo (um buffer por worker)"""
+    reader = getattr(_local, 'reader', None)
+    if reader is None or reader.source is not source or reader.overlap != overlap:
+        reader = StreamReader(source, overlap=overlap)
+        _local.reader = reader
+    return reader
+
+
+def scan_unit(source, kernel, spans, overlap=0, cancel_event=None):
+    """
+    Executa o kernel sobre as fatias de uma unidade, lendo cada fatia em
+    janelas pelo StreamReader do worker (memoria limitada ao buffer).
+
+    Returns:
+        (resultados, bytes escaneados)
+    """
+    reader = _stream_reader(source, overlap)
+    results = []
+    scanned = 0
+
+    for base, size, read_size in spans:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+
+        failed = reader.failed_windows
+        results.extend(reader.scan(base, size, kernel, limit=base + read_size))
+        if reader.failed_windows == failed:
+            scanned += size
+
+    return results, scanned
+
+
+# ============================================
+# WORKERS (ProcessPoolExecutor)
+# ============================================
+
+_worker_source = None
+
+
+def _init_worker(source):
+    """Cada processo worker recebe (e reabre) o MemorySource uma unica vez"""
+    global _worker_source
+    _worker_source = source
+
+
+def _process_unit(kernel, spans, overlap):
+    return scan_unit(_worker_source, kernel, spans, overlap)
+
+
+class ParallelScanner:
+    """
+    Agendador de varreduras paralelas sobre um MemorySource.
+
+    Uso:
+        scheduler = ParallelScanner(source, workers=4)
+        results = scheduler.scan(regions, kernel, overlap=0x630,
+                                 progress_callback=report)
+
+    kernel(data, base) -> lista de ints ou dicts com 'addr'.
+    No modo 'process' o kernel precisa ser picklavel (funcao de modulo
+    ou functools.partial).
+    """
+
+    def __init__(self, source, workers=None, mode="thread", unit_size=None):
+        """
+        source: MemorySource
+        workers: numero de workers (None = os.cpu_count())
+        mode: "thread" ou "process"
+        unit_size: bytes por unidade (None = automatico)
+        """
+        self.source = source
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.mode = mode
+        self.unit_size = unit_size
+
+        self._cancel = threading.Event()
+
+        # Estatisticas da ultima varredura
+        self.last_stats = {}
+
+    def cancel(self):
+        """
+        Cancela a varredura em andamento ou a proxima (pode ser chamado de
+        outra thread, inclusive antes do scan comecar)
+        """
+        self._cancel.set()
+
+    def reset(self):
+        """Limpa um cancel anterior para reusar o scheduler"""
+        self._cancel.clear()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def _resolve_mode(self):
+        """Cai para threads quando processos nao sao viaveis"""
+        if self.mode != "process" or self.workers == 1:
+            return self.mode
+
+        # Executavel congelado (PyInstaller) nao re-executa o main nos workers
+        if getattr(sys, 'frozen', False):
+            return "thread"
+
+        try:
+            pickle.dumps(self.source)
+        except Exception:
+            print("[SCAN] MemorySource nao picklavel, usando threads")
+            return "thread"
+
+        return "process"
+
+    def _auto_unit_size(self, total):
+        size = total // (self.workers * UNITS_PER_WORKER)
+        return min(MAX_UNIT_SIZE, max(MIN_UNIT_SIZE, size))
+
+    def iter_scan(self, regions, kernel, overlap=0, progress_callback=None, progress_range=(0, 100)):
+        """
+        Gera (WorkUnit, resultados) conforme as unidades terminam
+        (ordem de conclusao, nao de endereco).
+
+        progress_callback: funcao(percent, message)
+        progress_range: (inicio, fim) do percentual reportado
+
+        Um cancel() feito antes desta chamada vale para ela: o evento so e
+        limpo na criacao ou em reset().
+        """
+        regions = list(regions)
+        total = sum(r[1] for r in regions)
+        unit_size = self.unit_size or self._auto_unit_size(total)
+        units = plan_work_units(regions, unit_size, overlap)
+
+        mode = self._resolve_mode()
+        workers = min(self.workers, len(units)) or 1
+        low, high = progress_range
+
+        stats = {
+            'mode': mode if workers > 1 else "inline",
+            'workers': workers,
+            'units': len(units),
+            'regions': len(regions),
+            'bytes': 0,
+            'results': 0,
+            'elapsed': 0.0,
+            'cancelled': False,
+        }
+        self.last_stats = stats
+        start = time.perf_counter()
+
+        def report(done):
+            if progress_callback and total:
+                pct = low + int((high - low) * done / total)
+                progress_callback(pct, f"Escaneando {done / 1024 / 1024:.0f}/"
+                                       f"{total / 1024 / 1024:.0f} MB ({workers} workers)...")
+
+        def finish(unit, results, scanned):
+            stats['bytes'] += scanned
+            stats['results'] += len(results)
+            stats['elapsed'] = time.perf_counter() - start
+            done_bytes[0] += unit.size
+            report(done_bytes[0])
+
+        done_bytes = [0]
+        report(0)
+
+        try:
+            if workers == 1:
+                # Sem pool: evita overhead em varreduras pequenas / 1 nucleo
+                for unit in units:
+                    if self._cancel.is_set():
+                        break
+                    results, scanned = scan_unit(self.source, kernel, unit.spans, overlap, self._cancel)
+                    finish(unit, results, scanned)
+                    yield unit, results
+                return
+
+            if mode == "process":
+                executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                               initargs=(self.source,))
+                submit = lambda unit: executor.submit(_process_unit, kernel, unit.spans, overlap)
+            else:
+                executor = ThreadPoolExecutor(workers, thread_name_prefix="scan")
+                submit = lambda unit: executor.submit(scan_unit, self.source, kernel,
+                                                      unit.spans, overlap, self._cancel)
+
+            futures = {}
+            retry = []
+            try:
+                for unit in units:
+                    futures[submit(unit)] = unit
+
+                for future in as_completed(futures):
+                    if self._cancel.is_set():
+                        break
+
+                    unit = futures[future]
+                    try:
+                        results, scanned = future.result()
+                    except BrokenExecutor:
+                        # Worker nao conseguiu abrir o processo: refaz aqui
+                        retry.append(unit)
+                        continue
+                    except Exception as e:
+                        print(f"[SCAN] Falha na unidade {unit.index}: {e}")
+                        continue
+
+                    finish(unit, results, scanned)
+                    yield unit, results
+            finally:
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True, cancel_futures=True)
+
+            if retry:
+                print(f"[SCAN] Pool de processos falhou, escaneando {len(retry)} unidades nesta thread")
+                for unit in sorted(retry):
+                    if self._cancel.is_set():
+                        break
+                    results, scanned = scan_unit(self.source, kernel, unit.spans, overlap, self._cancel)
+                    finish(unit, results, scanned)
+                    yield unit, results
+        finally:
+            stats['elapsed'] = time.perf_counter() - start
+            stats['cancelled'] = self._cancel.is_set()
+
+    def scan(self, regions, kernel, overlap=0, progress_callback=None, progress_range=(0, 100)):
+        """
+        Varre todas as regioes e retorna os resultados em ordem de endereco
+        (identicos a varredura sequencial). Em caso de cancelamento retorna
+        o que ja foi encontrado.
+        """
+        by_unit = {}
+        for unit, results in self.iter_scan(regions, kernel, overlap, progress_callback, progress_range):
+            by_unit[unit.index] = results
+
+        merged = []
+        for index in sorted(by_unit):
+            merged.extend(by_unit[index])
+        return merged
@@ -7,8 +7,6 @@ Em vez de procurar valores específicos, procura PADRÕES que identificam
 estruturas do jogo. Esses padrões não mudam entre sessões.
 """
 
-import ctypes
-from ctypes import wintypes
 import struct
 import json
 import os
@@ -22,6 +20,13 @@ try:
 except ImportError:
     PYMEM_AVAILABLE = False
 
+from memory.sources import PymemSource
+from memory.stream_reader import StreamReader
+from memory.multi_pattern import (
+    MultiPatternMatcher, MIN_LITERAL_BYTES, auto_mask, format_aob, literal_count, pointer_masked
+)
+from memory.vector_scanner import STRUCT_SPAN
+
 
 # Windows API
 MEM_COMMIT = 0x1000
@@ -31,18 +36,6 @@ PAGE_EXECUTE_READ = 0x20
 PAGE_EXECUTE_READWRITE = 0x40
 
 
-class MEMORY_BASIC_INFORMATION(ctypes.Structure):
-    _fields_ = [
-        ("BaseAddress", ctypes.c_void_p),
-        ("AllocationBase", ctypes.c_void_p),
-        ("AllocationProtect", wintypes.DWORD),
-        ("RegionSize", ctypes.c_size_t),
-        ("State", wintypes.DWORD),
-        ("Protect", wintypes.DWORD),
-        ("Type", wintypes.DWORD),
-    ]
-
-
 class PatternScanner:
     """
     Scanner baseado em padrões de bytes.
@@ -62,14 +55,36 @@ class PatternScanner:
     OFFSET_MP = 0x620
     OFFSET_MP_MAX = 0x628
     
-    def __init__(self, process_name="client.exe"):
+    def __init__(self, process_name="client.exe", source=None):
+        """
+        source: MemorySource opcional (dump, /proc/pid/mem...).
+                Se None, conecta ao processo via pymem.
+        """
         self.process_name = process_name
         self.pm = None
+        self._source = source
         self.pattern_file = os.path.join(os.path.dirname(__file__), "..", "player_pattern.json")
         self.cache_file = os.path.join(os.path.dirname(__file__), "..", "offsets_cache.json")
+        
+        # Candidatos da ultima busca (enderecos de HP), para diagnostico/benchmark
+        self.last_candidates = []
+        self.last_matches = []
+    
+    @property
+    def source(self):
+        """Backend de memória (MemorySource explícito ou o pymem conectado)"""
+        if self._source is None and self.pm is not None:
+            self._source = PymemSource(self.pm)
+        return self._source
+    
+    @source.setter
+    def source(self, value):
+        self._source = value
     
     def connect(self):
         """Conecta ao processo"""
+        if self._source is not None:
+            return True
         if not PYMEM_AVAILABLE:
             return False
         try:
@@ -85,88 +100,87 @@ class PatternScanner:
                 self.pm.close_process()
             except:
                 pass
+            self._source = None
         self.pm = None
     
     def _get_memory_regions(self):
         """Obtém regiões de memória válidas (apenas heap)"""
         regions = []
-        address = 0
-        mbi = MEMORY_BASIC_INFORMATION()
-        mbi_size = ctypes.sizeof(mbi)
-        
-        VirtualQueryEx = ctypes.windll.kernel32.VirtualQueryEx
-        
-        while address < 0x7FFFFFFFFFFF:
-            result = VirtualQueryEx(
-                self.pm.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(mbi),
-                mbi_size
-            )
-            
-            if result == 0:
-                break
-            
-            base = mbi.BaseAddress
-            size = mbi.RegionSize
+        
+        for region in self.source.region_map.regions():
+            base = region.base
+            size = region.size
             
-            if base is None or size is None or size == 0:
-                address += 0x10000
+            if not base or not size:
                 continue
             
             # Filtra para heap (endereços altos, tamanho razoável)
             if base >= 0x100000000 and 0x10000 <= size <= 100 * 1024 * 1024:
-                if (mbi.State == MEM_COMMIT and 
-                    mbi.Protect in [PAGE_READWRITE, PAGE_READONLY]):
+                if (region.state == MEM_COMMIT and 
+                    region.protect in [PAGE_READWRITE, PAGE_READONLY]):
                     regions.append((base, size))
-            
-            address = base + size
         
         return regions
     
-    def create_pattern_from_address(self, hp_addr, pattern_size=32):
+    # Amostras da estrutura usadas no padrao: (nome, offset relativo ao HP)
+    PATTERN_SAMPLES = [
+        ("after_hp_max", 0x10),   # logo apos HP_MAX
+        ("mid_struct", 0x280),    # meio da estrutura (flags, valores pequenos)
+        ("before_mp", 0x600),     # antes do MP
+    ]
+    
+    def create_pattern_from_address(self, hp_addr, pattern_size=32, snapshots=3, interval=0.2):
         """
         Cria um padrão a partir de um endereço conhecido de HP.
         
-        IMPORTANTE: Usa bytes ENTRE HP_MAX e MP que são mais estáveis
-        (não contêm ponteiros que mudam a cada execução)
+        Cada amostra é lida `snapshots` vezes (com `interval` segundos entre
+        as leituras) e vira uma AOB com curingas (memory/multi_pattern.py):
+        - dwords que mudaram entre as leituras (contadores, timers)
+        - qwords que apontam para memória commitada (ponteiros mudam a cada
+          execução e quebravam o padrão exato da versão 2)
+        
+        pattern_size: bytes lidos por amostra (com curingas, amostras
+                      maiores ainda deixam trechos literais suficientes)
         """
         try:
-            # Lê a estrutura entre HP_MAX e MP
-            # Offset 0x10 até 0x620 (MP) - pega uma amostra do meio
-            # Bytes no offset 0x280-0x2A0 parecem ter dados estáveis
+            reads = []
+            for i in range(max(1, snapshots)):
+                if i:
+                    time.sleep(interval)
+                reads.append([self.source.read_bytes(hp_addr + offset, pattern_size)
+                              for _, offset in self.PATTERN_SAMPLES])
             
-            # Vamos usar múltiplas amostras da estrutura
-            samples = []
+            # So memoria commitada conta como destino de ponteiro: o mapa
+            # tambem tem regioes MEM_FREE/MEM_RESERVE, e com elas quase
+            # qualquer par de ints (ex: HP/HP_MAX) viraria curinga
+            is_mapped = self.source.region_map.is_committed
             
-            # Amostra 1: Bytes após HP_MAX (offset 0x10-0x30)
-            sample1_offset = 0x10
-            sample1 = self.pm.read_bytes(hp_addr + sample1_offset, 16)
-            samples.append(("after_hp_max", sample1_offset, sample1))
+            samples = []
+            masked_total = 0
+            for index, (name, offset) in enumerate(self.PATTERN_SAMPLES):
+                values = auto_mask([read[index] for read in reads], hp_addr + offset, is_mapped)
+                masked_total += values.count(None)
+                
+                # Amostra quase toda curinga nao identifica nada
+                if literal_count(values) < MIN_LITERAL_BYTES:
+                    continue
+                samples.append({"name": name, "offset": offset, "aob": format_aob(values)})
             
-            # Amostra 2: Bytes no meio da estrutura (offset 0x280-0x290)
-            # Esta região geralmente contém flags e valores pequenos
-            sample2_offset = 0x280
-            sample2 = self.pm.read_bytes(hp_addr + sample2_offset, 16)
-            samples.append(("mid_struct", sample2_offset, sample2))
+            if not samples:
+                print("[PATTERN] Todas as amostras mudam entre leituras, padrão não criado")
+                return None
             
-            # Amostra 3: Bytes antes do MP (offset 0x600-0x610)
-            sample3_offset = 0x600
-            sample3 = self.pm.read_bytes(hp_addr + sample3_offset, 16)
-            samples.append(("before_mp", sample3_offset, sample3))
+            print(f"[PATTERN] {len(samples)} amostras, {masked_total} bytes mascarados")
             
             # Salva informações
-            hp = self.pm.read_int(hp_addr)
-            hp_max = self.pm.read_int(hp_addr + self.OFFSET_HP_MAX)
-            mp = self.pm.read_int(hp_addr + self.OFFSET_MP)
-            mp_max = self.pm.read_int(hp_addr + self.OFFSET_MP_MAX)
+            hp = self.source.read_int(hp_addr)
+            hp_max = self.source.read_int(hp_addr + self.OFFSET_HP_MAX)
+            mp = self.source.read_int(hp_addr + self.OFFSET_MP)
+            mp_max = self.source.read_int(hp_addr + self.OFFSET_MP_MAX)
             
             pattern_data = {
-                "version": 2,
-                "samples": [
-                    {"name": name, "offset": offset, "bytes": list(data)}
-                    for name, offset, data in samples
-                ],
+                "version": 3,
+                "samples": samples,
                 "verified_values": {
                     "hp": hp,
                     "hp_max": hp_max,
@@ -207,124 +221,70 @@ class PatternScanner:
         except:
             return None
     
+    def load_patterns(self):
+        """
+        Carrega todas as assinaturas salvas. O arquivo pode ter um padrão
+        (dict), uma lista de padrões ou {"signatures": [...]}.
+        """
+        return self._as_pattern_list(self.load_pattern())
+    
+    @staticmethod
+    def _as_pattern_list(pattern_data):
+        if not pattern_data:
+            return []
+        if isinstance(pattern_data, dict):
+            return pattern_data.get("signatures", [pattern_data])
+        return list(pattern_data)
+    
     def find_by_pattern(self, pattern_data):
         """
-        Encontra a estrutura do player usando o padrão salvo.
+        Encontra a estrutura do player usando o(s) padrão(ões) salvo(s).
         
-        Versão 2: Usa amostras internas da estrutura (mais estável)
+        pattern_data: um padrão (versão 1, 2...) ou lista de padrões.
+        Todas as assinaturas são buscadas sobre a MESMA leitura da memória
+        (memory/multi_pattern.py: uma passada de bytes.find por âncora
+        distinta em cada janela) e todas as amostras, mais a estrutura
+        HP..MP_MAX, são conferidas no buffer já lido.
+        
+        Com várias assinaturas batendo, vence a de versão mais nova.
+        Padrões exatos da versão 2 ganham uma variante com os ponteiros
+        mascarados (prioridade menor), buscada na mesma leitura.
         """
-        if not pattern_data:
+        patterns = self._as_pattern_list(pattern_data)
+        if not patterns:
             return None
         
-        # Verifica versão do padrão
-        version = pattern_data.get("version", 1)
-        
-        if version == 1:
-            # Padrão antigo (prefixo) - menos confiável
-            return self._find_by_prefix_pattern(pattern_data)
+        variants = [pointer_masked(pattern) for pattern in patterns]
+        patterns = patterns + [variant for variant in variants if variant]
         
-        # Versão 2: Usa amostras internas
-        samples = pattern_data.get("samples", [])
-        if not samples:
+        matcher = MultiPatternMatcher.from_patterns(
+            patterns, reach=STRUCT_SPAN, validate=self._validate_structure_buffer)
+        if not matcher.signatures:
             return None
         
-        print(f"[PATTERN] Buscando com {len(samples)} amostras...")
+        names = ", ".join(f"{sig.name} ({len(sig.runs)} trechos)" for sig in matcher.signatures)
+        print(f"[PATTERN] Buscando {len(matcher.signatures)} assinatura(s): {names}")
         
         regions = self._get_memory_regions()
-        candidates = []
-        
-        # Usa a primeira amostra para busca inicial
-        first_sample = samples[0]
-        search_bytes = bytes(first_sample["bytes"])
-        search_offset = first_sample["offset"]
         
+        # Le cada regiao em janelas com buffer reutilizavel (memoria limitada)
+        stream = StreamReader(self.source, overlap=matcher.overlap)
+        matches = []
         for base, size in regions:
-            try:
-                data = self.pm.read_bytes(base, size)
-                
-                pos = 0
-                while True:
-                    pos = data.find(search_bytes, pos)
-                    if pos == -1:
-                        break
-                    
-                    # Calcula HP addr (sample está em hp_addr + offset)
-                    hp_addr = base + pos - search_offset
-                    
-                    # Verifica outras amostras
-                    all_match = True
-                    for sample in samples[1:]:
-                        try:
-                            expected = bytes(sample["bytes"])
-                            actual = self.pm.read_bytes(hp_addr + sample["offset"], len(expected))
-                            if actual != expected:
-                                all_match = False
-                                break
-                        except:
-                            all_match = False
-                            break
-                    
-                    if all_match:
-                        # Valida estrutura
-                        if self._validate_structure(hp_addr):
-                            candidates.append(hp_addr)
-                    
-                    pos += 1
-                    
-            except:
-                continue
+            matches.extend(stream.scan(base, size, matcher.scan))
         
-        print(f"[PATTERN] Encontrados {len(candidates)} candidatos")
-        
-        if candidates:
-            hp_addr = candidates[0]
-            return {
-                "hp": hp_addr,
-                "hp_max": hp_addr + self.OFFSET_HP_MAX,
-                "mp": hp_addr + self.OFFSET_MP,
-                "mp_max": hp_addr + self.OFFSET_MP_MAX
-            }
-        
-        return None
-    
-    def _find_by_prefix_pattern(self, pattern_data):
-        """Busca usando padrão de prefixo (versão 1, menos confiável)"""
-        prefix_bytes = bytes(pattern_data.get("prefix_bytes", []))
-        prefix_size = pattern_data.get("prefix_size", 64)
-        hp_offset = pattern_data.get("hp_offset_from_prefix", prefix_size)
-        
-        if not prefix_bytes:
-            return None
-        
-        print(f"[PATTERN] Buscando padrão de {len(prefix_bytes)} bytes (v1)...")
-        
-        regions = self._get_memory_regions()
         candidates = []
-        
-        for base, size in regions:
-            try:
-                data = self.pm.read_bytes(base, size)
-                
-                pos = 0
-                while True:
-                    pos = data.find(prefix_bytes, pos)
-                    if pos == -1:
-                        break
-                    
-                    hp_addr = base + pos + hp_offset
-                    
-                    if self._validate_structure(hp_addr):
-                        candidates.append(hp_addr)
-                    
-                    pos += 1
-                    
-            except:
-                continue
+        for match in matches:
+            if match["hp"] not in candidates:
+                candidates.append(match["hp"])
         
         print(f"[PATTERN] Encontrados {len(candidates)} candidatos")
+        self.last_candidates = candidates
+        self.last_matches = matches
         
         if candidates:
-            hp_addr = candidates[0]
+            best = max(matches, key=lambda m: (m["version"], m["priority"], -m["hp"]))
+            hp_addr = best["hp"]
             return {
                 "hp": hp_addr,
                 "hp_max": hp_addr + self.OFFSET_HP_MAX,
@@ -337,29 +297,40 @@ class PatternScanner:
     def _validate_structure(self, hp_addr):
         """Valida se o endereço contém estrutura válida de player"""
         try:
-            hp = self.pm.read_int(hp_addr)
-            hp_max = self.pm.read_int(hp_addr + self.OFFSET_HP_MAX)
-            mp = self.pm.read_int(hp_addr + self.OFFSET_MP)
-            mp_max = self.pm.read_int(hp_addr + self.OFFSET_MP_MAX)
-            
-            # Validações
-            if hp <= 0 or hp > 500000:
-                return False
-            if hp_max < 100 or hp_max > 500000:
-                return False
-            if hp > hp_max:
-                return False
-            if mp < 0 or mp_max < 30:
-                return False
-            if mp_max > 0 and mp > mp_max:
-                return False
-            if mp_max > 500000:
-                return False
-            
-            return True
+            hp = self.source.read_int(hp_addr)
+            hp_max = self.source.read_int(hp_addr + self.OFFSET_HP_MAX)
+            mp = self.source.read_int(hp_addr + self.OFFSET_MP)
+            mp_max = self.source.read_int(hp_addr + self.OFFSET_MP_MAX)
+            return self._check_structure(hp, hp_max, mp, mp_max)
         except:
             return False
     
+    def _validate_structure_buffer(self, data, hp_pos):
+        """Mesma validação de _validate_structure, lendo do buffer"""
+        hp, = struct.unpack_from('<i', data, hp_pos)
+        hp_max, = struct.unpack_from('<i', data, hp_pos + self.OFFSET_HP_MAX)
+        mp, = struct.unpack_from('<i', data, hp_pos + self.OFFSET_MP)
+        mp_max, = struct.unpack_from('<i', data, hp_pos + self.OFFSET_MP_MAX)
+        return self._check_structure(hp, hp_max, mp, mp_max)
+    
+    @staticmethod
+    def _check_structure(hp, hp_max, mp, mp_max):
+        """Regras de uma estrutura válida de player"""
+        if hp <= 0 or hp > 500000:
+            return False
+        if hp_max < 100 or hp_max > 500000:
+            return False
+        if hp > hp_max:
+            return False
+        if mp < 0 or mp_max < 30:
+            return False
+        if mp_max > 0 and mp > mp_max:
+            return False
+        if mp_max > 500000:
+            return False
+        
+        return True
+    
     def find_with_values(self, hp_value, mp_value=None):
         """
         Encontra a estrutura usando valores conhecidos de HP/MP.
@@ -375,31 +346,30 @@ class PatternScanner:
         candidates = []
         scanned = 0
         
+        # Procura HP em janelas com buffer reutilizavel (memoria limitada)
+        hp_bytes = struct.pack('<i', hp_value)
+        stream = StreamReader(self.source, overlap=len(hp_bytes) - 1)
+        
         for base, size in regions:
-            try:
-                data = self.pm.read_bytes(base, size)
-                scanned += 1
-                
-                if scanned % 50 == 0:
-                    print(f"[PATTERN] Escaneado {scanned}/{len(regions)} regiões...", end="\r")
-                
-                # Procura HP na região
-                hp_bytes = struct.pack('<i', hp_value)
-                pos = 0
-                
-                while True:
-                    pos = data.find(hp_bytes, pos)
-                    if pos == -1:
-                        break
-                    
-                    hp_addr = base + pos
+            scanned += 1
+            
+            if scanned % 50 == 0:
+                print(f"[PATTERN] Escaneado {scanned}/{len(regions)} regiões...", end="\r")
+            
+            # Depois de um match a busca continua 4 bytes a frente (mesmo entre janelas)
+            next_addr = base
+            
+            for address, data, owned in stream.chunks(base, size):
+                pos = data.find(hp_bytes, max(0, next_addr - address))
+                while pos != -1 and pos < owned:
+                    hp_addr = address + pos
                     
                     # Valida estrutura
                     try:
-                        hp = self.pm.read_int(hp_addr)
-                        hp_max = self.pm.read_int(hp_addr + self.OFFSET_HP_MAX)
-                        mp = self.pm.read_int(hp_addr + self.OFFSET_MP)
-                        mp_max = self.pm.read_int(hp_addr + self.OFFSET_MP_MAX)
+                        hp = self.source.read_int(hp_addr)
+                        hp_max = self.source.read_int(hp_addr + self.OFFSET_HP_MAX)
+                        mp = self.source.read_int(hp_addr + self.OFFSET_MP)
+                        mp_max = self.source.read_int(hp_addr + self.OFFSET_MP_MAX)
                         
                         # Verifica valores
                         if hp == hp_value:
@@ -416,13 +386,12 @@ class PatternScanner:
                     except:
                         pass
                     
-                    pos += 4
-                    
-            except:
-                continue
+                    next_addr = hp_addr + 4
+                    pos = data.find(hp_bytes, pos + 4)
         
         print()
         print(f"[PATTERN] Encontrados {len(candidates)} candidatos")
+        self.last_candidates = [c["addr"] for c in candidates]
         
         if candidates:
             # Mostra candidatos
@@ -455,10 +424,10 @@ class PatternScanner:
             return cached
         
         # Tenta padrão
-        pattern = self.load_pattern()
-        if pattern:
+        patterns = self.load_patterns()
+        if patterns:
             print("[PATTERN] Tentando pattern matching...")
-            offsets = self.find_by_pattern(pattern)
+            offsets = self.find_by_pattern(patterns)
             if offsets:
                 self._save_cache(offsets)
                 return offsets
@@ -573,10 +542,10 @@ def main():
         print("  ✓ ENCONTRADO!")
         print("=" * 50)
         
-        hp = scanner.pm.read_int(offsets["hp"])
-        hp_max = scanner.pm.read_int(offsets["hp_max"])
-        mp = scanner.pm.read_int(offsets["mp"])
-        mp_max = scanner.pm.read_int(offsets["mp_max"])
+        hp = scanner.source.read_int(offsets["hp"])
+        hp_max = scanner.source.read_int(offsets["hp_max"])
+        mp = scanner.source.read_int(offsets["mp"])
+        mp_max = scanner.source.read_int(offsets["mp_max"])
         
         print(f"  HP: {hp}/{hp_max} ({int(hp/hp_max*100)}%)")
         print(f"  MP: {mp}/{mp_max} ({int(mp/mp_max*100)}%)")
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Player State - Barramento de estado do player (um leitor, varios consumidores)
+
+Antes cada thread lia a memoria por conta propria: o _update_loop da GUI
+chamava get_player_hp_percent()/get_player_mp_percent() a cada 100ms e o
+HealingModuleV2 tinha o proprio sampler, todos mexendo no _cache do
+TibiaMemoryReader.
+
+O PlayerStateBus:
+1. Roda UMA thread produtora que le HP, HP_MAX, MP, MP_MAX e level em
+   uma leitura (TibiaMemoryReader.read_player), no ritmo de um
+   AdaptivePoller: TIMERS['state_bus'] enquanto os valores mudam, backoff
+   ate ADAPTIVE_POLLING['state_bus_max_interval'] parado e pausa so com o
+   client desconectado. O teto e menor que o dos outros readers porque o
+   healing consome o bus: e a latencia maxima para ver o primeiro dano.
+   Minimizado o bus continua lendo (o healing cura com o Tibia minimizado)
+2. Publica snapshots imutaveis (PlayerState, com timestamp e seq) so
+   quando algum valor muda
+3. A publicacao e a troca de uma referencia (atomica no CPython): quem
+   so quer o ultimo estado le bus.latest sem lock e sem syscall
+4. Quem precisa reagir a mudancas (healing) espera em wait_for_change()
+   (Condition), sem polling
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from memory.adaptive_poll import AdaptivePoller
+
+try:
+    from config import ADAPTIVE_POLLING, TIMERS
+except ImportError:
+    ADAPTIVE_POLLING = {}
+    TIMERS = {}
+
+
+class PlayerState(namedtuple('PlayerState', 'hp hp_max mp mp_max level timestamp seq connected')):
+    """
+    Snapshot imutavel do player.
+
+    timestamp: time.perf_counter() da leitura que viu estes valores
+    seq: numero da publicacao (cresce a cada mudanca)
+    connected: False quando o reader esta desconectado / sem offsets
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def _percent(value, maximum):
+        if value is None or not maximum or maximum <= 0:
+            return 100
+        return max(0, min(100, int((value / maximum) * 100)))
+
+    @property
+    def hp_percent(self):
+        return self._percent(self.hp, self.hp_max)
+
+    @property
+    def mp_percent(self):
+        return self._percent(self.mp, self.mp_max)
+
+    @property
+    def valid(self):
+        """True se tem HP e HP_MAX lidos"""
+        return self.connected and self.hp is not None and self.hp_max is not None
+
+    def age(self, now=None):
+        """Segundos desde a leitura"""
+        return (time.perf_counter() if now is None else now) - self.timestamp
+
+
+EMPTY_STATE = PlayerState(None, None, None, None, None, 0.0, 0, False)
+
+
+class PlayerStateBus:
+    """
+    Uso:
+        bus = PlayerStateBus(memory)
+        bus.start()
+
+        state = bus.latest                      # GUI: ultimo estado, sem syscall
+        state = bus.wait_for_change(state.seq)  # healing: dorme ate mudar
+    """
+
+    def __init__(self, memory_reader, interval=None, max_interval=None):
+        """
+        memory_reader: TibiaMemoryReader (conectado ou nao)
+        interval: segundos entre leituras com valores mudando
+                  (padrao: TIMERS['state_bus'])
+        max_interval: teto do backoff com valores estaveis
+                      (padrao: ADAPTIVE_POLLING['state_bus_max_interval'])
+        """
+        self.memory = memory_reader
+        interval = interval or TIMERS.get("state_bus", 5) / 1000.0
+        max_interval = max_interval or ADAPTIVE_POLLING.get("state_bus_max_interval", 40) / 1000.0
+        self._poller = AdaptivePoller("STATE", min_interval=interval, base_interval=interval,
+                                      max_interval=max(interval, max_interval),
+                                      watch_window=False)
+
+        self._state = EMPTY_STATE
+        self._changed = threading.Condition()
+
+        self.running = False
+        self._thread = None
+
+        # Estatisticas
+        self.samples = 0
+        self.published = 0
+        self.last_sample = 0.0
+
+    # ============================================
+    # CONSUMIDORES
+    # ============================================
+
+    @property
+    def interval(self):
+        """Intervalo atual entre leituras (segundos)"""
+        return self._poller.interval
+
+    @property
+    def latest(self):
+        """Ultimo PlayerState publicado (leitura de uma referencia)"""
+        return self._state
+
+    def wait_for_change(self, seq, timeout=None):
+        """
+        Espera um estado com seq diferente de `seq` (ou timeout / wake()).
+        Retorna o ultimo estado publicado.
+        """
+        with self._changed:
+            if self._state.seq == seq:
+                self._changed.wait(timeout)
+            return self._state
+
+    def wake(self):
+        """Acorda quem esta em wait_for_change sem publicar nada"""
+        with self._changed:
+            self._changed.notify_all()
+
+    # ============================================
+    # PRODUTOR
+    # ============================================
+
+    def start(self):
+        """Inicia a thread produtora (nao faz nada se ja estiver rodando)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="player-state", daemon=True)
+        self._thread.start()
+        poller = self._poller
+        print(f"[STATE] Leitor iniciado ({poller.min_interval*1000:.0f}-"
+              f"{poller.max_interval*1000:.0f}ms)")
+
+    def stop(self):
+        """Para a thread produtora"""
+        self.running = False
+        self.wake()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        print("[STATE] Leitor parado")
+
+    def publish(self, hp, hp_max, mp, mp_max, level, connected=True, timestamp=None):
+        """
+        Publica um novo snapshot se algum valor mudou.
+        Retorna o estado atual (novo ou o anterior).
+        """
+        current = self._state
+        if (hp, hp_max, mp, mp_max, level, connected) == (
+                current.hp, current.hp_max, current.mp, current.mp_max,
+                current.level, current.connected):
+            return current
+
+        state = PlayerState(hp, hp_max, mp, mp_max, level,
+                            time.perf_counter() if timestamp is None else timestamp,
+                            current.seq + 1, connected)
+
+        with self._changed:
+            self._state = state
+            self.published += 1
+            self._changed.notify_all()
+        return state
+
+    def _disconnected(self):
+        current = self._state
+        self.publish(current.hp, current.hp_max, current.mp, current.mp_max,
+                     current.level, connected=False)
+
+    def _run(self):
+        poller = self._poller
+        last_check = 0
+
+        while self.running:
+            memory = self.memory
+            if not memory or not memory.connected or not memory.has_offsets():
+                self._disconnected()
+                time.sleep(0.1)
+                continue
+
+            if not poller.due():
+                time.sleep(poller.remaining())
+                continue
+
+            # is_connected faz uma leitura: verifica so 1x por segundo
+            now = time.perf_counter()
+            if now - last_check > 1.0:
+                last_check = now
+                if not memory.is_connected():
+                    self._disconnected()
+                    poller.pause("desconectado")
+                    continue
+
+            start = poller.begin()
+            try:
+                values = memory.read_player()
+            except Exception:
+                values = None
+
+            self.samples += 1
+            self.last_sample = now
+
+            if values and values["hp"] is not None and values["hp_max"] is not None:
+                poller.observe((values["hp"], values["hp_max"], values["mp"],
+                                values["mp_max"], values["level"]), start)
+                self.publish(values["hp"], values["hp_max"], values["mp"],
+                             values["mp_max"], values["level"], timestamp=now)
+
+    def stats(self, reset=False):
+        """
+        Dict com leituras feitas, snapshots publicados, idade do ultimo e
+        a taxa/intervalo do poller (ver AdaptivePoller.stats)
+        """
+        result = {
+            "samples": self.samples,
+            "published": self.published,
+            "seq": self._state.seq,
+            "age_ms": self._state.age() * 1000 if self._state.seq else None,
+        }
+        result.update(self._poller.stats(reset))
+        return result
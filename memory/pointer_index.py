@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Pointer Index - Indice reverso de ponteiros (valor -> endereco)
+
+Antes o PointerScanner.find_pointer_chain chamava scan_for_pointers uma
+vez para o nivel 1 e de novo para cada um dos ate 100 ponteiros de nivel
+1: ate 101 varreduras completas da memoria com struct.unpack por qword,
+e o find_pointers.py fazia o mesmo no nivel 2.
+
+O PointerIndex:
+1. Le a memoria UMA vez (StreamReader) e ve cada janela como um array de
+   qwords alinhados em 8 (numpy.frombuffer, sem copia)
+2. Guarda so os qwords cujo valor cai dentro de uma regiao commitada
+   (searchsorted sobre as bases/fins das regioes)
+3. Ordena os pares (valor, endereco do ponteiro) pelo valor
+
+"Quem aponta para [alvo - max_offset, alvo]?" vira duas buscas binarias,
+entao cada nivel de uma cadeia de profundidade N custa microssegundos.
+
+Memoria: 16 bytes por ponteiro valido encontrado.
+"""
+
+import bisect
+import struct
+import time
+
+from memory.stream_reader import StreamReader
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Windows API
+MEM_COMMIT = 0x1000
+PAGE_READWRITE = 0x04
+PAGE_READONLY = 0x02
+PAGE_EXECUTE_READ = 0x20
+PAGE_EXECUTE_READWRITE = 0x40
+
+# Mesmo filtro do PointerScanner.scan_for_pointers
+POINTER_PROTECT = (PAGE_READWRITE, PAGE_READONLY, PAGE_EXECUTE_READ, PAGE_EXECUTE_READWRITE)
+MAX_INDEX_REGION = 50 * 1024 * 1024
+
+
+class PointerIndex:
+    """
+    Uso:
+        index = PointerIndex.build(source)
+        for ptr_addr, offset in index.pointers_to(hp_addr, max_offset=0x1000):
+            ...   # *(ptr_addr) + offset == hp_addr
+    """
+
+    def __init__(self, values, addresses):
+        """
+        values: valores dos ponteiros, ordenados
+        addresses: endereco de cada ponteiro (mesma ordem)
+        """
+        self.values = values
+        self.addresses = addresses
+
+        # Estatisticas
+        self.build_seconds = 0.0
+        self.bytes_scanned = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        """Memoria usada pelo indice"""
+        if NUMPY_AVAILABLE and isinstance(self.values, np.ndarray):
+            return self.values.nbytes + self.addresses.nbytes
+        return len(self.values) * 16
+
+    @classmethod
+    def build(cls, source, regions=None, use_numpy=NUMPY_AVAILABLE):
+        """
+        Indexa todos os qwords alinhados que apontam para memoria commitada.
+
+        source: MemorySource
+        regions: lista de (base, size) a varrer (padrao: regioes commitadas
+                 legiveis menores que MAX_INDEX_REGION)
+        """
+        start = time.perf_counter()
+
+        if regions is None:
+            regions = [(r.base, r.size) for r in source.region_map.committed(
+                protect=POINTER_PROTECT, max_size=MAX_INDEX_REGION - 1) if r.base and r.size]
+
+        # Destinos validos: qualquer regiao commitada (inclusive as grandes)
+        targets = sorted((r.base, r.base + r.size) for r in source.region_map.regions()
+                         if r.state == MEM_COMMIT and r.size)
+
+        if use_numpy and NUMPY_AVAILABLE:
+            index, scanned = cls._build_numpy(source, regions, targets)
+        else:
+            index, scanned = cls._build_python(source, regions, targets)
+
+        index.build_seconds = time.perf_counter() - start
+        index.bytes_scanned = scanned
+        print(f"[POINTER] Indice: {len(index)} ponteiros em {scanned / 1024 / 1024:.0f} MB "
+              f"({index.build_seconds:.2f}s, {index.nbytes / 1024 / 1024:.1f} MB)")
+        return index
+
+    @classmethod
+    def _build_numpy(cls, source, regions, targets):
+        starts = np.array([start for start, _ in targets], dtype=np.uint64)
+        ends = np.array([end for _, end in targets], dtype=np.uint64)
+
+        values = []
+        addresses = []
+        scanned = 0
+        stream = StreamReader(source)
+
+        for base, size in regions:
+            for address, data, owned in stream.chunks(base, size):
+                # Qwords alinhados em 8 (as janelas comecam em pagina)
+                skip = (-address) % 8
+                count = (owned - skip) // 8
+                if count <= 0:
+                    continue
+                scanned += owned
+
+                qwords = np.frombuffer(data, dtype='<u8', count=count, offset=skip)
+
+                # Regiao que contem cada valor: ultima base <= valor
+                slot = np.searchsorted(starts, qwords, side='right') - 1
+                keep = slot >= 0
+                keep &= qwords < ends[np.maximum(slot, 0)]
+
+                hits = np.flatnonzero(keep)
+                if hits.size:
+                    values.append(qwords[hits])
+                    addresses.append(np.uint64(address + skip) + hits.astype(np.uint64) * np.uint64(8))
+
+        if not values:
+            return cls(np.empty(0, np.uint64), np.empty(0, np.uint64)), scanned
+
+        values = np.concatenate(values)
+        addresses = np.concatenate(addresses)
+        order = np.argsort(values, kind='stable')
+        return cls(values[order], addresses[order]), scanned
+
+    @classmethod
+    def _build_python(cls, source, regions, targets):
+        """Fallback sem NumPy (mesmo resultado, bem mais lento)"""
+        starts = [start for start, _ in targets]
+        pairs = []
+        scanned = 0
+        stream = StreamReader(source)
+
+        for base, size in regions:
+            for address, data, owned in stream.chunks(base, size):
+                skip = (-address) % 8
+                count = (owned - skip) // 8
+                if count <= 0:
+                    continue
+                scanned += owned
+
+                view = memoryview(data)[skip:skip + count * 8]
+                for i, (value,) in enumerate(struct.iter_unpack('<Q', view)):
+                    slot = bisect.bisect_right(starts, value) - 1
+                    if slot >= 0 and value < targets[slot][1]:
+                        pairs.append((value, address + skip + i * 8))
+
+        pairs.sort()
+        return cls([value for value, _ in pairs], [addr for _, addr in pairs]), scanned
+
+    def _range(self, low, high):
+        """Posicoes dos ponteiros com low <= valor <= high"""
+        if NUMPY_AVAILABLE and isinstance(self.values, np.ndarray):
+            first = int(np.searchsorted(self.values, np.uint64(low), side='left'))
+            last = int(np.searchsorted(self.values, np.uint64(high), side='right'))
+        else:
+            first = bisect.bisect_left(self.values, low)
+            last = bisect.bisect_right(self.values, high)
+        return first, last
+
+    def pointers_to(self, target_address, max_offset=0x2000):
+        """
+        Mesmo resultado de PointerScanner.scan_for_pointers (restrito a
+        ponteiros para memoria commitada): lista de (endereco_do_ponteiro,
+        offset) com *(endereco_do_ponteiro) + offset == target_address,
+        0 <= offset < max_offset, ordenada por endereco.
+        """
+        low = max(0, target_address - max_offset + 1)
+        first, last = self._range(low, target_address)
+
+        pointers = [(int(self.addresses[i]), target_address - int(self.values[i]))
+                    for i in range(first, last)]
+        pointers.sort()
+        return pointers
+
+    def exact(self, value):
+        """Enderecos que guardam exatamente `value`"""
+        return [addr for addr, _ in self.pointers_to(value, max_offset=1)]
+
+
+def find_chains(index, target_address, module_base, module_size, max_depth=3,
+                max_branches=5000, first_level_only=True):
+    """
+    Cadeias de ponteiros estaticas (dentro do modulo) ate target_address.
+
+    Busca em largura sobre o indice: cada nivel e uma busca binaria por
+    alvo. Nivel 1 aceita offsets ate 0x1000 (HP dentro de uma estrutura
+    grande), os niveis acima ate 0x100 (campos proximos).
+
+    max_branches: ponteiros dinamicos seguidos por nivel
+    first_level_only: para no primeiro nivel que tiver cadeias
+
+    Retorna dicts {type, base_offset, offsets, test_addr} com
+    module_base + base_offset -> offsets[0] -> ... -> offsets[-1] = alvo.
+    """
+    chains = []
+
+    # (endereco alvo, offsets dele ate o alvo final)
+    frontier = [(target_address, [])]
+    seen = {target_address}
+
+    for depth in range(1, max_depth + 1):
+        max_offset = 0x1000 if depth == 1 else 0x100
+        next_frontier = []
+
+        for target, offsets in frontier:
+            for ptr_addr, offset in index.pointers_to(target, max_offset):
+                chain_offsets = [offset] + offsets
+
+                if module_base <= ptr_addr < module_base + module_size:
+                    chains.append({
+                        "type": "direct" if depth == 1 else f"level{depth}",
+                        "base_offset": ptr_addr - module_base,
+                        "offsets": chain_offsets,
+                        "test_addr": ptr_addr
+                    })
+                elif ptr_addr not in seen and len(next_frontier) < max_branches:
+                    seen.add(ptr_addr)
+                    next_frontier.append((ptr_addr, chain_offsets))
+
+        if chains and first_level_only:
+            break
+
+        if not next_frontier:
+            break
+
+        frontier = next_frontier
+        if depth < max_depth:
+            print(f"[POINTER] Procurando cadeias de nivel {depth + 1} "
+                  f"({len(frontier)} ponteiros)...")
+
+    return chains
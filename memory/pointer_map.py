@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Pointer Map - Mapas de ponteiros em disco e intersecao de cadeias
+
+Cadeias estaticas (client.exe + base_offset -> offsets -> HP) sao o unico
+jeito de achar o player que sobrevive ao ASLR, mas uma cadeia que funciona
+em uma sessao pode ser coincidencia. O PointerScanner nao guardava nada
+entre execucoes.
+
+Fluxo:
+1. Em cada sessao (com o HP conhecido) o PointerScanner grava um mapa:
+   o PointerIndex inteiro + base/tamanho do modulo + endereco do HP
+2. Depois de alguns reinicios do client, intersect_chains busca as
+   cadeias em cada mapa e fica so com as que aparecem em TODOS
+   (base_offset relativo ao modulo, entao comparaveis entre sessoes)
+3. As sobreviventes vao para pointer_chains.json, que o
+   TibiaMemoryReader.connect resolve com meia duzia de leituras
+
+pointer_chains.json e o unico lugar onde cadeias ficam salvas. Ordem =
+precedencia: as cadeias cruzadas entre sessoes (save_chains, que
+reescreve o arquivo) vem primeiro; a cadeia que o reader acha sozinho
+depois de um scan (uma sessao so) entra no fim com add_chain.
+
+Formato do arquivo (.pmap, little-endian):
+    header: magic "PMAP", versao, module_base, module_size, alvo, count
+    valores:   count x uint64 (ordenados)
+    enderecos: count x uint64 (mesma ordem)
+Os arrays ficam alinhados em 8 e sao abertos com mmap, sem copiar.
+
+Uso:
+    python -m memory.pointer_map pointer_maps/*.pmap --depth 4
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+
+from memory.pointer_index import PointerIndex, find_chains, NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+
+MAGIC = b"PMAP"
+FORMAT_VERSION = 1
+
+# magic, versao, module_base, module_size, alvo, count
+_HEADER = struct.Struct('<4sIQQQQ')
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+MAPS_DIR = os.path.join(ROOT, "pointer_maps")
+CHAINS_FILE = os.path.join(ROOT, "pointer_chains.json")
+
+
+class PointerMap:
+    """
+    Mapa de uma sessao: indice de ponteiros + modulo + alvo (HP)
+    """
+
+    def __init__(self, index, module_base, module_size, target, path=None):
+        self.index = index
+        self.module_base = module_base
+        self.module_size = module_size
+        self.target = target
+        self.path = path
+        self._mmap = None
+
+    def chains(self, max_depth=3, max_branches=5000):
+        """Todas as cadeias estaticas ate o alvo (todos os niveis)"""
+        return find_chains(self.index, self.target, self.module_base, self.module_size,
+                           max_depth, max_branches, first_level_only=False)
+
+    def close(self):
+        if self._mmap is not None:
+            self.index = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Ainda ha views do NumPy vivas; o GC fecha depois
+                pass
+            self._mmap = None
+
+
+def save_pointer_map(path, index, module_base, module_size, target):
+    """Grava um PointerIndex como .pmap"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, module_base, module_size,
+                             target, len(index)))
+        if NUMPY_AVAILABLE and isinstance(index.values, np.ndarray):
+            f.write(index.values.astype('<u8', copy=False).tobytes())
+            f.write(index.addresses.astype('<u8', copy=False).tobytes())
+        else:
+            array('Q', index.values).tofile(f)
+            array('Q', index.addresses).tofile(f)
+
+    return path
+
+
+def load_pointer_map(path):
+    """Abre um .pmap (mmap + numpy.frombuffer quando disponivel)"""
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Mapa truncado: {path}")
+
+        magic, version, module_base, module_size, target, count = _HEADER.unpack(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Formato de mapa desconhecido: {path}")
+
+        if NUMPY_AVAILABLE:
+            if not count:
+                empty = np.empty(0, np.uint64)
+                return PointerMap(PointerIndex(empty, empty), module_base, module_size, target, path)
+
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            values = np.frombuffer(mapped, dtype='<u8', count=count, offset=_HEADER.size)
+            addresses = np.frombuffer(mapped, dtype='<u8', count=count,
+                                      offset=_HEADER.size + count * 8)
+            pointer_map = PointerMap(PointerIndex(values, addresses),
+                                     module_base, module_size, target, path)
+            pointer_map._mmap = mapped
+            return pointer_map
+
+        values = array('Q')
+        addresses = array('Q')
+        values.fromfile(f, count)
+        addresses.fromfile(f, count)
+
+    return PointerMap(PointerIndex(values, addresses), module_base, module_size, target, path)
+
+
+def chain_key(chain):
+    """Identidade de uma cadeia entre sessoes (base relativa ao modulo)"""
+    return (chain["base_offset"], tuple(chain["offsets"]))
+
+
+def intersect_chains(paths, max_depth=3, max_branches=5000):
+    """
+    Cadeias presentes em TODOS os mapas, ordenadas por profundidade.
+    Retorna lista de {"base_offset", "offsets"}.
+    """
+    common = None
+
+    for path in paths:
+        pointer_map = load_pointer_map(path)
+        try:
+            keys = {chain_key(chain) for chain in pointer_map.chains(max_depth, max_branches)}
+        finally:
+            pointer_map.close()
+
+        print(f"[POINTER] {os.path.basename(path)}: {len(keys)} cadeias")
+        common = keys if common is None else common & keys
+        if not common:
+            break
+
+    return [{"base_offset": base_offset, "offsets": list(offsets)}
+            for base_offset, offsets in sorted(common or (), key=lambda k: (len(k[1]), k))]
+
+
+def save_chains(chains, path=CHAINS_FILE, maps=0):
+    """Grava as cadeias estaveis (lidas pelo TibiaMemoryReader.connect)"""
+    data = {
+        "chains": [
+            {"base_offset": hex(chain["base_offset"]),
+             "offsets": [hex(offset) for offset in chain["offsets"]]}
+            for chain in chains
+        ],
+        "maps": maps,
+        "created": time.time()
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def add_chain(chain, path=CHAINS_FILE):
+    """
+    Acrescenta uma cadeia no fim do pointer_chains.json (menor precedencia
+    que as cadeias cruzadas). Retorna False se ja estava no arquivo.
+    """
+    chains = load_chains(path)
+    if chain_key(chain) in {chain_key(known) for known in chains}:
+        return False
+
+    try:
+        with open(path, 'r') as f:
+            maps = json.load(f).get("maps", 0)
+    except (OSError, ValueError, AttributeError):
+        maps = 0
+
+    save_chains(chains + [chain], path, maps)
+    return True
+
+
+def load_chains(path=CHAINS_FILE):
+    """Le pointer_chains.json -> lista de {"base_offset", "offsets"} (ints)"""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+
+    chains = []
+    for chain in data.get("chains", []):
+        try:
+            chains.append({
+                "base_offset": int(chain["base_offset"], 16),
+                "offsets": [int(offset, 16) for offset in chain["offsets"]]
+            })
+        except (KeyError, TypeError, ValueError):
+            continue
+    return chains
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cadeias de ponteiros estaveis entre varias sessoes do client")
+    parser.add_argument('maps', nargs='*',
+                        help='arquivos .pmap (padrao: pointer_maps/*.pmap)')
+    parser.add_argument('--depth', type=int, default=4, help='profundidade maxima')
+    parser.add_argument('--branches', type=int, default=5000,
+                        help='ponteiros dinamicos seguidos por nivel')
+    parser.add_argument('--out', default=CHAINS_FILE, help='arquivo de saida')
+    args = parser.parse_args()
+
+    paths = args.maps or sorted(glob.glob(os.path.join(MAPS_DIR, "*.pmap")))
+    if len(paths) < 2:
+        print("[POINTER] Sao necessarios pelo menos 2 mapas (de sessoes diferentes)")
+        return 1
+
+    start = time.perf_counter()
+    chains = intersect_chains(paths, args.depth, args.branches)
+    print(f"[POINTER] {len(chains)} cadeias estaveis em {len(paths)} mapas "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    for chain in chains[:10]:
+        offsets = " -> ".join(hex(offset) for offset in chain["offsets"])
+        print(f"          client.exe+{hex(chain['base_offset'])} -> {offsets}")
+
+    if chains:
+        save_chains(chains, args.out, len(paths))
+        print(f"[POINTER] Cadeias salvas em {args.out}")
+    return 0 if chains else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
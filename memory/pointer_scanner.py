@@ -10,8 +10,6 @@ A ideia é:
 4. Salvar: base_module + offset = ponteiro -> HP
 """
 
-import ctypes
-from ctypes import wintypes
 import struct
 import time
 import json
@@ -24,6 +22,11 @@ try:
 except ImportError:
     PYMEM_AVAILABLE = False
 
+from memory.sources import PymemSource
+from memory.stream_reader import StreamReader
+from memory.pointer_index import PointerIndex, find_chains, MAX_INDEX_REGION, POINTER_PROTECT
+from memory.pointer_map import MAPS_DIR, save_pointer_map
+
 # Windows API
 MEM_COMMIT = 0x1000
 PAGE_READWRITE = 0x04
@@ -31,17 +34,9 @@ PAGE_READONLY = 0x02
 PAGE_EXECUTE_READ = 0x20
 PAGE_EXECUTE_READWRITE = 0x40
 
-
-class MEMORY_BASIC_INFORMATION(ctypes.Structure):
-    _fields_ = [
-        ("BaseAddress", ctypes.c_void_p),
-        ("AllocationBase", ctypes.c_void_p),
-        ("AllocationProtect", wintypes.DWORD),
-        ("RegionSize", ctypes.c_size_t),
-        ("State", wintypes.DWORD),
-        ("Protect", wintypes.DWORD),
-        ("Type", wintypes.DWORD),
-    ]
+# Indice parcial (find_pointer_chain com radius): regioes ate esta
+# distancia do HP entram, alem do modulo
+CHAIN_INDEX_RADIUS = 0x10000000
 
 
 class PointerScanner:
@@ -49,14 +44,41 @@ class PointerScanner:
     Scanner de ponteiros para encontrar estruturas estáticas
     """
     
-    def __init__(self, process_name="client.exe"):
+    def __init__(self, process_name="client.exe", source=None):
+        """
+        source: MemorySource opcional (dump, /proc/pid/mem...).
+                Se None, conecta ao processo via pymem.
+        """
         self.process_name = process_name
         self.pm = None
+        self._source = source
         self.base_address = None
         self.module_size = None
         
+        # Indice reverso de ponteiros (build_index); None = varredura direta
+        self.index = None
+        # Cobertura do indice: None = memoria inteira, (centro, raio) = parcial
+        self._index_coverage = None
+        # RegionMap.version quando o indice foi montado
+        self._index_version = None
+    
+    @property
+    def source(self):
+        """Backend de memória (MemorySource explícito ou o pymem conectado)"""
+        if self._source is None and self.pm is not None:
+            self._source = PymemSource(self.pm)
+        return self._source
+    
+    @source.setter
+    def source(self, value):
+        self._source = value
+        
     def connect(self):
         """Conecta ao processo"""
+        if self._source is not None:
+            self.base_address, self.module_size = self._source.main_module()
+            return True
+        
         if not PYMEM_AVAILABLE:
             print("[ERRO] pymem não instalado")
             return False
@@ -80,64 +102,117 @@ class PointerScanner:
             print(f"[ERRO] {e}")
             return False
     
+    def build_index(self, rebuild=False, near=None, radius=None):
+        """
+        Monta (uma vez) o índice reverso de ponteiros da memória inteira.
+        Depois disso scan_for_pointers vira busca binária no índice.
+        
+        near/radius: basta um índice parcial (regions_near). O índice
+        existente é reaproveitado só se cobre o pedido e o mapa de regiões
+        não mudou desde que foi montado; senão é remontado.
+        """
+        coverage = None if radius is None else (near, radius)
+        if rebuild or not self._index_valid(coverage):
+            regions = None if coverage is None else self.regions_near(near, radius)
+            self._index_version = self.source.region_map.current_version()
+            self.index = PointerIndex.build(self.source, regions)
+            self._index_coverage = coverage
+        return self.index
+    
+    def _index_valid(self, coverage=None):
+        """
+        True se o índice montado cobre `coverage` (None = memória inteira)
+        e foi montado sobre o mapa de regiões atual
+        """
+        if self.index is None:
+            return False
+        if self.source.region_map.current_version() != self._index_version:
+            # Regiões mudaram: ponteiros novos/velhos
+            return False
+        
+        current = self._index_coverage
+        if current is None:
+            return True
+        if coverage is None:
+            return False
+        (center, radius), (near, wanted) = current, coverage
+        return center - radius <= near - wanted and near + wanted <= center + radius
+    
+    def regions_near(self, address, radius=CHAIN_INDEX_RADIUS):
+        """
+        Regiões de um índice parcial: o módulo (onde a cadeia começa) e as
+        regiões commitadas a até radius bytes de address (objetos do mesmo
+        heap que apontam para o player).
+        """
+        region_map = self.source.region_map
+        spans = [(self.base_address, self.base_address + self.module_size),
+                 (max(0, address - radius), address + radius)]
+        
+        regions = []
+        for start, end in sorted(spans):
+            for region in region_map.committed(start, end, protect=POINTER_PROTECT,
+                                               max_size=MAX_INDEX_REGION - 1):
+                if region.base and (region.base, region.size) not in regions:
+                    regions.append((region.base, region.size))
+        return regions
+    
+    def save_pointer_map(self, hp_address, path=None):
+        """
+        Grava o índice desta sessão (memory/pointer_map.py) para depois
+        cruzar as cadeias de vários reinícios do client.
+        """
+        if path is None:
+            name = time.strftime("session_%Y%m%d_%H%M%S.pmap")
+            path = os.path.join(MAPS_DIR, name)
+        
+        self.build_index()
+        save_pointer_map(path, self.index, self.base_address, self.module_size, hp_address)
+        print(f"[POINTER] Mapa salvo em {path}")
+        return path
+    
     def scan_for_pointers(self, target_address, max_offset=0x2000):
         """
         Procura por ponteiros que apontam para target_address
         
         Retorna lista de (endereço_do_ponteiro, offset)
         onde: *(endereço_do_ponteiro) + offset = target_address
+        
+        Com o índice da memória inteira montado (build_index) não lê a
+        memória de novo; um índice parcial não serve aqui.
         """
+        if self._index_valid():
+            return self.index.pointers_to(target_address, max_offset)
+        
         print(f"[POINTER] Procurando ponteiros para {hex(target_address)}...")
         
         pointers = []
+        stream = StreamReader(self.source, overlap=8)
         
         # Procura em toda a memória por valores que podem ser ponteiros
-        address = 0
-        mbi = MEMORY_BASIC_INFORMATION()
-        mbi_size = ctypes.sizeof(mbi)
-        
-        VirtualQueryEx = ctypes.windll.kernel32.VirtualQueryEx
-        
-        while address < 0x7FFFFFFFFFFF:
-            result = VirtualQueryEx(
-                self.pm.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(mbi),
-                mbi_size
-            )
-            
-            if result == 0:
-                break
+        for region in self.source.region_map.regions():
+            base = region.base
+            size = region.size
             
-            base = mbi.BaseAddress
-            size = mbi.RegionSize
-            
-            if base is None or size is None or size == 0:
-                address += 0x10000
+            if not base or not size:
                 continue
             
-            if (mbi.State == MEM_COMMIT and 
-                mbi.Protect in [PAGE_READWRITE, PAGE_READONLY, PAGE_EXECUTE_READ, PAGE_EXECUTE_READWRITE] and
+            if (region.state == MEM_COMMIT and 
+                region.protect in [PAGE_READWRITE, PAGE_READONLY, PAGE_EXECUTE_READ, PAGE_EXECUTE_READWRITE] and
                 size < 50 * 1024 * 1024):
                 
-                try:
-                    data = self.pm.read_bytes(base, size)
-                    
+                # Janelas com buffer reutilizavel; overlap de 8 bytes = mesmo
+                # conjunto de offsets do loop sobre a regiao inteira
+                for address, data, owned in stream.chunks(base, size):
                     # Procura por ponteiros (8 bytes em 64-bit)
-                    for offset in range(0, len(data) - 8, 8):
-                        ptr_value = struct.unpack('<Q', data[offset:offset+8])[0]
+                    for offset in range(0, min(owned, len(data) - 8), 8):
+                        ptr_value = struct.unpack_from('<Q', data, offset)[0]
                         
                         # Verifica se o ponteiro aponta para perto do target
                         diff = target_address - ptr_value
                         
                         if 0 <= diff < max_offset:
-                            ptr_addr = base + offset
+                            ptr_addr = address + offset
                             pointers.append((ptr_addr, diff))
-                            
-                except:
-                    pass
-            
-            address = base + size
         
         print(f"[POINTER] Encontrados {len(pointers)} ponteiros")
         return pointers
@@ -170,53 +245,25 @@ class PointerScanner:
         
         return static_pointers
     
-    def find_pointer_chain(self, hp_address, max_depth=3):
+    def find_pointer_chain(self, hp_address, max_depth=3, max_branches=5000, radius=None):
         """
         Encontra uma cadeia de ponteiros até o HP
         
         Exemplo: base_module + offset1 -> ptr1 + offset2 -> ptr2 + offset3 -> HP
+        
+        Monta o índice reverso uma vez (build_index) e cada nível vira uma
+        busca binária por alvo. Para no primeiro nível com cadeias estáticas.
+        max_branches: ponteiros dinâmicos seguidos por nível
+        radius: indexa só o módulo e as regiões perto do HP (regions_near),
+                em vez da memória inteira
         """
         print(f"[POINTER] Procurando cadeia de ponteiros para {hex(hp_address)}...")
         print(f"          Profundidade máxima: {max_depth}")
         
-        chains = []
-        
-        # Nível 1: Ponteiros diretos para HP
-        level1 = self.scan_for_pointers(hp_address, max_offset=0x1000)
-        
-        for ptr_addr, offset in level1:
-            # Verifica se está no módulo principal (estático)
-            if self.base_address <= ptr_addr < self.base_address + self.module_size:
-                relative = ptr_addr - self.base_address
-                chains.append({
-                    "type": "direct",
-                    "base_offset": relative,
-                    "offsets": [offset],
-                    "test_addr": ptr_addr
-                })
-        
-        if chains:
-            print(f"[POINTER] Encontradas {len(chains)} cadeias de nível 1")
-            return chains
-        
-        if max_depth < 2:
-            return chains
+        self.build_index(near=hp_address, radius=radius)
         
-        # Nível 2: Ponteiro -> Ponteiro -> HP
-        print("[POINTER] Procurando cadeias de nível 2...")
-        
-        for ptr_addr, offset1 in level1[:100]:  # Limita para não demorar
-            level2 = self.scan_for_pointers(ptr_addr, max_offset=0x100)
-            
-            for ptr2_addr, offset2 in level2:
-                if self.base_address <= ptr2_addr < self.base_address + self.module_size:
-                    relative = ptr2_addr - self.base_address
-                    chains.append({
-                        "type": "level2",
-                        "base_offset": relative,
-                        "offsets": [offset2, offset1],
-                        "test_addr": ptr2_addr
-                    })
+        chains = find_chains(self.index, hp_address, self.base_address, self.module_size,
+                             max_depth, max_branches)
         
         print(f"[POINTER] Encontradas {len(chains)} cadeias totais")
         return chains
@@ -227,15 +274,15 @@ class PointerScanner:
         """
         try:
             # Lê o primeiro ponteiro
-            ptr = self.pm.read_longlong(self.base_address + chain["base_offset"])
+            ptr = self.source.read_longlong(self.base_address + chain["base_offset"])
             
             # Segue a cadeia
             for offset in chain["offsets"][:-1]:
-                ptr = self.pm.read_longlong(ptr + offset)
+                ptr = self.source.read_longlong(ptr + offset)
             
             # O último offset aponta para o valor
             final_addr = ptr + chain["offsets"][-1]
-            value = self.pm.read_int(final_addr)
+            value = self.source.read_int(final_addr)
             
             return value, final_addr
             
@@ -252,12 +299,12 @@ class PointerScanner:
         try:
             # Lê o ponteiro base
             ptr_addr = self.base_address + base_offset
-            ptr_value = self.pm.read_longlong(ptr_addr)
+            ptr_value = self.source.read_longlong(ptr_addr)
             
             # Lê HP
             hp_addr = ptr_value + hp_offset
-            hp = self.pm.read_int(hp_addr)
-            hp_max = self.pm.read_int(hp_addr + 8)
+            hp = self.source.read_int(hp_addr)
+            hp_max = self.source.read_int(hp_addr + 8)
             
             return {
                 "hp": hp,
@@ -306,8 +353,8 @@ def interactive_pointer_scan():
                 
                 # Verifica se ainda é válido
                 try:
-                    hp = scanner.pm.read_int(hp_address)
-                    hp_max = scanner.pm.read_int(hp_address + 8)
+                    hp = scanner.source.read_int(hp_address)
+                    hp_max = scanner.source.read_int(hp_address + 8)
                     if 0 < hp <= hp_max <= 500000:
                         print(f"[OK] HP encontrado no cache: {hp}/{hp_max} @ {hex(hp_address)}")
                     else:
@@ -333,6 +380,9 @@ def interactive_pointer_scan():
     print("-" * 60)
     print()
     
+    # Mapa desta sessão (python -m memory.pointer_map cruza vários reinícios)
+    scanner.save_pointer_map(hp_address)
+    
     # Busca ponteiros estáticos
     static_pointers = scanner.find_static_pointers(hp_address)
     
@@ -372,7 +422,7 @@ def interactive_pointer_scan():
         print("Nenhum ponteiro estático direto encontrado.")
         print("Tentando busca de cadeia de ponteiros...")
         
-        chains = scanner.find_pointer_chain(hp_address, max_depth=2)
+        chains = scanner.find_pointer_chain(hp_address, max_depth=4)
         
         if chains:
             print()
@@ -197,9 +197,10 @@ class TibiaMemoryReader:
             return 0
             
         try:
-            addr = self.pm.read_uint(base)
+            # Client 64 bits: ponteiros de 8 bytes
+            addr = self.pm.read_ulonglong(base)
             for offset in offsets[:-1]:
-                addr = self.pm.read_uint(addr + offset)
+                addr = self.pm.read_ulonglong(addr + offset)
             return addr + offsets[-1]
         except:
             return 0
@@ -9,6 +9,8 @@ Os enderecos podem mudar a cada reinicio do jogo!
 
 import json
 import os
+import struct
+import threading
 import time
 
 try:
@@ -26,6 +28,8 @@ try:
 except ImportError:
     WIN32_AVAILABLE = False
 
+from memory.sources import PymemSource
+
 
 class TibiaMemoryReader:
     """
@@ -36,9 +40,21 @@ class TibiaMemoryReader:
     encontrar os enderecos novos.
     """
     
+    # Campos atualizados pelo _update_cache (todos inteiros de 4 bytes)
+    CACHE_FIELDS = ("hp", "hp_max", "mp", "mp_max", "level")
+    
+    # Offsets conhecidos do Tibia 15.11 BaiakZika (relativos ao HP)
+    OFFSET_HP_MAX = 0x8
+    OFFSET_MP = 0x620
+    OFFSET_MP_MAX = 0x628
+    
+    # Intervalo minimo entre re-resolucoes da cadeia quando a leitura falha
+    CHAIN_RETRY_INTERVAL = 1.0
+    
     def __init__(self, process_name="client.exe"):
         self.process_name = process_name
         self.pm = None
+        self.source = None
         self.connected = False
         self.pid = None
         self.base_address = None
@@ -53,6 +69,13 @@ class TibiaMemoryReader:
             "level": None,
         }
         
+        # Cadeia estatica do player: client.exe + base_offset -> offsets -> HP
+        # (sobrevive a reinicio do client; o hp_addr absoluto nao). Todas as
+        # cadeias ficam no pointer_chains.json (memory/pointer_map.py)
+        self._chain = None
+        self._chain_retry = 0.0
+        self._chain_thread = None
+        
         # Cache para reduzir leituras
         self._cache = {
             "hp": 0,
@@ -66,6 +89,13 @@ class TibiaMemoryReader:
         
         self._cache_interval = 0.030  # 30ms - bem rapido
         
+        # Healing e GUI chamam os getters de threads diferentes:
+        # so uma delas faz a leitura por intervalo
+        self._cache_lock = threading.Lock()
+        
+        # Estatisticas de leitura (uma leitura por atualizacao do cache)
+        self.read_calls = 0
+        
         # Arquivo de cache de offsets
         self._offsets_file = os.path.join(os.path.dirname(__file__), "..", "offsets_cache.json")
     
@@ -105,6 +135,7 @@ class TibiaMemoryReader:
         try:
             # Tenta encontrar o processo
             self.pm = pymem.Pymem(self.process_name)
+            self.source = PymemSource(self.pm)
             self.pid = self.pm.process_id
             self.base_address = self.pm.base_address
             self.connected = True
@@ -113,6 +144,10 @@ class TibiaMemoryReader:
             print(f"         PID: {self.pid}")
             print(f"         Base: {hex(self.base_address)}")
             
+            # Cadeias estáveis entre reinícios (memory/pointer_map.py)
+            if self._resolve_pointer_chains():
+                return True
+            
             # Tenta carregar offsets salvos
             self._load_offsets()
             
@@ -142,6 +177,7 @@ class TibiaMemoryReader:
                 pass
         
         self.pm = None
+        self.source = None
         self.connected = False
         print("[MEMORY] Desconectado")
     
@@ -160,31 +196,200 @@ class TibiaMemoryReader:
             self.connected = False
             return False
     
+    def read_pointer(self, base, offsets):
+        """
+        Segue uma cadeia de ponteiros de 64 bits.
+        base: endereco do primeiro ponteiro
+        offsets: offsets somados a cada nivel (o ultimo nao e lido)
+        Retorna o endereco final ou None.
+        """
+        try:
+            source = self._memory_source()
+            addr = source.read_longlong(base)
+            for offset in offsets[:-1]:
+                if not addr:
+                    return None
+                addr = source.read_longlong(addr + offset)
+            return addr + offsets[-1] if addr else None
+        except:
+            return None
+    
+    def _set_hp_address(self, hp_addr):
+        """Enderecos de HP_MAX/MP/MP_MAX a partir do HP"""
+        self._addresses["hp"] = hp_addr
+        self._addresses["hp_max"] = hp_addr + self.OFFSET_HP_MAX
+        self._addresses["mp"] = hp_addr + self.OFFSET_MP
+        self._addresses["mp_max"] = hp_addr + self.OFFSET_MP_MAX
+    
+    def _resolve_pointer_chains(self):
+        """
+        Resolve as cadeias do pointer_chains.json, na ordem do arquivo
+        (cruzadas pelo python -m memory.pointer_map, depois as achadas por
+        _discover_chain): client.exe + base -> offsets -> HP.
+        Poucas leituras em vez de um scan do heap.
+        """
+        try:
+            from memory.pointer_map import load_chains
+        except ImportError:
+            return False
+        
+        for chain in load_chains():
+            if self._use_chain(chain):
+                return True
+        return False
+    
+    @staticmethod
+    def _values_valid(hp, hp_max):
+        """HP/HP_MAX com cara de player"""
+        return hp is not None and hp_max is not None and 0 < hp <= hp_max <= 1000000
+    
+    def _resolve_chain(self, chain):
+        """
+        Segue client.exe + base_offset -> offsets e confere HP/HP_MAX no
+        destino. Retorna o endereco do HP ou None (nao altera nada).
+        """
+        if not self.base_address:
+            return None
+        
+        hp_addr = self.read_pointer(self.base_address + chain["base_offset"], chain["offsets"])
+        if not hp_addr:
+            return None
+        
+        try:
+            raw = self._memory_source().read_bytes(hp_addr, self.OFFSET_HP_MAX + 4)
+            hp, hp_max = struct.unpack_from('<i', raw, 0)[0], struct.unpack_from('<i', raw, self.OFFSET_HP_MAX)[0]
+        except:
+            return None
+        
+        return hp_addr if self._values_valid(hp, hp_max) else None
+    
+    def _use_chain(self, chain):
+        """Resolve a cadeia e passa a usa-la como fonte do endereco do player"""
+        hp_addr = self._resolve_chain(chain)
+        if hp_addr is None:
+            return False
+        
+        self._chain = chain
+        self._set_hp_address(hp_addr)
+        print(f"[MEMORY] Player via cadeia estatica: client.exe+{hex(chain['base_offset'])} "
+              f"-> {[hex(o) for o in chain['offsets']]} (HP em {hex(hp_addr)})")
+        return True
+    
+    def _rechain(self):
+        """
+        Leitura invalida com cadeia configurada: o player pode ter sido
+        realocado (relog, troca de personagem). Re-resolve a cadeia, no
+        maximo 1x por CHAIN_RETRY_INTERVAL.
+        
+        Retorna True se o HP mudou de endereco.
+        """
+        now = time.time()
+        if now - self._chain_retry < self.CHAIN_RETRY_INTERVAL:
+            return False
+        self._chain_retry = now
+        
+        hp_addr = self._resolve_chain(self._chain)
+        if hp_addr is None or hp_addr == self._addresses["hp"]:
+            return False
+        
+        print(f"[MEMORY] Cadeia re-resolvida: HP em {hex(hp_addr)}")
+        self._set_hp_address(hp_addr)
+        return True
+    
+    def _start_chain_discovery(self):
+        """
+        Depois de um scan pesado: procura a cadeia estatica em uma thread
+        separada (o indice de ponteiros leva segundos), sem segurar o
+        connect. O reader ja funciona pelo hp_addr enquanto isso.
+        """
+        if self._chain_thread and self._chain_thread.is_alive():
+            return
+        
+        self._chain_thread = threading.Thread(target=self._discover_chain,
+                                              name="chain-discovery", daemon=True)
+        self._chain_thread.start()
+    
+    def _discover_chain(self):
+        """
+        Procura uma cadeia estatica ate o HP atual (PointerScanner, indice
+        so do modulo + regioes perto do HP) para o proximo connect nao
+        precisar de scan.
+        """
+        hp_addr = self._addresses["hp"]
+        if not hp_addr:
+            return False
+        
+        try:
+            from memory.pointer_scanner import PointerScanner, CHAIN_INDEX_RADIUS
+            
+            scanner = PointerScanner(self.process_name, source=self._memory_source())
+            scanner.connect()
+            chains = scanner.find_pointer_chain(hp_addr, max_depth=3, radius=CHAIN_INDEX_RADIUS)
+        except Exception as e:
+            print(f"[MEMORY] Busca de cadeia falhou: {e}")
+            return False
+        
+        # Cadeias mais curtas primeiro (menos leituras, menos chance de quebrar)
+        for found in sorted(chains, key=lambda c: (len(c["offsets"]), c["base_offset"])):
+            chain = {"base_offset": found["base_offset"], "offsets": found["offsets"]}
+            if self._resolve_chain(chain) != hp_addr:
+                continue
+            
+            # Endereco trocado durante a busca (novo scan, set_address)
+            if self._addresses["hp"] != hp_addr:
+                return False
+            
+            self._chain = chain
+            self._store_chain(chain)
+            print(f"[MEMORY] Cadeia salva: client.exe+{hex(chain['base_offset'])} "
+                  f"-> {[hex(o) for o in chain['offsets']]}")
+            return True
+        
+        print("[MEMORY] Nenhuma cadeia estatica ate o HP")
+        return False
+    
+    @staticmethod
+    def _store_chain(chain):
+        """Grava a cadeia no pointer_chains.json (unico arquivo de cadeias)"""
+        try:
+            from memory.pointer_map import add_chain
+            add_chain(chain)
+        except Exception as e:
+            print(f"[AVISO] Nao foi possivel salvar a cadeia: {e}")
+    
     def _load_offsets(self):
         """
         Carrega enderecos do arquivo de cache
         Suporta formato antigo (hp, hp_max, mp, mp_max) e novo (hp_addr)
         """
-        # Offsets conhecidos do Tibia 15.11 BaiakZika
-        OFFSET_HP_MAX = 0x8
-        OFFSET_MP = 0x620
-        OFFSET_MP_MAX = 0x628
-        
         try:
             if os.path.exists(self._offsets_file):
                 with open(self._offsets_file, 'r') as f:
                     data = json.load(f)
                 
+                # Cache antigo com cadeia: migra para o pointer_chains.json
+                # (o connect ja tentou as cadeias de la antes de chegar aqui)
+                chain = data.get("chain")
+                if chain:
+                    try:
+                        chain = {
+                            "base_offset": int(chain["base_offset"], 16),
+                            "offsets": [int(offset, 16) for offset in chain["offsets"]]
+                        }
+                        self._store_chain(chain)
+                        if self._use_chain(chain):
+                            return True
+                    except (KeyError, TypeError, ValueError):
+                        pass
+                    print("[MEMORY] Cadeia salva nao resolveu, usando hp_addr")
+                
                 # Novo formato (Smart Scanner V3): hp_addr
                 if "hp_addr" in data:
                     hp_addr = data["hp_addr"]
                     if isinstance(hp_addr, str):
                         hp_addr = int(hp_addr, 16)
                     
-                    self._addresses["hp"] = hp_addr
-                    self._addresses["hp_max"] = hp_addr + OFFSET_HP_MAX
-                    self._addresses["mp"] = hp_addr + OFFSET_MP
-                    self._addresses["mp_max"] = hp_addr + OFFSET_MP_MAX
+                    self._set_hp_address(hp_addr)
                     
                     print(f"[MEMORY] Offsets carregados (V3):")
                     print(f"         HP: {hex(hp_addr)}")
@@ -215,15 +420,10 @@ class TibiaMemoryReader:
             return False
         
         try:
-            hp = self.pm.read_int(self._addresses["hp"])
-            hp_max = self.pm.read_int(self._addresses["hp_max"])
+            hp, hp_max = self._read_fields(["hp", "hp_max"])
             
             # Verifica se os valores fazem sentido
-            if hp <= 0 or hp_max <= 0:
-                return False
-            if hp > hp_max:
-                return False
-            if hp_max > 1000000:  # Valor muito alto
+            if not self._values_valid(hp, hp_max):
                 return False
             
             print(f"[MEMORY] Offsets validados: HP={hp}/{hp_max}")
@@ -262,8 +462,13 @@ class TibiaMemoryReader:
                 self._addresses["mp_max"] = result["addr"] + scanner.OFFSET_MP_MAX
                 
                 # Salva no cache
+                self._chain = None
                 self._save_offsets()
                 
+                # Cadeia estatica (em segundo plano): o proximo connect nao
+                # precisa de scan
+                self._start_chain_discovery()
+                
                 print(f"[MEMORY] ✓ Player encontrado automaticamente!")
                 print(f"         HP={result['hp']}/{result['hp_max']}, MP={result['mp']}/{result['mp_max']}")
                 return True
@@ -287,6 +492,10 @@ class TibiaMemoryReader:
                 self._addresses["mp"] = offsets["mp"]
                 self._addresses["mp_max"] = offsets["mp_max"]
                 
+                self._chain = None
+                self._save_offsets()
+                self._start_chain_discovery()
+                
                 print("[MEMORY] ✓ Offsets encontrados via Pattern Scanner!")
                 return True
                 
@@ -299,6 +508,7 @@ class TibiaMemoryReader:
     def _save_offsets(self):
         """Salva os endereços encontrados no cache"""
         try:
+            # Cadeias ficam so no pointer_chains.json (_store_chain)
             data = {
                 "hp_addr": self._addresses["hp"],
                 "last_scan": time.time()
@@ -317,6 +527,9 @@ class TibiaMemoryReader:
         """
         if key in self._addresses:
             self._addresses[key] = address
+            if key == "hp":
+                # Endereco manual: a cadeia antiga nao vale mais
+                self._chain = None
             print(f"[MEMORY] {key} = {hex(address)}")
     
     def scan_with_values(self, hp_value, mp_value=None):
@@ -345,47 +558,145 @@ class TibiaMemoryReader:
         """
         return self._addresses["hp"] is not None and self._addresses["hp_max"] is not None
     
-    def _update_cache(self):
-        """
-        Atualiza o cache de valores
+    # ============================================
+    # LEITURA EM LOTE
+    # ============================================
+    
+    def read_many(self, spans):
         """
-        now = time.time()
+        Le varios spans (address, size) em uma leitura por bloco vizinho.
         
-        if now - self._cache["last_update"] < self._cache_interval:
-            return
+        Retorna lista de bytes na mesma ordem (None = ilegivel).
+        """
+        self.read_calls += 1
+        return self._memory_source().read_many(spans)
+    
+    def read_struct(self, address, layout):
+        """
+        Le uma estrutura inteira (ex: vector_scanner.PLAYER_LAYOUT) em uma
+        unica leitura e retorna dict {campo: valor}
+        """
+        self.read_calls += 1
+        return self._memory_source().read_struct(address, layout)
+
+    def _memory_source(self):
+        """
+        MemorySource do processo. Criado sob demanda quando pm foi
+        configurado por fora do connect() (ex: GUI de icones).
+        """
+        if self.source is None or (self.pm is not None and
+                                   getattr(self.source, "pm", None) is not self.pm):
+            self.source = PymemSource(self.pm)
+        return self.source
+    
+    def _read_fields(self, keys):
+        """
+        Le os campos inteiros pedidos em UMA leitura (HP..MP_MAX cabem em
+        0x630 bytes), garantindo que todos vem do mesmo frame do jogo.
         
-        self._cache["last_update"] = now
+        Retorna lista de valores (None = endereco nao configurado/ilegivel).
+        """
+        spans = []
+        for key in keys:
+            if self._addresses[key]:
+                spans.append((self._addresses[key], 4))
         
-        if not self.connected:
-            return
+        data = iter(self.read_many(spans)) if spans else iter(())
+        values = []
+        for key in keys:
+            raw = next(data) if self._addresses[key] else None
+            values.append(struct.unpack('<i', raw)[0] if raw else None)
         
-        # Le HP
-        if self._addresses["hp"]:
+        # Player realocado? Com cadeia configurada, re-resolve e le de novo
+        if self._chain is not None and self._read_failed(keys, values) and self._rechain():
+            return self._read_fields(keys)
+        return values
+    
+    def _read_failed(self, keys, values):
+        """Leitura ilegivel ou HP/HP_MAX sem sentido"""
+        fields = dict(zip(keys, values))
+        if "hp" in fields and "hp_max" in fields:
+            return not self._values_valid(fields["hp"], fields["hp_max"])
+        return any(value is None for value in values)
+    
+    def _update_cache(self):
+        """
+        Atualiza o cache de valores (uma leitura para todos os campos)
+        """
+        with self._cache_lock:
+            now = time.time()
+            
+            if now - self._cache["last_update"] < self._cache_interval:
+                return
+            
+            self._cache["last_update"] = now
+            
+            if not self.connected:
+                return
+            
             try:
-                self._cache["hp"] = self.pm.read_int(self._addresses["hp"])
+                values = self._read_fields(self.CACHE_FIELDS)
             except:
-                pass
+                return
+            
+            for key, value in zip(self.CACHE_FIELDS, values):
+                if value is not None:
+                    self._cache[key] = value
+    
+    def read_hp(self):
+        """
+        Le (hp, hp_max) direto da memoria em uma leitura, sem esperar o
+        intervalo do cache (usado pelo sampler do healing). Atualiza o cache.
         
-        # Le HP Max
-        if self._addresses["hp_max"]:
-            try:
-                self._cache["hp_max"] = self.pm.read_int(self._addresses["hp_max"])
-            except:
-                pass
+        Retorna (None, None) se nao conseguir ler.
+        """
+        if not self.connected:
+            return None, None
         
-        # Le MP
-        if self._addresses["mp"]:
-            try:
-                self._cache["mp"] = self.pm.read_int(self._addresses["mp"])
-            except:
-                pass
+        try:
+            hp, hp_max = self._read_fields(("hp", "hp_max"))
+        except:
+            return None, None
         
-        # Le MP Max
-        if self._addresses["mp_max"]:
-            try:
-                self._cache["mp_max"] = self.pm.read_int(self._addresses["mp_max"])
-            except:
-                pass
+        with self._cache_lock:
+            if hp is not None:
+                self._cache["hp"] = hp
+            if hp_max is not None:
+                self._cache["hp_max"] = hp_max
+        
+        return hp, hp_max
+
+    def read_player(self):
+        """
+        Le todos os CACHE_FIELDS direto da memoria em uma leitura, sem
+        esperar o intervalo do cache (usado pelo PlayerStateBus).
+        Atualiza o cache.
+
+        Retorna dict {campo: valor} (None = ilegivel) ou None se desconectado.
+        """
+        if not self.connected:
+            return None
+
+        try:
+            values = self._read_fields(self.CACHE_FIELDS)
+        except:
+            return None
+
+        with self._cache_lock:
+            for key, value in zip(self.CACHE_FIELDS, values):
+                if value is not None:
+                    self._cache[key] = value
+
+        return dict(zip(self.CACHE_FIELDS, values))
+
+    def get_player_snapshot(self):
+        """
+        Retorna dict com hp, hp_max, mp, mp_max, level da mesma leitura
+        (consistente: HP e HP max nunca vem de frames diferentes)
+        """
+        self._update_cache()
+        with self._cache_lock:
+            return {key: self._cache[key] for key in self.CACHE_FIELDS}
     
     # ============================================
     # GETTERS
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Region Map - Mapa de regioes de memoria compartilhado entre scanners
+
+Antes cada scanner refazia o loop de VirtualQueryEx de 0 ate
+0x7FFFFFFFFFFF a cada chamada (milhares de syscalls), e o
+find_pointers.py repetia o loop para cada candidato de nivel 2.
+
+O RegionMap enumera uma vez, guarda as regioes ordenadas por base
+(busca com bisect) e no refresh barato faz UMA consulta por alocacao:
+a primeira regiao de cada allocation base conhecida (allocation base,
+tamanho, estado e protecao). Se bate, a alocacao inteira e mantida; se
+nao, so ela e re-enumerada. Custo: uma VirtualQueryEx por alocacao (mais
+as sondas de espaco entre alocacoes), nao por regiao.
+
+Um commit/decommit no meio de uma alocacao (sem mexer na primeira
+regiao) nao aparece nessa sonda: por isso a cada FULL_REFRESH_INTERVAL
+o refresh e completo, o que limita o tempo de um mapa desatualizado.
+last_queries diz quantas consultas o ultimo refresh fez.
+"""
+
+import bisect
+import threading
+import time
+
+from memory.sources import MAX_ADDRESS, MEM_COMMIT, READABLE_PROTECT
+
+
+class RegionMap:
+    """
+    Visao ordenada e barata das regioes de um MemorySource.
+
+    Uso:
+        rmap = source.region_map
+        for region in rmap.regions():            # refresh automatico se velho
+            ...
+        region = rmap.find(address)               # bisect, sem syscall
+    """
+
+    # Segundos entre enumeracoes completas (pegam mudancas no meio de
+    # alocacoes que a sonda do refresh incremental nao ve)
+    FULL_REFRESH_INTERVAL = 30.0
+
+    def __init__(self, source, max_age=2.0):
+        """
+        source: MemorySource
+        max_age: idade maxima (s) antes de um refresh automatico
+        """
+        self.source = source
+        self.max_age = max_age
+
+        self._regions = ()
+        self._bases = ()
+        self._lock = threading.Lock()
+        self._last_refresh = 0
+        self._last_full = 0
+
+        # Estatisticas (para medir o custo do refresh)
+        self.version = 0
+        self.queries = 0
+        self.last_queries = 0
+        self.requeried_ranges = 0
+
+    # ============================================
+    # REFRESH
+    # ============================================
+
+    def refresh(self, full=False):
+        """
+        Atualiza o mapa.
+
+        full: forca enumeracao completa. Sem isso, so as alocacoes que
+              mudaram sao re-consultadas (quando o backend suporta), e a
+              enumeracao completa so roda a cada FULL_REFRESH_INTERVAL.
+        """
+        with self._lock:
+            queries = self.queries
+            now = time.time()
+            if (full or not self._regions or not self.source.incremental_refresh
+                    or now - self._last_full > self.FULL_REFRESH_INTERVAL):
+                regions = list(self.source.regions())
+                self.queries += len(regions)
+                self._last_full = now
+            else:
+                regions = self._incremental()
+            self.last_queries = self.queries - queries
+
+            changed = regions != list(self._regions)
+            self._regions = tuple(regions)
+            self._bases = tuple(r.base for r in regions)
+            self._last_refresh = time.time()
+
+            if changed:
+                self.version += 1
+
+        return changed
+
+    def _allocations(self):
+        """Agrupa as regioes conhecidas em runs contiguos da mesma allocation base"""
+        groups = []
+        for region in self._regions:
+            if (groups and groups[-1][-1].allocation_base == region.allocation_base
+                    and groups[-1][-1].base + groups[-1][-1].size == region.base):
+                groups[-1].append(region)
+            else:
+                groups.append([region])
+        return groups
+
+    def _walk(self, start, end):
+        """Re-enumera [start, end) pelo backend"""
+        self.requeried_ranges += 1
+        regions = []
+        for region in self.source.regions(start, end):
+            self.queries += 1
+            if region.base >= end:
+                break
+            regions.append(region)
+        return regions
+
+    def _incremental(self):
+        """
+        Refresh incremental: uma consulta por alocacao conhecida; so as
+        alocacoes cuja primeira regiao mudou sao re-enumeradas
+        """
+        regions = []
+        cursor = 0
+
+        for group in self._allocations():
+            first, last = group[0], group[-1]
+            start, end = first.base, last.base + last.size
+
+            # Ja coberto por uma re-enumeracao anterior (regioes que se fundiram)
+            if end <= cursor:
+                continue
+
+            if start < cursor:
+                unchanged = False
+                start = cursor
+            else:
+                # Espaco entre o fim do grupo anterior e este (backends sem MEM_FREE)
+                if cursor < start:
+                    probe = self.source.query(cursor)
+                    self.queries += 1
+                    if probe is not None and probe.base < start:
+                        regions.extend(self._walk(cursor, start))
+
+                probe = self.source.query(start)
+                self.queries += 1
+                unchanged = probe == first
+
+            if unchanged:
+                regions.extend(group)
+            else:
+                walked = self._walk(start, end)
+                regions.extend(walked)
+                if walked:
+                    end = max(end, walked[-1].base + walked[-1].size)
+
+            cursor = end
+
+        # Regioes novas depois da ultima conhecida
+        if cursor < MAX_ADDRESS:
+            self.queries += 1
+            if self.source.query(cursor) is not None:
+                regions.extend(self._walk(cursor, MAX_ADDRESS))
+
+        return regions
+
+    def current_version(self):
+        """version depois do refresh automatico (muda quando as regioes mudam)"""
+        self._ensure_fresh()
+        return self.version
+
+    def _ensure_fresh(self):
+        if not self._regions or time.time() - self._last_refresh > self.max_age:
+            self.refresh()
+
+    # ============================================
+    # CONSULTAS (sem syscalls)
+    # ============================================
+
+    def regions(self, start=0, end=MAX_ADDRESS):
+        """Regioes entre start e end (snapshot consistente)"""
+        self._ensure_fresh()
+        regions, bases = self._regions, self._bases
+
+        i = max(0, bisect.bisect_right(bases, start) - 1)
+        result = []
+        for region in regions[i:]:
+            if region.base >= end:
+                break
+            if region.base + region.size > start:
+                result.append(region)
+        return result
+
+    def committed(self, start=0, end=MAX_ADDRESS, protect=READABLE_PROTECT,
+                  min_size=0, max_size=None):
+        """Regioes MEM_COMMIT filtradas por protecao e tamanho"""
+        result = []
+        for region in self.regions(start, end):
+            if region.state != MEM_COMMIT or region.protect not in protect:
+                continue
+            if region.size < min_size or (max_size is not None and region.size > max_size):
+                continue
+            result.append(region)
+        return result
+
+    def find(self, address):
+        """Regiao que contem address, ou None (bisect)"""
+        self._ensure_fresh()
+        regions, bases = self._regions, self._bases
+
+        i = bisect.bisect_right(bases, address) - 1
+        if i >= 0 and address < regions[i].base + regions[i].size:
+            return regions[i]
+        return None
+
+    def is_committed(self, address):
+        """True se address esta em uma regiao commit legivel"""
+        region = self.find(address)
+        return region is not None and region.state == MEM_COMMIT and region.protect in READABLE_PROTECT
+
+    def __len__(self):
+        return len(self._regions)
@@ -4,12 +4,11 @@ Scanner Avancado de Memoria para Tibia 15.11
 Encontra automaticamente os offsets de HP, MP, etc
 """
 
-import ctypes
-from ctypes import wintypes
 import struct
 import time
 import json
 import os
+from functools import partial
 
 try:
     import pymem
@@ -19,6 +18,11 @@ except ImportError:
     PYMEM_AVAILABLE = False
     print("[AVISO] pymem nao instalado. Execute: pip install pymem")
 
+from memory.parallel_scan import ParallelScanner, find_bytes
+from memory.sources import PymemSource
+from memory.next_scan import ScanResults
+from memory.snapshot_scan import UnknownValueScan
+
 
 # Windows API constants
 PROCESS_ALL_ACCESS = 0x1F0FFF
@@ -30,40 +34,57 @@ PAGE_EXECUTE_READ = 0x20
 PAGE_EXECUTE_READWRITE = 0x40
 
 
-class MEMORY_BASIC_INFORMATION(ctypes.Structure):
-    _fields_ = [
-        ("BaseAddress", ctypes.c_void_p),
-        ("AllocationBase", ctypes.c_void_p),
-        ("AllocationProtect", wintypes.DWORD),
-        ("RegionSize", ctypes.c_size_t),
-        ("State", wintypes.DWORD),
-        ("Protect", wintypes.DWORD),
-        ("Type", wintypes.DWORD),
-    ]
-
-
 class AdvancedScanner:
     """
     Scanner avancado para encontrar valores na memoria do Tibia
     """
     
-    def __init__(self, process_name="client.exe"):
+    def __init__(self, process_name="client.exe", source=None):
+        """
+        source: MemorySource opcional (dump, /proc/pid/mem...)
+                Se None, conecta ao processo via pymem
+        """
         self.process_name = process_name
         self.pm = None
         self.pid = None
         self.handle = None
+        self._source = source
         
-        # Cache de resultados
-        self._scan_results = []
+        # Cache de resultados (ScanResults: offsets por regiao + snapshot)
+        self._scan_results = ScanResults()
         self._found_offsets = {}
         
+        # Scan por valor desconhecido em andamento (snapshots em disco)
+        self._unknown = None
+        
         # Arquivo de cache
         self.cache_file = os.path.join(os.path.dirname(__file__), "..", "offsets_cache.json")
+        
+        # Workers da varredura (None = um por nucleo)
+        self.workers = None
+        self._scheduler = None
+    
+    @property
+    def source(self):
+        """
+        Backend de memoria (MemorySource explicito ou o pymem conectado)
+        """
+        if self._source is None and self.pm is not None:
+            self._source = PymemSource(self.pm)
+        return self._source
+    
+    @source.setter
+    def source(self, value):
+        self._source = value
     
     def connect(self):
         """
         Conecta ao processo do Tibia
         """
+        if self._source is not None:
+            self.pid = self._source.process_id
+            return True
+        
         if not PYMEM_AVAILABLE:
             print("[ERRO] pymem nao disponivel")
             return False
@@ -95,9 +116,17 @@ class AdvancedScanner:
                 self.pm.close_process()
             except:
                 pass
+            self._source = None
         self.pm = None
     
-    def scan_all_memory(self, value, value_type="int4"):
+    def cancel(self):
+        """
+        Cancela um scan_all_memory em andamento
+        """
+        if self._scheduler:
+            self._scheduler.cancel()
+    
+    def scan_all_memory(self, value, value_type="int4", progress_callback=None):
         """
         Escaneia TODA a memoria do processo procurando um valor
         
@@ -105,17 +134,16 @@ class AdvancedScanner:
             "int4" = inteiro 4 bytes
             "int2" = inteiro 2 bytes
             "float" = float 4 bytes
+        progress_callback: função(percent, message) para reportar progresso
         
         Retorna lista de enderecos
         """
-        if not self.pm:
+        if not self.source:
             print("[ERRO] Nao conectado")
             return []
         
         print(f"[SCAN] Procurando valor {value} (tipo: {value_type})...")
         
-        results = []
-        
         # Converte valor para bytes
         if value_type == "int4":
             search_bytes = struct.pack("<i", int(value))
@@ -128,73 +156,108 @@ class AdvancedScanner:
             return []
         
         # Enumera regioes de memoria
-        address = 0
-        mbi = MEMORY_BASIC_INFORMATION()
-        mbi_size = ctypes.sizeof(mbi)
-        
-        VirtualQueryEx = ctypes.windll.kernel32.VirtualQueryEx
-        ReadProcessMemory = ctypes.windll.kernel32.ReadProcessMemory
-        
-        regions_scanned = 0
-        bytes_scanned = 0
-        
-        while True:
-            # Consulta informacoes da regiao
-            result = VirtualQueryEx(
-                self.handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(mbi),
-                mbi_size
-            )
-            
-            if result == 0:
-                break
-            
-            base = mbi.BaseAddress
-            size = mbi.RegionSize
+        regions = []
+        for region in self.source.region_map.regions():
+            base = region.base
+            size = region.size
             
             # Pula se base é None
-            if base is None or size is None or size == 0:
-                address += 0x10000  # Pula 64KB
+            if not base or not size:
                 continue
             
-            # Pula para proxima regiao
-            next_address = base + size
-            
             # Verifica se a regiao e valida para leitura
-            if (mbi.State == MEM_COMMIT and 
-                mbi.Protect in [PAGE_READWRITE, PAGE_READONLY, PAGE_EXECUTE_READ, PAGE_EXECUTE_READWRITE] and
+            if (region.state == MEM_COMMIT and 
+                region.protect in [PAGE_READWRITE, PAGE_READONLY, PAGE_EXECUTE_READ, PAGE_EXECUTE_READWRITE] and
                 size < 100 * 1024 * 1024):  # Max 100MB por regiao
-                
-                try:
-                    # Le a regiao de memoria
-                    data = self.pm.read_bytes(base, size)
-                    bytes_scanned += len(data)
-                    regions_scanned += 1
-                    
-                    # Procura o valor
-                    pos = 0
-                    while True:
-                        pos = data.find(search_bytes, pos)
-                        if pos == -1:
-                            break
-                        
-                        addr = base + pos
-                        results.append(addr)
-                        pos += 1
-                        
-                except Exception:
-                    pass
-            
-            address = next_address
-            
-            # Evita loop infinito (limite 64-bit)
-            if address > 0x7FFFFFFFFFFF:
-                break
+                regions.append((base, size))
+        
+        # Procura o valor em paralelo (bytes.find segura o GIL -> processos)
+        self._scheduler = ParallelScanner(self.source, workers=self.workers, mode="process")
+        results = self._scheduler.scan(
+            regions,
+            partial(find_bytes, needle=search_bytes),
+            overlap=len(search_bytes) - 1,
+            progress_callback=progress_callback
+        )
+        
+        stats = self._scheduler.last_stats
+        regions_scanned = len(regions)
+        bytes_scanned = stats.get('bytes', 0)
         
         print(f"[SCAN] Escaneados {regions_scanned} regioes, {bytes_scanned / 1024 / 1024:.1f} MB")
         print(f"[SCAN] Encontrados {len(results)} enderecos")
         
+        self._drop_unknown()
+        self._scan_results = ScanResults.from_addresses(results, regions, value, value_type)
+        return results
+    
+    def scan_unknown(self, value_type="int4", progress_callback=None, memory_budget=None):
+        """
+        Primeiro scan por valor DESCONHECIDO (ex: valor que nao aparece na
+        interface). Tira um snapshot comprimido de todas as regioes
+        graváveis (memory/snapshot_scan.py); depois use next_scan com
+        "changed", "decreased", "increased_by"... para filtrar.
+        
+        Retorna o numero de candidatos.
+        """
+        if not self.source:
+            print("[ERRO] Nao conectado")
+            return 0
+        
+        regions = [(region.base, region.size) for region in self.source.region_map.committed(
+            protect=(PAGE_READWRITE, PAGE_EXECUTE_READWRITE)) if region.base and region.size]
+        
+        self._drop_unknown()
+        try:
+            kwargs = {"memory_budget": memory_budget} if memory_budget else {}
+            self._unknown = UnknownValueScan(self.source, value_type, **kwargs)
+        except RuntimeError as e:
+            print(f"[ERRO] {e}")
+            return 0
+        
+        print(f"[SCAN] Valor desconhecido ({value_type}): snapshot de {len(regions)} regioes...")
+        self._scan_results = ScanResults(value_type)
+        return self._unknown.first_scan(regions, progress_callback)
+    
+    def _drop_unknown(self):
+        if self._unknown is not None:
+            self._unknown.close()
+        self._unknown = None
+    
+    def next_scan(self, predicate, value=None):
+        """
+        Filtra os resultados do scan anterior (memory/next_scan.py):
+        cada regiao e relida uma vez e o predicado e avaliado contra o
+        snapshot do passo anterior.
+        
+        predicate: "equal", "changed", "unchanged", "increased",
+                   "decreased", "increased_by", "decreased_by"
+        value: argumento de equal / increased_by / decreased_by
+        """
+        if self._unknown is not None:
+            self._unknown.next_scan(predicate, value)
+            if self._unknown.results is None:
+                return self._unknown
+            
+            # Poucos candidatos: passam para o ScanResults em memoria
+            self._scan_results = self._unknown.results
+            self._unknown = None
+            return self._scan_results
+        
+        if not self._scan_results:
+            print("[ERRO] Faca um scan primeiro")
+            return self._scan_results
+        
+        before = len(self._scan_results)
+        start = time.time()
+        
+        results = self._scan_results.next_scan(self.source, predicate, value)
+        
+        print(f"[FILTER] {predicate}{'' if value is None else f' {value}'}: "
+              f"{before} -> {len(results)} enderecos "
+              f"({results.reads} leituras, {results.bytes_read / 1024 / 1024:.1f} MB, "
+              f"{time.time() - start:.2f}s)")
+        
         self._scan_results = results
         return results
     
@@ -202,42 +265,30 @@ class AdvancedScanner:
         """
         Filtra resultados do scan anterior, mantendo apenas
         os que mudaram para o novo valor
+        
+        value_type: ignorado, vale o tipo do scan anterior
         """
+        if self._unknown is not None:
+            return self.next_scan("equal", new_value)
+        
         if not self._scan_results:
             print("[ERRO] Faca um scan primeiro")
             return []
         
         print(f"[FILTER] Filtrando {len(self._scan_results)} enderecos para valor {new_value}...")
-        
-        results = []
-        
-        for addr in self._scan_results:
-            try:
-                if value_type == "int4":
-                    current = self.pm.read_int(addr)
-                elif value_type == "int2":
-                    current = self.pm.read_short(addr)
-                elif value_type == "float":
-                    current = self.pm.read_float(addr)
-                else:
-                    continue
-                
-                if current == new_value:
-                    results.append(addr)
-                    
-            except:
-                pass
-        
-        print(f"[FILTER] Restaram {len(results)} enderecos")
-        
-        self._scan_results = results
-        return results
+        return self.next_scan("equal", new_value)
     
     def filter_unchanged(self):
         """
         Filtra resultados, mantendo apenas os que NAO mudaram
         Util para encontrar valores maximos (HP Max, MP Max)
         """
+        if self._unknown is not None:
+            # O snapshot do passo anterior ja e a referencia
+            print("[FILTER] Aguarde 2 segundos e NAO mude seu HP/MP...")
+            time.sleep(2)
+            return self.next_scan("unchanged")
+        
         if not self._scan_results:
             print("[ERRO] Faca um scan primeiro")
             return []
@@ -245,30 +296,13 @@ class AdvancedScanner:
         print(f"[FILTER] Filtrando enderecos inalterados...")
         
         # Salva valores atuais
-        addr_values = {}
-        for addr in self._scan_results:
-            try:
-                addr_values[addr] = self.pm.read_int(addr)
-            except:
-                pass
+        self._scan_results = self._scan_results.refresh(self.source)
         
         print(f"[FILTER] Aguarde 2 segundos e NAO mude seu HP/MP...")
         time.sleep(2)
         
         # Verifica quais nao mudaram
-        results = []
-        for addr, old_value in addr_values.items():
-            try:
-                new_value = self.pm.read_int(addr)
-                if new_value == old_value:
-                    results.append(addr)
-            except:
-                pass
-        
-        print(f"[FILTER] Restaram {len(results)} enderecos")
-        
-        self._scan_results = results
-        return results
+        return self.next_scan("unchanged")
     
     def monitor_addresses(self, count=10, duration=10):
         """
@@ -288,7 +322,7 @@ class AdvancedScanner:
         last_values = {}
         for addr in addresses:
             try:
-                last_values[addr] = self.pm.read_int(addr)
+                last_values[addr] = self.source.read_int(addr)
             except:
                 last_values[addr] = 0
         
@@ -297,7 +331,7 @@ class AdvancedScanner:
         while time.time() - start < duration:
             for addr in addresses:
                 try:
-                    value = self.pm.read_int(addr)
+                    value = self.source.read_int(addr)
                     if value != last_values[addr]:
                         print(f"  {hex(addr)}: {last_values[addr]} -> {value}")
                         last_values[addr] = value
@@ -394,28 +428,28 @@ class AdvancedScanner:
             
             if "hp" in self._found_offsets:
                 try:
-                    hp = self.pm.read_int(self._found_offsets["hp"])
+                    hp = self.source.read_int(self._found_offsets["hp"])
                     line += f"HP: {hp}"
                 except:
                     line += "HP: ERRO"
             
             if "hp_max" in self._found_offsets:
                 try:
-                    hp_max = self.pm.read_int(self._found_offsets["hp_max"])
+                    hp_max = self.source.read_int(self._found_offsets["hp_max"])
                     line += f"/{hp_max}"
                 except:
                     line += "/ERRO"
             
             if "mp" in self._found_offsets:
                 try:
-                    mp = self.pm.read_int(self._found_offsets["mp"])
+                    mp = self.source.read_int(self._found_offsets["mp"])
                     line += f"  |  MP: {mp}"
                 except:
                     line += "  |  MP: ERRO"
             
             if "mp_max" in self._found_offsets:
                 try:
-                    mp_max = self.pm.read_int(self._found_offsets["mp_max"])
+                    mp_max = self.source.read_int(self._found_offsets["mp_max"])
                     line += f"/{mp_max}"
                 except:
                     line += "/ERRO"
@@ -21,6 +21,8 @@ except ImportError:
     PYMEM_AVAILABLE = False
     print("[AVISO] pymem nao instalado!")
 
+from memory.adaptive_poll import AdaptivePoller
+
 
 class SmartMemoryReader:
     """
@@ -56,6 +58,9 @@ class SmartMemoryReader:
         self._scanning = False
         self._last_valid_check = 0
         
+        # Intervalo de leitura adaptativo (config.ADAPTIVE_POLLING)
+        self._poller = AdaptivePoller("SMART")
+        
         self.callback = callback
         self.scan_thread = None
         self.cache_path = Path(__file__).parent.parent / self.CACHE_FILE
@@ -331,32 +336,37 @@ class SmartMemoryReader:
         Le valores de HP/MP
         """
         if not self.hp_address or not self.pm:
-            return
+            return False
         
         try:
             self._hp = self.pm.read_int(self.hp_address)
             self._hp_max = self.pm.read_int(self.hp_address + self.OFFSET_HP_MAX)
             self._mp = self.pm.read_int(self.hp_address + self.OFFSET_MP)
             self._mp_max = self.pm.read_int(self.hp_address + self.OFFSET_MP_MAX)
+            return True
         except:
-            pass
+            return False
     
     def update(self):
         """
         Atualiza valores (chamado automaticamente pelos getters)
         """
+        if not self.hp_address or not self.pm:
+            return
+        
         now = time.time()
         
-        # Rate limit
-        if now - self._last_read < 0.03:  # 30ms
+        # Rate limit adaptativo (rapido com HP mudando, lento parado/minimizado)
+        if not self._poller.due(now):
             return
         self._last_read = now
         
-        if not self.hp_address or not self.pm:
-            return
-        
         # Le valores
-        self._read_values()
+        start = self._poller.begin()
+        if self._read_values():
+            self._poller.observe((self._hp, self._hp_max, self._mp, self._mp_max), start)
+        else:
+            self._poller.pause("desconectado")
         
         # Verifica validade periodicamente (a cada 5 segundos)
         if now - self._last_valid_check > 5:
@@ -408,6 +418,12 @@ class SmartMemoryReader:
     def is_scanning(self):
         return self._scanning
     
+    def get_poll_stats(self, reset=False):
+        """
+        Taxa efetiva de leitura e custo de CPU (ver AdaptivePoller.stats)
+        """
+        return self._poller.stats(reset)
+    
     def wait_for_connection(self, timeout=30):
         """
         Aguarda ate conectar ou timeout
@@ -448,7 +464,8 @@ if __name__ == "__main__":
             while True:
                 if reader.is_connected():
                     print(f"\rHP: {reader.hp:>5}/{reader.hp_max:<5} ({reader.hp_percent:>3}%) | "
-                          f"MP: {reader.mp:>5}/{reader.mp_max:<5} ({reader.mp_percent:>3}%)", end='')
+                          f"MP: {reader.mp:>5}/{reader.mp_max:<5} ({reader.mp_percent:>3}%) | "
+                          f"{reader._poller.format_stats()}   ", end='')
                 elif reader.is_scanning():
                     print("\rEscaneando...", end='')
                 else:
@@ -21,7 +21,9 @@ import sys
 import time
 import json
 import ctypes
+import struct
 from ctypes import wintypes
+from functools import partial
 from pathlib import Path
 
 try:
@@ -30,6 +32,15 @@ try:
 except ImportError:
     PYMEM_AVAILABLE = False
 
+from memory.sources import PymemSource, MEM_COMMIT
+from memory.parallel_scan import ParallelScanner, find_joined, join_span
+
+# Protecoes varridas por find_structures (RW, RO, RWX, RX)
+SCAN_PROTECT = (0x04, 0x02, 0x40, 0x20)
+
+# Regioes maiores que isso nao sao heap de objetos do jogo
+MAX_SCAN_REGION = 100 * 1024 * 1024
+
 
 class SmartReaderV2:
     """
@@ -43,9 +54,15 @@ class SmartReaderV2:
     
     CACHE_FILE = "offsets_cache.json"
     
-    def __init__(self):
+    def __init__(self, source=None):
+        """
+        source: MemorySource opcional (dump, /proc/pid/mem...) para
+                find_structures. Se None, usa o processo do connect().
+        """
         self.pm = None
+        self.source = source
         self.hp_address = 0
+        self.matches = []
         self.offsets = {}
         
         self._hp = 0
@@ -83,6 +100,7 @@ class SmartReaderV2:
         
         try:
             self.pm = pymem.Pymem(process_name)
+            self.source = PymemSource(self.pm)
             print(f"[SMART] Conectado ao Tibia - PID: {self.pm.process_id}")
             
             # Tenta usar cache
@@ -189,56 +207,65 @@ class SmartReaderV2:
         
         return addresses
     
+    def find_structures(self, hp_value, hp_max_value, mp_value, mp_max_value, workers=None):
+        """
+        Uma unica varredura procurando HP, HP_MAX, MP e MP_MAX juntos nos
+        offsets conhecidos (0, +0x8, +0x620, +0x628). As 4 chaves sao
+        conferidas no buffer ja lido (sem read_int por candidato).
+        
+        Retorna a lista de enderecos de HP com todos os valores batendo.
+        """
+        if not self.source:
+            return []
+        
+        keys = tuple((offset, struct.pack('<i', value)) for offset, value in (
+            (0, hp_value),
+            (self.OFFSET_HP_MAX, hp_max_value),
+            (self.OFFSET_MP, mp_value),
+            (self.OFFSET_MP_MAX, mp_max_value),
+        ))
+        
+        regions = []
+        for region in self.source.region_map.regions(0x10000):
+            if region.state == MEM_COMMIT and region.protect in SCAN_PROTECT:
+                if 0x1000 < region.size <= MAX_SCAN_REGION:
+                    regions.append((region.base, region.size))
+        
+        # bytes.find segura o GIL -> processos (cai para threads se precisar)
+        scheduler = ParallelScanner(self.source, workers=workers, mode="process")
+        return scheduler.scan(regions, partial(find_joined, keys=keys),
+                              overlap=join_span(keys) - 1)
+    
     def find_player_structure(self, hp_value, hp_max_value, mp_value, mp_max_value):
         """
-        Encontra estrutura do player buscando HP e MP
+        Encontra estrutura do player buscando HP, HP_MAX, MP e MP_MAX
         """
-        print(f"[SMART] Buscando HP={hp_value} e MP={mp_value}...")
+        print(f"[SMART] Buscando HP={hp_value}/{hp_max_value} e MP={mp_value}/{mp_max_value}...")
         
-        hp_addrs = self.scan_for_value(hp_value)
-        mp_addrs = self.scan_for_value(mp_value)
+        self.matches = self.find_structures(hp_value, hp_max_value, mp_value, mp_max_value)
         
-        print(f"[SMART] Encontrados: {len(hp_addrs)} HP, {len(mp_addrs)} MP")
+        print(f"[SMART] Encontradas: {len(self.matches)} estruturas")
         
-        # Procura estrutura onde HP e MP estao nos offsets corretos
-        for hp_addr in hp_addrs:
-            try:
-                # Verifica HP_MAX
-                hp_max = self.pm.read_int(hp_addr + self.OFFSET_HP_MAX)
-                if hp_max != hp_max_value:
-                    continue
-                
-                # Verifica MP
-                mp = self.pm.read_int(hp_addr + self.OFFSET_MP)
-                if mp != mp_value:
-                    continue
-                
-                # Verifica MP_MAX
-                mp_max = self.pm.read_int(hp_addr + self.OFFSET_MP_MAX)
-                if mp_max != mp_max_value:
-                    continue
-                
-                # ENCONTRADO!
-                self.hp_address = hp_addr
-                self.offsets = {
-                    'hp': hex(hp_addr),
-                    'hp_max': hex(hp_addr + self.OFFSET_HP_MAX),
-                    'mp': hex(hp_addr + self.OFFSET_MP),
-                    'mp_max': hex(hp_addr + self.OFFSET_MP_MAX),
-                    'offset_hp_max': self.OFFSET_HP_MAX,
-                    'offset_mp': self.OFFSET_MP,
-                    'offset_mp_max': self.OFFSET_MP_MAX
-                }
-                self._save_cache()
-                self._connected = True
-                
-                print(f"[SMART] Estrutura encontrada @ {hex(hp_addr)}")
-                return True
-                
-            except:
-                continue
+        if not self.matches:
+            return False
+        
+        # ENCONTRADO!
+        hp_addr = self.matches[0]
+        self.hp_address = hp_addr
+        self.offsets = {
+            'hp': hex(hp_addr),
+            'hp_max': hex(hp_addr + self.OFFSET_HP_MAX),
+            'mp': hex(hp_addr + self.OFFSET_MP),
+            'mp_max': hex(hp_addr + self.OFFSET_MP_MAX),
+            'offset_hp_max': self.OFFSET_HP_MAX,
+            'offset_mp': self.OFFSET_MP,
+            'offset_mp_max': self.OFFSET_MP_MAX
+        }
+        self._save_cache()
+        self._connected = True
         
-        return False
+        print(f"[SMART] Estrutura encontrada @ {hex(hp_addr)}")
+        return True
     
     def auto_scan_interactive(self):
         """
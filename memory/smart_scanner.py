@@ -9,9 +9,6 @@ Estratégia:
 4. Aplica scoring para ranquear o melhor candidato
 """
 
-import ctypes
-from ctypes import wintypes
-import struct
 import time
 import json
 import os
@@ -22,20 +19,14 @@ try:
 except ImportError:
     PYMEM_AVAILABLE = False
 
+from memory.sources import PymemSource
+from memory.parallel_scan import ParallelScanner
+from memory.vector_scanner import (NUMPY_AVAILABLE, STRUCT_SPAN, player_kernel,
+                                   scan_player_structs, scan_player_structs_python)
+
 MEM_COMMIT = 0x1000
 PAGE_READWRITE = 0x04
 
-class MEMORY_BASIC_INFORMATION(ctypes.Structure):
-    _fields_ = [
-        ('BaseAddress', ctypes.c_void_p),
-        ('AllocationBase', ctypes.c_void_p),
-        ('AllocationProtect', wintypes.DWORD),
-        ('RegionSize', ctypes.c_size_t),
-        ('State', wintypes.DWORD),
-        ('Protect', wintypes.DWORD),
-        ('Type', wintypes.DWORD),
-    ]
-
 
 class SmartScanner:
     """
@@ -57,12 +48,43 @@ class SmartScanner:
     # Valores suspeitos de MP_MAX (potências de 2 = buffers, não mana real)
     SUSPICIOUS_MP_VALUES = {256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 65792}
     
-    def __init__(self, process_name="client.exe"):
+    def __init__(self, process_name="client.exe", source=None):
+        """
+        source: MemorySource opcional (dump, /proc/pid/mem...).
+                Se None, conecta ao processo via pymem.
+        """
         self.process_name = process_name
         self.pm = None
+        self._source = source
         self.cache_file = os.path.join(os.path.dirname(__file__), "..", "offsets_cache.json")
+        
+        # Usa o kernel vetorizado (NumPy) quando disponível
+        self.use_numpy = NUMPY_AVAILABLE
+        
+        # Workers da varredura (None = um por núcleo)
+        self.workers = None
+        self._scheduler = None
+        
+        # cancel() antes do scheduler existir: vale para a proxima busca
+        self._cancel_requested = False
+        
+        # Candidatos da última busca (dicts), para diagnóstico/benchmark
+        self.last_candidates = []
+    
+    @property
+    def source(self):
+        """Backend de memória (MemorySource explícito ou o pymem conectado)"""
+        if self._source is None and self.pm is not None:
+            self._source = PymemSource(self.pm)
+        return self._source
+    
+    @source.setter
+    def source(self, value):
+        self._source = value
     
     def connect(self):
+        if self._source is not None:
+            return True
         if not PYMEM_AVAILABLE:
             return False
         try:
@@ -77,36 +99,33 @@ class SmartScanner:
                 self.pm.close_process()
             except:
                 pass
+            self._source = None
         self.pm = None
     
+    def cancel(self):
+        """
+        Cancela um find_player_auto em andamento (ex: botão da GUI).
+        Chamado antes da busca começar, cancela a próxima.
+        """
+        self._cancel_requested = True
+        scheduler = self._scheduler
+        if scheduler:
+            scheduler.cancel()
+    
     def _get_heap_regions(self):
         """Obtém regiões de heap (onde ficam os dados do player)"""
         regions = []
-        address = 0
-        mbi = MEMORY_BASIC_INFORMATION()
-        
-        while address < 0x7FFFFFFFFFFF:
-            result = ctypes.windll.kernel32.VirtualQueryEx(
-                self.pm.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(mbi),
-                ctypes.sizeof(mbi)
-            )
-            
-            if result == 0:
-                break
-            
-            base = mbi.BaseAddress
-            size = mbi.RegionSize
+        
+        for region in self.source.region_map.regions():
+            base = region.base
+            size = region.size
             
             if base and size:
                 # Filtra para heap: endereços altos, tamanho razoável, read/write
                 if base >= 0x100000000:  # Acima de 4GB = heap
-                    if mbi.State == MEM_COMMIT and mbi.Protect == PAGE_READWRITE:
+                    if region.state == MEM_COMMIT and region.protect == PAGE_READWRITE:
                         if 0x10000 <= size <= 50 * 1024 * 1024:
                             regions.append((base, size))
-            
-            address = (base or 0) + (size or 0x10000)
         
         return regions
     
@@ -135,6 +154,18 @@ class SmartScanner:
         
         return score
     
+    def _scan_region(self, data, base):
+        """Aplica os critérios de player sobre o buffer de uma região"""
+        if self.use_numpy:
+            return scan_player_structs(data, base)
+        return self._scan_region_python(data, base)
+    
+    def _scan_region_python(self, data, base):
+        """
+        Versão em Python puro (fallback sem NumPy e referência do benchmark)
+        """
+        return scan_player_structs_python(data, base)
+    
     def find_player_auto(self, progress_callback=None):
         """
         Encontra o player automaticamente procurando por HP == HP_MAX.
@@ -145,7 +176,7 @@ class SmartScanner:
         Returns:
             dict com addr, hp, hp_max, mp, mp_max ou None
         """
-        if not self.pm:
+        if not self.source:
             if not self.connect():
                 return None
         
@@ -161,72 +192,31 @@ class SmartScanner:
         regions = self._get_heap_regions()
         report(5, f"{len(regions)} regiões de heap para escanear")
         
-        candidates = []
-        total = len(regions)
+        # Kernel NumPy libera o GIL -> threads; loop Python -> processos
+        self._scheduler = ParallelScanner(
+            self.source,
+            workers=self.workers,
+            mode="thread" if self.use_numpy else "process"
+        )
+        # Cancel pedido antes do scheduler existir
+        if self._cancel_requested:
+            self._scheduler.cancel()
         
-        for i, (base, size) in enumerate(regions):
-            if total > 0:
-                pct = 5 + int(85 * i / total)
-                if i % 50 == 0:
-                    report(pct, f"Escaneando região {i}/{total}...")
-            
-            try:
-                data = self.pm.read_bytes(base, size)
-                
-                # Procura estruturas válidas (alinhado em 8 bytes)
-                for offset in range(0, len(data) - self.OFFSET_MP_MAX - 4, 8):
-                    # Criterio 1: HP no range válido (150-30000)
-                    hp = struct.unpack_from('<i', data, offset)[0]
-                    if not (150 <= hp <= 30000):
-                        continue
-                    
-                    # Criterio 2: HP == HP_MAX (vida cheia)
-                    hp_max = struct.unpack_from('<i', data, offset + self.OFFSET_HP_MAX)[0]
-                    if hp != hp_max:
-                        continue
-                    
-                    # Criterio 3: MP válido
-                    mp = struct.unpack_from('<i', data, offset + self.OFFSET_MP)[0]
-                    mp_max = struct.unpack_from('<i', data, offset + self.OFFSET_MP_MAX)[0]
-                    
-                    # MP_MAX deve ser diferente de HP_MAX
-                    if mp_max == hp_max:
-                        continue
-                    
-                    # MP_MAX deve estar no range válido
-                    if not (100 <= mp_max <= 100000):
-                        continue
-                    
-                    # MP deve ser > 0 (player com mana)
-                    if not (1 <= mp <= mp_max):
-                        continue
-                    
-                    # MP_MAX não deve ser potência de 2 (valores suspeitos de buffer)
-                    if mp_max in self.SUSPICIOUS_MP_VALUES:
-                        continue
-                    
-                    # Criterio 4: Level válido
-                    level = struct.unpack_from('<i', data, offset + self.OFFSET_LEVEL)[0]
-                    
-                    # Level deve ser diferente de HP (senão pode ser falso positivo)
-                    if level == hp:
-                        continue
-                    
-                    # Level deve estar no range 1-2000
-                    if not (1 <= level <= 2000):
-                        continue
-                    
-                    addr = base + offset
-                    candidates.append({
-                        'addr': addr,
-                        'hp': hp,
-                        'hp_max': hp_max,
-                        'mp': mp,
-                        'mp_max': mp_max,
-                        'level': level
-                    })
-            except Exception:
-                continue
+        candidates = self._scheduler.scan(
+            regions,
+            player_kernel(self.use_numpy),
+            overlap=STRUCT_SPAN,
+            progress_callback=report,
+            progress_range=(5, 90)
+        )
+        
+        if self._scheduler.cancelled:
+            # O cancel vale so para esta busca
+            self._cancel_requested = False
+            report(100, "Busca cancelada")
+            return None
+        
+        self.last_candidates = candidates
         
         elapsed = time.time() - start
         report(95, f"{len(candidates)} candidatos encontrados em {elapsed:.1f}s")
@@ -260,15 +250,15 @@ class SmartScanner:
         Returns:
             dict com hp, hp_max, mp, mp_max se válido, None caso contrário
         """
-        if not self.pm:
+        if not self.source:
             if not self.connect():
                 return None
         
         try:
-            hp = self.pm.read_int(addr)
-            hp_max = self.pm.read_int(addr + self.OFFSET_HP_MAX)
-            mp = self.pm.read_int(addr + self.OFFSET_MP)
-            mp_max = self.pm.read_int(addr + self.OFFSET_MP_MAX)
+            hp = self.source.read_int(addr)
+            hp_max = self.source.read_int(addr + self.OFFSET_HP_MAX)
+            mp = self.source.read_int(addr + self.OFFSET_MP)
+            mp_max = self.source.read_int(addr + self.OFFSET_MP_MAX)
             
             # Validações básicas
             if not (1 <= hp <= hp_max <= 50000):
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+Snapshot Scan - Scan por valor inicial desconhecido (snapshots comprimidos)
+
+O AdvancedScanner so fazia primeiro scan por valor exato: um valor que
+nao aparece na interface do jogo nao podia ser encontrado.
+
+O UnknownValueScan:
+1. Primeiro passo: copia todas as regioes graváveis do heap em blocos
+   (64 KB = 16 paginas) comprimidos (lz4 se instalado, senao zlib nivel
+   1) para um arquivo temporario. Todo endereco alinhado e candidato.
+2. Cada passo seguinte ("changed", "decreased", "increased_by N"...) le
+   os blocos ainda vivos em lotes (read_many), descomprime o snapshot de
+   cada bloco e avalia o predicado vetorizado (NumPy) contra ele
+3. Cada bloco guarda o hash de suas paginas (memory/page_hash.py): o
+   passo seguinte compara os hashes antes de tudo e so descomprime o
+   snapshot / avalia o predicado nas paginas sujas. Bloco sem paginas
+   sujas com predicado de mudanca (changed, increased, decreased...) e
+   descartado sem avaliar nada; bloco sem candidatos sai do arquivo e nao
+   e mais lido
+4. A mascara de candidatos de cada bloco vai junto (np.packbits,
+   comprimida); quando sobram poucos candidatos (results_limit) eles viram um
+   ScanResults (memory/next_scan.py) em memoria
+
+A RAM fica limitada a memory_budget (lotes de leitura) qualquer que seja
+o tamanho do client; o resto fica no disco, comprimido.
+"""
+
+import tempfile
+import time
+import zlib
+from collections import namedtuple
+
+from memory.next_scan import (
+    NUMPY_AVAILABLE, PREDICATES, VALUE_PREDICATES, VALUE_TYPES, ScanResults
+)
+from memory.page_hash import PAGE_SIZE, dirty_pages, dirty_runs, page_hashes
+from memory.stream_reader import StreamReader
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+try:
+    import lz4.block
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+
+def _compress(data):
+    if LZ4_AVAILABLE:
+        return lz4.block.compress(data)
+    return zlib.compress(data, 1)
+
+
+def _decompress(data):
+    if LZ4_AVAILABLE:
+        return lz4.block.decompress(data)
+    return zlib.decompress(data)
+
+
+# Bloco do snapshot (multiplo de pagina)
+DEFAULT_BLOCK = 0x10000
+
+# Memoria usada pelos lotes de leitura de um passo
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+# Abaixo disso os candidatos viram ScanResults (8 bytes cada)
+DEFAULT_RESULTS_LIMIT = 2000000
+
+# Predicados que so podem ser verdade se o valor mudou
+CHANGE_PREDICATES = ("changed", "increased", "decreased", "increased_by", "decreased_by")
+
+# Bloco guardado: regiao dona, endereco/tamanho, posicoes no arquivo e
+# hashes das paginas (mask_len = 0: todos os enderecos sao candidatos)
+Block = namedtuple('Block', 'region address size data_pos data_len mask_pos mask_len count hashes')
+
+
+class _BlockFile:
+    """Arquivo temporario onde os blocos comprimidos sao anexados"""
+
+    def __init__(self, directory=None):
+        self.file = tempfile.TemporaryFile(prefix="snapshot_", dir=directory)
+        self.size = 0
+
+    def append(self, data):
+        position = self.size
+        self.file.seek(position)
+        self.file.write(data)
+        self.size += len(data)
+        return position, len(data)
+
+    def read(self, position, length):
+        self.file.seek(position)
+        return self.file.read(length)
+
+    def close(self):
+        self.file.close()
+
+
+class UnknownValueScan:
+    """
+    Uso:
+        scan = UnknownValueScan(source)
+        scan.first_scan(regions)          # snapshot de tudo
+        scan.next_scan("decreased")       # leve dano
+        scan.next_scan("unchanged")
+        scan.next_scan("increased_by", 50)
+        if scan.results is not None:      # poucos candidatos: ScanResults
+            enderecos = scan.results[:20]
+    """
+
+    def __init__(self, source, value_type="int4", memory_budget=DEFAULT_BUDGET,
+                 block_size=DEFAULT_BLOCK, results_limit=DEFAULT_RESULTS_LIMIT,
+                 directory=None):
+        """
+        source: MemorySource
+        value_type: "int4", "int2" ou "float" (alinhados no proprio tamanho)
+        memory_budget: bytes de RAM usados por passo (lotes de leitura)
+        directory: onde criar o arquivo temporario (padrao: TEMP)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("Scan por valor desconhecido precisa do NumPy (pip install numpy)")
+
+        self.source = source
+        self.value_type = value_type
+        self.dtype = np.dtype(VALUE_TYPES[value_type][1])
+        self.memory_budget = memory_budget
+        self.block_size = block_size
+        self.results_limit = results_limit
+        self.directory = directory
+
+        self._store = None
+        self.blocks = []
+
+        # Candidatos pequenos o bastante para ficar em memoria
+        self.results = None
+
+        # Estatisticas do ultimo passo
+        self.stats = {}
+
+    def __len__(self):
+        if self.results is not None:
+            return len(self.results)
+        return sum(block.count for block in self.blocks)
+
+    @property
+    def stored_bytes(self):
+        """Tamanho do snapshot comprimido em disco"""
+        return self._store.size if self._store else 0
+
+    def close(self):
+        if self._store:
+            self._store.close()
+        self._store = None
+        self.blocks = []
+
+    # ============================================
+    # PRIMEIRO PASSO
+    # ============================================
+
+    def first_scan(self, regions, progress_callback=None):
+        """
+        Snapshot de todas as regioes (lista de (base, size)).
+        Retorna o numero de candidatos (todos os enderecos alinhados).
+        """
+        start = time.perf_counter()
+        self.close()
+        self.results = None
+
+        store = _BlockFile(self.directory)
+        stream = StreamReader(self.source, window=self.block_size)
+        itemsize = self.dtype.itemsize
+        total = sum(size for _, size in regions) or 1
+        done = 0
+        raw = 0
+
+        for base, size in regions:
+            for address, data, owned in stream.chunks(base, size):
+                chunk = bytes(data[:owned])
+                position, length = store.append(_compress(chunk))
+                self.blocks.append(Block(base, address, owned, position, length,
+                                         0, 0, owned // itemsize, page_hashes(chunk)))
+                raw += owned
+
+            done += size
+            if progress_callback:
+                progress_callback(int(done * 100 / total), f"Snapshot {done / 1024 / 1024:.0f} MB")
+
+        self._store = store
+        self.stats = {
+            "seconds": time.perf_counter() - start,
+            "bytes_read": raw,
+            "stored_bytes": store.size,
+            "blocks": len(self.blocks),
+        }
+        print(f"[SNAPSHOT] {raw / 1024 / 1024:.0f} MB em {len(self.blocks)} blocos -> "
+              f"{store.size / 1024 / 1024:.1f} MB comprimido ({self.stats['seconds']:.2f}s)")
+        return len(self)
+
+    # ============================================
+    # PASSOS SEGUINTES
+    # ============================================
+
+    def _batches(self):
+        """Blocos em lotes que cabem no orcamento (snapshot + atual + temporarios)"""
+        limit = max(self.block_size, self.memory_budget // 4)
+        batch = []
+        size = 0
+        for block in self.blocks:
+            if batch and size + block.size > limit:
+                yield batch
+                batch, size = [], 0
+            batch.append(block)
+            size += block.size
+        if batch:
+            yield batch
+
+    def next_scan(self, predicate, value=None):
+        """
+        Mantem os candidatos que satisfazem o predicado contra o passo
+        anterior (changed, unchanged, increased, decreased, increased_by,
+        decreased_by, equal). Retorna o numero de candidatos.
+        """
+        if self.results is not None:
+            self.results = self.results.next_scan(self.source, predicate, value)
+            return len(self.results)
+
+        test = PREDICATES[predicate]
+        if predicate in VALUE_PREDICATES and value is None:
+            raise ValueError(f"Predicado '{predicate}' precisa de um valor")
+
+        # increased_by 0 / decreased_by 0 nao exigem mudanca
+        needs_change = predicate in CHANGE_PREDICATES and not (
+            predicate in ("increased_by", "decreased_by") and value == 0)
+
+        start = time.perf_counter()
+        old_store = self._store
+        store = _BlockFile(self.directory)
+        blocks = []
+        wide = np.float64 if self.value_type == "float" else np.int64
+        stats = {"bytes_read": 0, "identical": 0, "dropped": 0, "pages": 0, "dirty_pages": 0}
+        per_page = PAGE_SIZE // self.dtype.itemsize
+
+        for batch in self._batches():
+            spans = [(block.address, block.size) for block in batch]
+            current_data = self.source.read_many(spans)
+            stats["bytes_read"] += sum(block.size for block in batch)
+
+            for block, current in zip(batch, current_data):
+                if current is None:
+                    stats["dropped"] += 1
+                    continue
+
+                hashes = page_hashes(current)
+                dirty = dirty_pages(block.hashes, hashes)
+                stats["pages"] += len(hashes)
+                stats["dirty_pages"] += len(dirty)
+
+                # Nenhuma pagina mudou desde o snapshot
+                if not dirty:
+                    stats["identical"] += 1
+                    if needs_change:
+                        stats["dropped"] += 1
+                        continue
+                    if predicate in ("unchanged", "any"):
+                        # Snapshot e mascara continuam validos
+                        blocks.append(self._copy_block(block, old_store, store))
+                        continue
+
+                count = block.size // self.dtype.itemsize
+                now = np.frombuffer(current, dtype=self.dtype, count=count)
+
+                if not dirty:
+                    # Pagina limpa: valor do snapshot == valor atual
+                    keep = test(now.astype(wide), now, value)
+                else:
+                    old = _decompress(old_store.read(block.data_pos, block.data_len))
+                    before = np.frombuffer(old, dtype=self.dtype, count=count)
+                    runs = [(first * per_page, end * per_page) for first, end in dirty_runs(dirty)]
+
+                    if needs_change:
+                        # So as paginas sujas podem ter mudado
+                        keep = np.zeros(count, dtype=bool)
+                        for lo, hi in runs:
+                            keep[lo:hi] = test(now[lo:hi].astype(wide), before[lo:hi], value)
+                    else:
+                        reference = now.copy()
+                        for lo, hi in runs:
+                            reference[lo:hi] = before[lo:hi]
+                        keep = test(now.astype(wide), reference, value)
+
+                if block.mask_len:
+                    mask = _decompress(old_store.read(block.mask_pos, block.mask_len))
+                    keep &= np.unpackbits(np.frombuffer(mask, np.uint8), count=count).astype(bool)
+
+                survivors = int(np.count_nonzero(keep))
+                if not survivors:
+                    stats["dropped"] += 1
+                    continue
+
+                data_pos, data_len = store.append(_compress(current))
+                mask_pos = mask_len = 0
+                if survivors < count:
+                    mask_pos, mask_len = store.append(_compress(np.packbits(keep).tobytes()))
+                blocks.append(Block(block.region, block.address, block.size,
+                                    data_pos, data_len, mask_pos, mask_len, survivors, hashes))
+
+        old_store.close()
+        self._store = store
+        self.blocks = blocks
+
+        stats["seconds"] = time.perf_counter() - start
+        stats["stored_bytes"] = store.size
+        stats["blocks"] = len(blocks)
+        self.stats = stats
+
+        candidates = len(self)
+        print(f"[SNAPSHOT] {predicate}{'' if value is None else f' {value}'}: {candidates} candidatos "
+              f"em {len(blocks)} blocos ({stats['identical']} blocos iguais, "
+              f"{stats['dirty_pages']}/{stats['pages']} paginas sujas, "
+              f"{stats['bytes_read'] / 1024 / 1024:.0f} MB lidos, {stats['seconds']:.2f}s)")
+
+        if candidates <= self.results_limit:
+            self.results = self._to_results()
+            self.close()
+        return candidates
+
+    @staticmethod
+    def _copy_block(block, old_store, store):
+        """Copia um bloco inalterado (sem descomprimir de novo)"""
+        data_pos, data_len = store.append(old_store.read(block.data_pos, block.data_len))
+        mask_pos = mask_len = 0
+        if block.mask_len:
+            mask_pos, mask_len = store.append(old_store.read(block.mask_pos, block.mask_len))
+        return block._replace(data_pos=data_pos, data_len=data_len,
+                              mask_pos=mask_pos, mask_len=mask_len)
+
+    def _to_results(self):
+        """Candidatos restantes -> ScanResults (offsets por regiao + valores)"""
+        itemsize = self.dtype.itemsize
+        grouped = {}
+
+        for block in self.blocks:
+            count = block.size // itemsize
+            values = np.frombuffer(_decompress(self._store.read(block.data_pos, block.data_len)),
+                                   dtype=self.dtype, count=count)
+            if block.mask_len:
+                mask = _decompress(self._store.read(block.mask_pos, block.mask_len))
+                index = np.flatnonzero(np.unpackbits(np.frombuffer(mask, np.uint8), count=count))
+            else:
+                index = np.arange(count)
+
+            offsets = (index * itemsize + (block.address - block.region)).astype(np.uint32)
+            grouped.setdefault(block.region, []).append((offsets, values[index]))
+
+        regions = {}
+        for base, parts in grouped.items():
+            regions[base] = (np.concatenate([offsets for offsets, _ in parts]),
+                             np.concatenate([values for _, values in parts]))
+        return ScanResults(self.value_type, regions)
@@ -0,0 +1,677 @@
+# -*- coding: utf-8 -*-
+"""
+Memory Sources - Backends plugaveis de leitura de memoria
+
+Todos os scanners leem memoria atraves de um MemorySource, que oferece:
+- enumeracao de regioes (equivalente ao VirtualQueryEx)
+- leituras em bloco (read_bytes)
+- leituras espalhadas (read_many: varios spans de uma vez)
+- leitura de estruturas (read_struct: um bloco, varios campos decodificados)
+
+Implementacoes:
+- PymemSource:    processo Windows vivo (pymem + VirtualQueryEx)
+- ProcMemSource:  processo Linux vivo (/proc/<pid>/maps + /proc/<pid>/mem)
+- DumpFileSource: arquivo de dump mapeado em memoria (mmap)
+
+Assim o mesmo scanner roda contra o client.exe, contra um processo Linux
+(Wine) ou contra um dump salvo - util para benchmarks reproduziveis.
+"""
+
+import bisect
+import ctypes
+from ctypes import wintypes
+import mmap
+import os
+import re
+import struct
+from collections import namedtuple
+
+
+# Windows API (os outros backends usam os mesmos valores)
+MEM_COMMIT = 0x1000
+MEM_RESERVE = 0x2000
+MEM_FREE = 0x10000
+MEM_PRIVATE = 0x20000
+MEM_MAPPED = 0x40000
+MEM_IMAGE = 0x1000000
+
+PAGE_NOACCESS = 0x01
+PAGE_READONLY = 0x02
+PAGE_READWRITE = 0x04
+PAGE_WRITECOPY = 0x08
+PAGE_EXECUTE_READ = 0x20
+PAGE_EXECUTE_READWRITE = 0x40
+
+READABLE_PROTECT = (PAGE_READONLY, PAGE_READWRITE, PAGE_WRITECOPY,
+                    PAGE_EXECUTE_READ, PAGE_EXECUTE_READWRITE)
+
+# Limite do espaco de usuario em 64-bit
+MAX_ADDRESS = 0x7FFFFFFFFFFF
+
+# read_many: spans a ate essa distancia sao lidos em um unico bloco
+READ_MANY_GAP = 0x1000
+
+
+class MEMORY_BASIC_INFORMATION(ctypes.Structure):
+    _fields_ = [
+        ("BaseAddress", ctypes.c_void_p),
+        ("AllocationBase", ctypes.c_void_p),
+        ("AllocationProtect", wintypes.DWORD),
+        ("RegionSize", ctypes.c_size_t),
+        ("State", wintypes.DWORD),
+        ("Protect", wintypes.DWORD),
+        ("Type", wintypes.DWORD),
+    ]
+
+
+# Regiao de memoria (mesmos campos do MEMORY_BASIC_INFORMATION)
+MemoryRegion = namedtuple('MemoryRegion', 'base size allocation_base state protect type')
+
+
+class StructLayout:
+    """
+    Layout de uma estrutura do client: {campo: (offset, formato struct)}.
+
+    Ex:
+        layout = StructLayout({'hp': (0x0, '<i'), 'mp': (0x620, '<i')}, size=0x630)
+        values = source.read_struct(addr, layout)
+    """
+
+    def __init__(self, fields, size=None):
+        self.fields = {name: (offset, struct.Struct(fmt))
+                       for name, (offset, fmt) in fields.items()}
+        end = max(offset + fmt.size for offset, fmt in self.fields.values())
+        self.size = max(size or 0, end)
+
+    def decode(self, data, base=0):
+        """Decodifica os campos de data (a estrutura comeca em data[base])"""
+        return {name: fmt.unpack_from(data, base + offset)[0]
+                for name, (offset, fmt) in self.fields.items()}
+
+
+class MemoryReadError(OSError):
+    """Falha ao ler um endereco (regiao inexistente ou sem permissao)"""
+
+
+class MemorySource:
+    """
+    Interface de leitura de memoria usada pelos scanners.
+
+    Subclasses implementam query(), read_bytes() e main_module().
+    O resto (walk de regioes, leituras tipadas, read_many) tem
+    implementacao padrao em cima desses metodos.
+    """
+
+    process_id = None
+
+    # query() e uma syscall barata por regiao (VirtualQueryEx): o RegionMap
+    # pode re-consultar so as alocacoes alteradas. Backends que listam tudo
+    # de uma vez (maps, indice do dump) preferem recarregar inteiro.
+    incremental_refresh = True
+
+    _region_map = None
+
+    @property
+    def region_map(self):
+        """RegionMap compartilhado por todos os scanners que usam este source"""
+        if self._region_map is None:
+            from memory.region_map import RegionMap
+            self._region_map = RegionMap(self)
+        return self._region_map
+
+    def query(self, address):
+        """Retorna a MemoryRegion que contem address (ou a proxima), None no fim"""
+        raise NotImplementedError
+
+    def regions(self, start=0, end=MAX_ADDRESS):
+        """Enumera todas as regioes entre start e end (como o loop de VirtualQueryEx)"""
+        address = start
+        while address < end:
+            region = self.query(address)
+            if region is None:
+                break
+
+            yield region
+
+            next_address = region.base + region.size
+            address = next_address if next_address > address else address + 0x10000
+
+    def committed_regions(self, start=0, end=MAX_ADDRESS):
+        """Apenas regioes MEM_COMMIT com protecao legivel"""
+        for region in self.regions(start, end):
+            if region.state == MEM_COMMIT and region.protect in READABLE_PROTECT:
+                yield region
+
+    def read_bytes(self, address, size):
+        """Le size bytes a partir de address"""
+        raise NotImplementedError
+
+    def read_into(self, address, buffer):
+        """
+        Le len(buffer) bytes a partir de address direto em um buffer
+        gravavel (bytearray/memoryview), sem alocar um bytes novo.
+
+        Retorna o numero de bytes lidos.
+        """
+        data = self.read_bytes(address, len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def read_many(self, spans, max_gap=READ_MANY_GAP):
+        """
+        Le varios spans (address, size) de uma vez.
+
+        Spans proximos (distancia <= max_gap) sao agrupados e lidos com um
+        unico read_bytes: os campos do player (HP ... MP_MAX em 0x630 bytes)
+        viram uma syscall e saem do mesmo instante do jogo.
+
+        Retorna lista na mesma ordem; spans ilegiveis viram None.
+        """
+        results = [None] * len(spans)
+
+        # Agrupa spans vizinhos em blocos [inicio, fim, indices]
+        blocks = []
+        for i in sorted(range(len(spans)), key=lambda i: spans[i][0]):
+            address, size = spans[i]
+            if blocks and address - blocks[-1][1] <= max_gap:
+                blocks[-1][1] = max(blocks[-1][1], address + size)
+                blocks[-1][2].append(i)
+            else:
+                blocks.append([address, address + size, [i]])
+
+        for start, end, indexes in blocks:
+            try:
+                data = self.read_bytes(start, end - start)
+            except Exception:
+                # Bloco cruza uma pagina ilegivel: le span a span
+                for i in indexes:
+                    try:
+                        results[i] = self.read_bytes(*spans[i])
+                    except Exception:
+                        pass
+                continue
+
+            for i in indexes:
+                offset = spans[i][0] - start
+                results[i] = data[offset:offset + spans[i][1]]
+
+        return results
+
+    def read_struct(self, address, layout):
+        """
+        Le layout.size bytes em uma unica leitura e decodifica os campos.
+
+        Retorna dict {campo: valor} (ver StructLayout).
+        """
+        return layout.decode(self.read_bytes(address, layout.size))
+
+    def main_module(self):
+        """Retorna (base, size) do modulo principal (client.exe)"""
+        raise NotImplementedError
+
+    @property
+    def base_address(self):
+        return self.main_module()[0]
+
+    def close(self):
+        """Libera recursos do backend"""
+
+    # Leituras tipadas (mesma API do pymem)
+
+    def read_int(self, address):
+        return struct.unpack('<i', self.read_bytes(address, 4))[0]
+
+    def read_uint(self, address):
+        return struct.unpack('<I', self.read_bytes(address, 4))[0]
+
+    def read_short(self, address):
+        return struct.unpack('<h', self.read_bytes(address, 2))[0]
+
+    def read_float(self, address):
+        return struct.unpack('<f', self.read_bytes(address, 4))[0]
+
+    def read_longlong(self, address):
+        return struct.unpack('<q', self.read_bytes(address, 8))[0]
+
+    def read_ulonglong(self, address):
+        return struct.unpack('<Q', self.read_bytes(address, 8))[0]
+
+
+# ============================================
+# WINDOWS (pymem)
+# ============================================
+
+class PymemSource(MemorySource):
+    """
+    Processo Windows vivo, via pymem + VirtualQueryEx
+    """
+
+    def __init__(self, pm):
+        """
+        pm: instancia de pymem.Pymem conectada
+        """
+        self.pm = pm
+        self.process_id = pm.process_id
+        self._mbi = MEMORY_BASIC_INFORMATION()
+        self._module = None
+
+    def __reduce__(self):
+        # Handles nao atravessam processos: o worker reabre pelo PID
+        return (_open_pymem_source, (self.process_id,))
+
+    def query(self, address):
+        mbi = self._mbi
+        result = ctypes.windll.kernel32.VirtualQueryEx(
+            self.pm.process_handle,
+            ctypes.c_void_p(address),
+            ctypes.byref(mbi),
+            ctypes.sizeof(mbi)
+        )
+
+        if result == 0:
+            return None
+
+        return MemoryRegion(
+            mbi.BaseAddress or 0,
+            mbi.RegionSize or 0,
+            mbi.AllocationBase or 0,
+            mbi.State,
+            mbi.Protect,
+            mbi.Type
+        )
+
+    def read_bytes(self, address, size):
+        return self.pm.read_bytes(address, size)
+
+    def read_into(self, address, buffer):
+        # ReadProcessMemory direto no buffer preexistente (sem bytes intermediario)
+        size = len(buffer)
+        target = (ctypes.c_char * size).from_buffer(buffer)
+        read = ctypes.c_size_t(0)
+        ok = ctypes.windll.kernel32.ReadProcessMemory(
+            self.pm.process_handle,
+            ctypes.c_void_p(address),
+            target,
+            ctypes.c_size_t(size),
+            ctypes.byref(read)
+        )
+        if not ok:
+            raise MemoryReadError(f"Falha ao ler {hex(address)}")
+        return read.value
+
+    def read_int(self, address):
+        return self.pm.read_int(address)
+
+    def read_longlong(self, address):
+        return self.pm.read_longlong(address)
+
+    def main_module(self):
+        if self._module is None:
+            module = getattr(self.pm, 'process_base', None)
+            self._module = (self.pm.base_address, module.SizeOfImage if module else 0)
+        return self._module
+
+    def close(self):
+        try:
+            self.pm.close_process()
+        except Exception:
+            pass
+
+
+def _open_pymem_source(pid):
+    """Reabre um PymemSource pelo PID (usado pelos workers do parallel_scan)"""
+    import pymem
+    pm = pymem.Pymem()
+    pm.open_process_from_id(pid)
+    return PymemSource(pm)
+
+
+# ============================================
+# LINUX (/proc/<pid>/mem)
+# ============================================
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+_PERMS_TO_PROTECT = {
+    'r--': PAGE_READONLY,
+    'rw-': PAGE_READWRITE,
+    'r-x': PAGE_EXECUTE_READ,
+    'rwx': PAGE_EXECUTE_READWRITE,
+}
+
+_SHARED_LIB = re.compile(r'\.so(\.|$)')
+
+
+class ProcMemSource(MemorySource):
+    """
+    Processo Linux vivo (ex: client rodando no Wine, ou qualquer processo
+    de teste), via /proc/<pid>/maps e /proc/<pid>/mem.
+
+    Requer permissao de ptrace sobre o processo (mesmo usuario + ptrace_scope 0, ou root).
+    """
+
+    incremental_refresh = False
+
+    def __init__(self, pid):
+        self.process_id = pid
+        self._fd = os.open(f"/proc/{pid}/mem", os.O_RDONLY)
+        self._regions = None
+        self._module = (0, 0)
+
+        # process_vm_readv le varios spans em uma unica syscall
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            self._vm_readv = libc.process_vm_readv
+            self._vm_readv.restype = ctypes.c_ssize_t
+            self._vm_readv.argtypes = [ctypes.c_int,
+                                       ctypes.POINTER(_IOVec), ctypes.c_ulong,
+                                       ctypes.POINTER(_IOVec), ctypes.c_ulong,
+                                       ctypes.c_ulong]
+        except (OSError, AttributeError):
+            self._vm_readv = None
+
+    def __reduce__(self):
+        return (ProcMemSource, (self.process_id,))
+
+    def _load_maps(self):
+        """Le /proc/<pid>/maps e converte para MemoryRegion"""
+        try:
+            exe = os.path.realpath(f"/proc/{self.process_id}/exe")
+        except OSError:
+            exe = None
+
+        regions = []
+        allocation = {}
+        module_start = module_end = 0
+
+        with open(f"/proc/{self.process_id}/maps", 'r') as f:
+            for line in f:
+                parts = line.split(None, 5)
+                start, end = (int(x, 16) for x in parts[0].split('-'))
+                perms = parts[1]
+                path = parts[5].strip() if len(parts) > 5 else ''
+
+                protect = _PERMS_TO_PROTECT.get(perms[:3], PAGE_NOACCESS)
+
+                if path.startswith('/') and (path == exe or _SHARED_LIB.search(path)):
+                    mem_type = MEM_IMAGE
+                elif path.startswith('/'):
+                    mem_type = MEM_MAPPED
+                else:
+                    mem_type = MEM_PRIVATE
+
+                # Mapeamentos do mesmo arquivo compartilham a "allocation base"
+                if path.startswith('/'):
+                    allocation_base = allocation.setdefault(path, start)
+                else:
+                    allocation_base = start
+
+                regions.append(MemoryRegion(start, end - start, allocation_base,
+                                            MEM_COMMIT, protect, mem_type))
+
+                if exe and path == exe:
+                    module_start = module_start or start
+                    module_end = end
+
+        self._module = (module_start, module_end - module_start)
+        return regions
+
+    def regions(self, start=0, end=MAX_ADDRESS):
+        self._regions = self._load_maps()
+        for region in self._regions:
+            if region.base + region.size <= start:
+                continue
+            if region.base >= end:
+                break
+            yield region
+
+    def query(self, address):
+        regions = self._load_maps()
+        self._regions = regions
+        i = bisect.bisect_right([r.base for r in regions], address) - 1
+        if i >= 0 and address < regions[i].base + regions[i].size:
+            return regions[i]
+        if i + 1 < len(regions):
+            return regions[i + 1]
+        return None
+
+    def read_bytes(self, address, size):
+        try:
+            data = os.pread(self._fd, size, address)
+        except OSError as e:
+            raise MemoryReadError(f"Falha ao ler {hex(address)}: {e}")
+        if len(data) != size:
+            raise MemoryReadError(f"Leitura parcial em {hex(address)}")
+        return data
+
+    def read_into(self, address, buffer):
+        try:
+            read = os.preadv(self._fd, [buffer], address)
+        except OSError as e:
+            raise MemoryReadError(f"Falha ao ler {hex(address)}: {e}")
+        if read != len(buffer):
+            raise MemoryReadError(f"Leitura parcial em {hex(address)}")
+        return read
+
+    def read_many(self, spans, max_gap=READ_MANY_GAP):
+        if self._vm_readv is None or not spans:
+            return super().read_many(spans, max_gap)
+
+        # Uma syscall para todos os spans (iovecs remotos -> buffers locais)
+        count = len(spans)
+        buffers = [ctypes.create_string_buffer(size) for _, size in spans]
+        local = (_IOVec * count)()
+        remote = (_IOVec * count)()
+        for i, (address, size) in enumerate(spans):
+            local[i].iov_base = ctypes.cast(buffers[i], ctypes.c_void_p)
+            local[i].iov_len = size
+            remote[i].iov_base = address
+            remote[i].iov_len = size
+
+        total = self._vm_readv(self.process_id, local, count, remote, count, 0)
+        if total == sum(size for _, size in spans):
+            return [buf.raw for buf in buffers]
+
+        # Algum span falhou: refaz em blocos para saber qual
+        return super().read_many(spans, max_gap)
+
+    def main_module(self):
+        if self._regions is None:
+            self._regions = self._load_maps()
+        return self._module
+
+    def close(self):
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+# ============================================
+# DUMP (arquivo mapeado em memoria)
+# ============================================
+
+# Formato do dump:
+#   header (48 bytes):  magic, versao, n_regioes, offset_indice, modulo_base, modulo_size
+#   dados:              conteudo de cada regiao, alinhado em 4KB
+#   indice (no final):  por regiao: base, size, allocation_base, state, protect, type, offset_no_arquivo
+DUMP_MAGIC = b'BAIAKDMP'
+DUMP_VERSION = 1
+_DUMP_HEADER = struct.Struct('<8sIIQQQQ')
+_DUMP_ENTRY = struct.Struct('<QQQIIIIQ')
+_DUMP_ALIGN = 0x1000
+
+
+def write_dump(path, regions, main_module=(0, 0)):
+    """
+    Grava um dump a partir de um iteravel de (MemoryRegion, data).
+
+    As regioes sao gravadas uma a uma (o dump nao precisa caber na RAM).
+    """
+    entries = []
+
+    with open(path, 'wb') as f:
+        f.write(b'\0' * _DUMP_HEADER.size)
+
+        for region, data in regions:
+            offset = f.tell()
+            pad = (-offset) % _DUMP_ALIGN
+            if pad:
+                f.write(b'\0' * pad)
+                offset += pad
+
+            f.write(data)
+            entries.append((region.base, len(data), region.allocation_base,
+                            region.state, region.protect, region.type, 0, offset))
+
+        index_offset = f.tell()
+        for entry in entries:
+            f.write(_DUMP_ENTRY.pack(*entry))
+
+        f.seek(0)
+        f.write(_DUMP_HEADER.pack(DUMP_MAGIC, DUMP_VERSION, len(entries), index_offset,
+                                  main_module[0], main_module[1], 0))
+
+    return len(entries)
+
+
+def dump_process(source, path, start=0, end=MAX_ADDRESS):
+    """
+    Copia todas as regioes commit/legiveis de um MemorySource para um dump.
+
+    Ex: dump_process(PymemSource(pm), "client.dmp") no Windows, depois
+    DumpFileSource("client.dmp") em qualquer maquina.
+    """
+    def readable():
+        for region in source.committed_regions(start, end):
+            try:
+                yield region, source.read_bytes(region.base, region.size)
+            except Exception:
+                continue
+
+    return write_dump(path, readable(), source.main_module())
+
+
+class DumpFileSource(MemorySource):
+    """
+    Dump de memoria em arquivo, mapeado com mmap (sem carregar na RAM).
+    """
+
+    incremental_refresh = False
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, index_offset, mod_base, mod_size, _ = \
+            _DUMP_HEADER.unpack_from(self._mm, 0)
+        if magic != DUMP_MAGIC or version != DUMP_VERSION:
+            raise ValueError(f"Arquivo de dump invalido: {path}")
+
+        self._module = (mod_base, mod_size)
+        self._regions = []
+        self._offsets = []
+        for i in range(count):
+            base, size, alloc, state, protect, mem_type, _, offset = \
+                _DUMP_ENTRY.unpack_from(self._mm, index_offset + i * _DUMP_ENTRY.size)
+            self._regions.append(MemoryRegion(base, size, alloc, state, protect, mem_type))
+            self._offsets.append(offset)
+
+        self._bases = [r.base for r in self._regions]
+
+    def __reduce__(self):
+        return (DumpFileSource, (self.path,))
+
+    def regions(self, start=0, end=MAX_ADDRESS):
+        i = max(0, bisect.bisect_right(self._bases, start) - 1)
+        for region in self._regions[i:]:
+            if region.base + region.size <= start:
+                continue
+            if region.base >= end:
+                break
+            yield region
+
+    def query(self, address):
+        i = bisect.bisect_right(self._bases, address) - 1
+        if i >= 0 and address < self._bases[i] + self._regions[i].size:
+            return self._regions[i]
+        if i + 1 < len(self._regions):
+            return self._regions[i + 1]
+        return None
+
+    def view(self, address, size):
+        """memoryview sem copia do conteudo em [address, address+size)"""
+        i = bisect.bisect_right(self._bases, address) - 1
+        if i < 0:
+            raise MemoryReadError(f"Endereco fora do dump: {hex(address)}")
+
+        region = self._regions[i]
+        rel = address - region.base
+        if rel + size > region.size:
+            raise MemoryReadError(f"Endereco fora do dump: {hex(address)}")
+
+        offset = self._offsets[i] + rel
+        return memoryview(self._mm)[offset:offset + size]
+
+    def read_bytes(self, address, size):
+        return bytes(self.view(address, size))
+
+    def read_into(self, address, buffer):
+        buffer[:] = self.view(address, len(buffer))
+        return len(buffer)
+
+    def main_module(self):
+        return self._module
+
+    def close(self):
+        try:
+            self._mm.close()
+            self._file.close()
+        except Exception:
+            pass
+
+
+def as_source(obj):
+    """
+    Aceita um MemorySource ou um pymem.Pymem e retorna um MemorySource
+    """
+    if obj is None or isinstance(obj, MemorySource):
+        return obj
+    return PymemSource(obj)
+
+
+def main():
+    """
+    Salva um dump do processo para rodar scanners/benchmarks offline.
+
+    Uso:
+        python -m memory.sources client.dmp            (Windows, client.exe)
+        python -m memory.sources client.dmp --pid 1234 (Linux, /proc/<pid>/mem)
+    """
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Salva um dump de memoria do client")
+    parser.add_argument('output', help='arquivo de saida (.dmp)')
+    parser.add_argument('--pid', type=int, help='PID (Linux: usa /proc/<pid>/mem)')
+    parser.add_argument('--process', default='client.exe', help='nome do processo (Windows)')
+    args = parser.parse_args()
+
+    if args.pid:
+        source = ProcMemSource(args.pid)
+    else:
+        import pymem
+        source = PymemSource(pymem.Pymem(args.process))
+
+    start = time.time()
+    count = dump_process(source, args.output)
+    size = os.path.getsize(args.output) / 1024 / 1024
+    print(f"[DUMP] {count} regioes, {size:.1f} MB em {time.time() - start:.1f}s -> {args.output}")
+    source.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Stream Reader - Leitura de regioes em janelas fixas com buffer reutilizavel
+
+Antes os scanners faziam read_bytes(base, size) em regioes de ate 100 MB:
+um bytes novo por regiao, e o RSS do bot subia centenas de MB durante a
+varredura.
+
+O StreamReader le cada regiao em janelas de tamanho fixo para dentro de
+UM bytearray preallocado (MemorySource.read_into -> ReadProcessMemory /
+preadv direto no buffer). Janelas consecutivas se sobrepoem em `overlap`
+bytes (ex: 0x630 para a estrutura do player) para nenhuma ocorrencia se
+perder na fronteira; cada janela so "possui" as posicoes que COMECAM
+antes do inicio da proxima.
+
+O pico de memoria fica em ~2x (window + overlap), qualquer que seja o client.
+"""
+
+# Janela padrao (multiplo de pagina, preserva o alinhamento dos kernels)
+DEFAULT_WINDOW = 1024 * 1024
+WINDOW_ALIGN = 0x1000
+
+# Span da estrutura do player (HP ate o fim de MP_MAX, arredondado)
+PLAYER_OVERLAP = 0x630
+
+
+def result_address(item):
+    """Endereco de um resultado de kernel (int ou dict com 'addr')"""
+    if isinstance(item, dict):
+        return item['addr']
+    return item
+
+
+class StreamReader:
+    """
+    Uso:
+        stream = StreamReader(source, overlap=len(needle) - 1)
+        for address, data, owned in stream.chunks(base, size):
+            pos = data.find(needle)
+            ...                       # so conta pos < owned
+
+    data e o proprio bytearray interno (janelas cheias) e so e valido ate
+    a proxima iteracao: copie com bytes(...) se precisar guardar. A ultima
+    janela de cada regiao, menor que o buffer, vem como bytes (no maximo
+    window + overlap bytes), assim data sempre tem find() e buffer protocol.
+    """
+
+    def __init__(self, source, window=DEFAULT_WINDOW, overlap=0):
+        """
+        source: MemorySource
+        window: bytes "possuidos" por janela (arredondado para pagina)
+        overlap: bytes extras lidos depois de cada janela
+        """
+        self.source = source
+        self.window = max(WINDOW_ALIGN, window - window % WINDOW_ALIGN)
+        self.overlap = overlap
+
+        self._buffer = bytearray(self.window + overlap)
+        self._view = memoryview(self._buffer)
+
+        # Estatisticas
+        self.bytes_read = 0
+        self.failed_windows = 0
+
+    @property
+    def buffer_size(self):
+        return len(self._buffer)
+
+    def chunks(self, base, size, limit=None):
+        """
+        Gera (address, data, owned) para a regiao [base, base + size).
+
+        limit: ate onde o overlap pode ler (padrao: base + size). Usado
+               quando [base, base + size) e uma fatia de uma regiao maior.
+        Janelas ilegiveis sao puladas.
+        """
+        end = base + size
+        limit = end if limit is None else limit
+        address = base
+
+        while address < end:
+            owned = min(self.window, end - address)
+            read = min(owned + self.overlap, limit - address)
+            view = self._view[:read]
+
+            try:
+                count = self.source.read_into(address, view)
+            except Exception:
+                self.failed_windows += 1
+                address += owned
+                continue
+
+            self.bytes_read += count
+            if count == len(self._buffer):
+                yield address, self._buffer, owned
+            else:
+                yield address, bytes(view[:count]), owned
+            address += owned
+
+    def scan(self, base, size, kernel, limit=None):
+        """
+        Aplica kernel(data, address) em cada janela e descarta resultados
+        que comecam no overlap (pertencem a proxima janela).
+
+        Retorna a lista de resultados (ints ou dicts com 'addr').
+        """
+        results = []
+        for address, data, owned in self.chunks(base, size, limit):
+            found = kernel(data, address)
+            if len(data) > owned:
+                stop = address + owned
+                found = [item for item in found if result_address(item) < stop]
+            results.extend(found)
+        return results
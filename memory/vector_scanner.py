@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+Vector Scanner - Kernels NumPy para busca da estrutura do player
+
+Em vez de percorrer a região offset por offset com struct.unpack_from,
+cada buffer é visto como um array int32 (numpy.frombuffer) e os critérios
+do SmartScanner viram máscaras booleanas sobre views deslocadas:
+
+    hp     = words[0::2]          (offset +0x0)
+    hp_max = words[2::2]          (offset +0x8)
+    level  = words[5::2]          (offset +0x14)
+    mp     = words[0x188::2]      (offset +0x620)
+    mp_max = words[0x18A::2]      (offset +0x628)
+
+Os candidatos retornados são os mesmos dicts do loop original.
+scan_player_structs_python é o loop original (fallback sem NumPy).
+
+scan_hp_candidates aplica as 12 regras do AutoScanner
+(validate_player_values) direto no buffer, sem ler o processo de novo.
+"""
+
+import struct
+
+from memory.sources import StructLayout
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Offsets confirmados para Tibia 15.11 BaiakZika
+OFFSET_HP_MAX = 0x8
+OFFSET_MP = 0x620
+OFFSET_MP_MAX = 0x628
+OFFSET_LEVEL = 0x14
+
+# Tamanho mínimo da estrutura a partir do HP (até o fim de MP_MAX)
+STRUCT_SPAN = OFFSET_MP_MAX + 4
+
+# Bloco do player lido de uma vez (MemorySource.read_struct)
+PLAYER_LAYOUT = StructLayout({
+    'hp': (0, '<i'),
+    'hp_max': (OFFSET_HP_MAX, '<i'),
+    'level': (OFFSET_LEVEL, '<i'),
+    'mp': (OFFSET_MP, '<i'),
+    'mp_max': (OFFSET_MP_MAX, '<i'),
+}, size=0x630)
+
+# Valores suspeitos de MP_MAX (potências de 2 = buffers, não mana real)
+SUSPICIOUS_MP_VALUES = (256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 65792)
+
+
+def as_int32(data):
+    """
+    Retorna uma view int32 little-endian do buffer (sem copiar).
+    Bytes finais que não formam um int32 completo são ignorados.
+    """
+    usable = len(data) - (len(data) % 4)
+    return np.frombuffer(data, dtype='<i4', count=usable // 4)
+
+
+def scan_player_structs(data, base, hp_min=150, hp_limit=30000, step=8):
+    """
+    Procura estruturas de player com vida cheia dentro de um buffer.
+
+    Aplica os mesmos critérios de SmartScanner.find_player_auto:
+    HP no range, HP == HP_MAX, MP_MAX válido e diferente de HP_MAX,
+    1 <= MP <= MP_MAX, MP_MAX fora dos valores suspeitos e level
+    entre 1-2000 e diferente de HP.
+
+    Args:
+        data: bytes/bytearray/memoryview com o conteúdo da região
+        base: endereço base da região (para calcular 'addr')
+        step: alinhamento dos candidatos em bytes (múltiplo de 4)
+
+    Returns:
+        lista de dicts com addr, hp, hp_max, mp, mp_max, level
+    """
+    # Mesmo intervalo do loop: range(0, len(data) - OFFSET_MP_MAX - 4, step)
+    count = len(range(0, len(data) - STRUCT_SPAN, step))
+    if count <= 0:
+        return []
+
+    words = as_int32(data)
+    stride = step // 4
+    stop = stride * count
+
+    # Critério 1 e 2: máscaras sobre views deslocadas (sem cópia)
+    hp = words[0:stop:stride]
+    hp_max = words[OFFSET_HP_MAX // 4:OFFSET_HP_MAX // 4 + stop:stride]
+
+    mask = (hp >= hp_min) & (hp <= hp_limit)
+    mask &= hp == hp_max
+
+    idx = np.flatnonzero(mask)
+    if idx.size == 0:
+        return []
+
+    # Critérios 3 e 4: só para os sobreviventes (gather)
+    w = idx * stride
+    hp = words[w]
+    mp = words[w + OFFSET_MP // 4]
+    mp_max = words[w + OFFSET_MP_MAX // 4]
+    level = words[w + OFFSET_LEVEL // 4]
+
+    keep = mp_max != hp
+    keep &= (mp_max >= 100) & (mp_max <= 100000)
+    keep &= (mp >= 1) & (mp <= mp_max)
+    keep &= ~np.isin(mp_max, SUSPICIOUS_MP_VALUES)
+    keep &= level != hp
+    keep &= (level >= 1) & (level <= 2000)
+
+    candidates = []
+    for i in np.flatnonzero(keep):
+        value = int(hp[i])
+        candidates.append({
+            'addr': base + int(w[i]) * 4,
+            'hp': value,
+            'hp_max': value,
+            'mp': int(mp[i]),
+            'mp_max': int(mp_max[i]),
+            'level': int(level[i])
+        })
+
+    return candidates
+
+
+def scan_player_structs_python(data, base, hp_min=150, hp_limit=30000, step=8):
+    """
+    Versão em Python puro de scan_player_structs (fallback sem NumPy e
+    referência do benchmark). Mesmos critérios e mesmo retorno.
+    """
+    candidates = []
+
+    for offset in range(0, len(data) - STRUCT_SPAN, step):
+        # Criterio 1: HP no range válido (150-30000)
+        hp = struct.unpack_from('<i', data, offset)[0]
+        if not (hp_min <= hp <= hp_limit):
+            continue
+
+        # Criterio 2: HP == HP_MAX (vida cheia)
+        hp_max = struct.unpack_from('<i', data, offset + OFFSET_HP_MAX)[0]
+        if hp != hp_max:
+            continue
+
+        # Criterio 3: MP válido
+        mp = struct.unpack_from('<i', data, offset + OFFSET_MP)[0]
+        mp_max = struct.unpack_from('<i', data, offset + OFFSET_MP_MAX)[0]
+
+        # MP_MAX deve ser diferente de HP_MAX
+        if mp_max == hp_max:
+            continue
+
+        # MP_MAX deve estar no range válido
+        if not (100 <= mp_max <= 100000):
+            continue
+
+        # MP deve ser > 0 (player com mana)
+        if not (1 <= mp <= mp_max):
+            continue
+
+        # MP_MAX não deve ser potência de 2 (valores suspeitos de buffer)
+        if mp_max in SUSPICIOUS_MP_VALUES:
+            continue
+
+        # Criterio 4: Level válido
+        level = struct.unpack_from('<i', data, offset + OFFSET_LEVEL)[0]
+
+        # Level deve ser diferente de HP (senão pode ser falso positivo)
+        if level == hp:
+            continue
+
+        # Level deve estar no range 1-2000
+        if not (1 <= level <= 2000):
+            continue
+
+        candidates.append({
+            'addr': base + offset,
+            'hp': hp,
+            'hp_max': hp_max,
+            'mp': mp,
+            'mp_max': mp_max,
+            'level': level
+        })
+
+    return candidates
+
+
+def player_kernel(use_numpy=NUMPY_AVAILABLE):
+    """Kernel de busca do player (NumPy quando disponível)"""
+    if use_numpy and NUMPY_AVAILABLE:
+        return scan_player_structs
+    return scan_player_structs_python
+
+
+# ============================================
+# AUTO SCANNER (12 regras)
+# ============================================
+
+# Endereços abaixo de 4GB não são heap (regra 12)
+HEAP_MIN_ADDRESS = 0x100000000
+
+
+def validate_player_values(hp_addr, hp, hp_max, mp, mp_max, expected_hp=None, expected_mp=None):
+    """
+    Regras do AutoScanner para uma estrutura de player já lida.
+
+    expected_hp/expected_mp: valores esperados (correspondência EXATA)
+    """
+    # Se temos valores esperados, verifica correspondência EXATA
+    if expected_hp is not None and hp != expected_hp:
+        return False
+    if expected_mp is not None and mp != expected_mp:
+        return False
+
+    # 1. HP deve ser positivo e razoável (personagens têm 50-500k HP)
+    if hp <= 0 or hp > 500000:
+        return False
+
+    # 2. HP_MAX deve ser positivo e razoável
+    if hp_max <= 0 or hp_max > 500000:
+        return False
+
+    # 3. HP <= HP_MAX (não pode ter mais HP que o máximo)
+    if hp > hp_max:
+        return False
+
+    # 4. HP_MAX deve ser pelo menos 100 (mínimo level 8+)
+    # Personagens de Tibia não têm menos que ~150 HP
+    if hp_max < 100:
+        return False
+
+    # 5. MP não pode ser negativo
+    if mp < 0:
+        return False
+
+    # 6. MP_MAX não pode ser negativo e deve ser razoável
+    if mp_max < 0 or mp_max > 500000:
+        return False
+
+    # 7. MP <= MP_MAX
+    if mp_max > 0 and mp > mp_max:
+        return False
+
+    # 8. HP% deve estar entre 1% e 100%
+    hp_percent = (hp / hp_max) * 100
+    if hp_percent < 1 or hp_percent > 100:
+        return False
+
+    # 9. IMPORTANTE: Personagens de Tibia SEMPRE têm mana
+    # Mesmo knights level baixo têm pelo menos 50-100 MP_MAX
+    # MP_MAX = 0 é definitivamente falso positivo
+    if mp_max == 0:
+        return False
+
+    # 10. MP_MAX deve ser pelo menos 30 (mínimo para qualquer personagem)
+    if mp_max < 30:
+        return False
+
+    # 11. HP e HP_MAX devem ter proporção razoável
+    # HP_MAX não pode ser 50x maior que HP atual
+    if hp_max / hp > 50:
+        return False
+
+    # 12. Verifica que o endereço não está em região baixa da memória
+    # Endereços do player geralmente estão em regiões heap (altos)
+    if hp_addr < HEAP_MIN_ADDRESS:
+        return False
+
+    return True
+
+
+def scan_hp_candidates(data, base, min_hp=50, max_hp=500000, expected_hp=None, expected_mp=None):
+    """
+    Procura endereços de HP (alinhados em 4 bytes) cuja estrutura passa
+    em validate_player_values, lendo HP_MAX/MP/MP_MAX do próprio buffer.
+
+    Só são avaliados offsets cuja estrutura inteira cabe no buffer
+    (offset < len(data) - STRUCT_SPAN).
+
+    Returns:
+        lista de endereços de HP
+    """
+    count = len(range(0, len(data) - STRUCT_SPAN, 4))
+    if count <= 0:
+        return []
+
+    if expected_hp is not None:
+        min_hp = max_hp = expected_hp
+
+    words = as_int32(data)
+
+    # Filtro do HP (view, sem cópia)
+    hp = words[:count]
+    idx = np.flatnonzero((hp >= min_hp) & (hp <= max_hp))
+    if idx.size == 0:
+        return []
+
+    # Gather dos sobreviventes em int64 (hp * 100 e hp * 50 sem overflow)
+    hp = words[idx].astype(np.int64)
+    hp_max = words[idx + OFFSET_HP_MAX // 4].astype(np.int64)
+    mp = words[idx + OFFSET_MP // 4].astype(np.int64)
+    mp_max = words[idx + OFFSET_MP_MAX // 4].astype(np.int64)
+
+    keep = (hp > 0) & (hp <= 500000)                        # 1
+    keep &= (hp_max > 0) & (hp_max <= 500000)               # 2
+    keep &= hp <= hp_max                                    # 3
+    keep &= hp_max >= 100                                   # 4
+    keep &= mp >= 0                                         # 5
+    keep &= (mp_max >= 0) & (mp_max <= 500000)              # 6
+    keep &= (mp_max == 0) | (mp <= mp_max)                  # 7
+    keep &= mp_max >= 30                                    # 9 e 10
+    if expected_mp is not None:
+        keep &= mp == expected_mp
+
+    # 8 e 11 (divisões) e 12 só para quem sobrou, com a mesma aritmética
+    candidates = []
+    for i in np.flatnonzero(keep):
+        addr = base + int(idx[i]) * 4
+        if validate_player_values(addr, int(hp[i]), int(hp_max[i]), int(mp[i]), int(mp_max[i]),
+                                  expected_hp, expected_mp):
+            candidates.append(addr)
+
+    return candidates
+
+
+def scan_hp_candidates_python(data, base, min_hp=50, max_hp=500000, expected_hp=None, expected_mp=None):
+    """
+    Versão em Python puro de scan_hp_candidates (fallback sem NumPy).
+    Mesmos critérios e mesmo retorno.
+    """
+    if expected_hp is not None:
+        min_hp = max_hp = expected_hp
+
+    candidates = []
+    unpack = struct.unpack_from
+
+    for offset in range(0, len(data) - STRUCT_SPAN, 4):
+        hp = unpack('<i', data, offset)[0]
+        if not (min_hp <= hp <= max_hp):
+            continue
+
+        hp_max = unpack('<i', data, offset + OFFSET_HP_MAX)[0]
+        mp = unpack('<i', data, offset + OFFSET_MP)[0]
+        mp_max = unpack('<i', data, offset + OFFSET_MP_MAX)[0]
+
+        addr = base + offset
+        if validate_player_values(addr, hp, hp_max, mp, mp_max, expected_hp, expected_mp):
+            candidates.append(addr)
+
+    return candidates
+
+
+def hp_candidates_kernel(use_numpy=NUMPY_AVAILABLE):
+    """Kernel das 12 regras do AutoScanner (NumPy quando disponível)"""
+    if use_numpy and NUMPY_AVAILABLE:
+        return scan_hp_candidates
+    return scan_hp_candidates_python
@@ -2,13 +2,29 @@
 """
 Modulo de Healing v2 - Usa leitura de memoria direta
 Funciona mesmo com Tibia minimizado!
+
+Loop orientado a eventos:
+- O HP vem do PlayerStateBus (memory/player_state.py): um unico leitor
+  a ~5ms, compartilhado com a GUI, que so acorda a decisao quando o
+  estado muda
+- A ordem dos slots e calculada uma vez, quando a configuracao muda
+- O key up e agendado em uma thread separada (o loop nunca dorme
+  dentro de um key press)
+- Histograma de latencia: queda de HP -> tecla enviada
 """
 
+import bisect
+import heapq
+import itertools
+import sys
 import time
 import ctypes
+from collections import deque
 from ctypes import wintypes
 import threading
 
+from memory.player_state import PlayerStateBus
+
 try:
     import win32gui
     import win32api
@@ -57,6 +73,102 @@ VK_CODES = {
 }
 
 
+# Tempo entre key down e key up
+KEY_PRESS_DURATION = 0.015
+
+
+class LatencyHistogram:
+    """
+    Histograma de latencia (queda de HP -> tecla enviada), em ms
+    """
+    
+    BUCKETS_MS = (1, 2, 5, 10, 20, 35, 50, 75, 100, 200)
+    
+    def __init__(self, keep=1000):
+        self._samples = deque(maxlen=keep)
+        self.reset()
+    
+    def reset(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total = 0
+        self._samples.clear()
+    
+    def add(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self._samples.append(ms)
+    
+    def percentile(self, pct):
+        """Percentil (0-100) das ultimas amostras, em ms"""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+    
+    def summary(self):
+        return {
+            "count": self.total,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(self._samples) if self._samples else 0.0,
+        }
+    
+    def format(self):
+        """Histograma em texto (uma linha por faixa)"""
+        lines = []
+        peak = max(self.counts) or 1
+        lower = 0
+        for i, count in enumerate(self.counts):
+            upper = self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else None
+            label = f"{lower:>3}-{upper:<3}ms" if upper else f"  >{lower:<4}ms"
+            lines.append(f"  {label} {'#' * int(30 * count / peak):<30} {count}")
+            lower = upper
+        return "\n".join(lines)
+
+
+class KeyReleaser:
+    """
+    Thread unica que executa acoes agendadas (key up), para que quem
+    pressiona a tecla nunca durma dentro do key press
+    """
+    
+    def __init__(self):
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+    
+    def schedule(self, delay, func, *args):
+        with self._cond:
+            heapq.heappush(self._queue, (time.perf_counter() + delay, next(self._seq), func, args))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                
+                due = self._queue[0][0]
+                now = time.perf_counter()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                
+                _, _, func, args = heapq.heappop(self._queue)
+            
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"[HEALING] Erro ao soltar tecla: {e}")
+
+
 class HealingSlot:
     """
     Representa um slot de cura configuravel
@@ -88,9 +200,9 @@ class HealingModuleV2:
     Modulo de cura automatica usando leitura de memoria
     
     Funciona assim:
-    1. Le HP% da memoria do Tibia (instantaneo!)
-    2. Se HP% <= threshold, pressiona a hotkey
-    3. Repete a cada ~50ms
+    1. PlayerStateBus le HP da memoria do Tibia a cada ~5ms (instantaneo!)
+    2. Quando o HP muda, a decisao acorda na hora
+    3. Se HP% <= threshold, pressiona a hotkey (key up agendado)
     
     Vantagens:
     - Instantaneo (sem delay de pixels)
@@ -98,9 +210,11 @@ class HealingModuleV2:
     - Preciso (valores exatos)
     """
     
-    def __init__(self, memory_reader):
+    def __init__(self, memory_reader, state_bus=None):
         """
         memory_reader: instancia de TibiaMemoryReader conectada
+        state_bus: PlayerStateBus compartilhado (ex: com a GUI). Sem ele o
+                   modulo cria e controla o proprio.
         """
         self.memory = memory_reader
         self.enabled = False
@@ -117,12 +231,33 @@ class HealingModuleV2:
             HealingSlot(enabled=False, hotkey="F3", hp_threshold=40),
         ]
         
+        # Ordem de prioridade dos slots (recalculada so quando a config muda)
+        self._slot_order = []
+        self._rebuild_slot_order()
+        
         # Handle da janela Tibia (para enviar teclas)
         self.tibia_hwnd = None
         
-        # Thread de execucao
+        # Thread de decisao
         self._thread = None
         
+        # Estado do player (leitor unico)
+        self._owns_bus = state_bus is None
+        self.state_bus = state_bus or PlayerStateBus(memory_reader)
+        self._drop_time = None
+        self._dirty = False
+        
+        # Key up assincrono
+        self._key_releaser = KeyReleaser()
+        
+        # Latencia queda de HP -> tecla enviada. Quedas que chegaram com o
+        # cooldown correndo contam a partir do fim dele, em separado
+        self.latency = LatencyHistogram()
+        self.deferred_latency = LatencyHistogram()
+        
+        # timeBeginPeriod feito por este modulo (desfeito so uma vez no stop)
+        self._timer_raised = False
+        
         # Callbacks
         self._on_heal_callback = None
     
@@ -132,6 +267,7 @@ class HealingModuleV2:
         """
         self.enabled = enabled
         print(f"[HEALING] {'LIGADO' if enabled else 'DESLIGADO'}")
+        self._wake()
     
     def toggle(self):
         """
@@ -158,8 +294,21 @@ class HealingModuleV2:
         if hp_threshold is not None:
             slot.hp_threshold = max(1, min(100, hp_threshold))
         
+        self._rebuild_slot_order()
+        self._wake()
         return True
     
+    def _rebuild_slot_order(self):
+        """
+        Ordena os slots ativos por threshold decrescente (cura mais urgente
+        primeiro). Chamado so quando a configuracao muda.
+        """
+        self._slot_order = sorted(
+            [(i, s) for i, s in enumerate(self.slots) if s.enabled],
+            key=lambda x: x[1].hp_threshold,
+            reverse=True
+        )
+    
     def get_slot(self, index):
         """
         Retorna um slot
@@ -217,29 +366,37 @@ class HealingModuleV2:
         if not self.memory.has_offsets():
             return False
         
-        # Le HP%
-        hp_percent = self.memory.get_player_hp_percent()
+        # Le HP% (do barramento se o leitor estiver rodando)
+        state = self.state_bus.latest
+        if self.state_bus.running and state.valid:
+            hp_percent = state.hp_percent
+        else:
+            hp_percent = self.memory.get_player_hp_percent()
         
+        return self._decide(hp_percent, now)
+    
+    def _decide(self, hp_percent, now):
+        """
+        Escolhe e executa a cura para o HP% atual (cooldown ja verificado)
+        """
         # Protecao: HP 0 ou 100 pode ser erro de leitura
         if hp_percent <= 0:
             return False
         
-        # Verifica slots (em ordem de prioridade - menor HP% primeiro)
-        # Ordena por threshold decrescente (cura mais urgente primeiro)
-        sorted_slots = sorted(
-            [(i, s) for i, s in enumerate(self.slots) if s.enabled],
-            key=lambda x: x[1].hp_threshold,
-            reverse=True
-        )
-        
-        for index, slot in sorted_slots:
+        # Slots em ordem de prioridade (pre-calculada em _rebuild_slot_order)
+        for index, slot in self._slot_order:
             if hp_percent <= slot.hp_threshold:
                 # Executa cura
                 success = self._press_hotkey(slot.hotkey)
                 
                 if success:
+                    ready = self.last_action_time + self.cooldown
                     self.last_action_time = now
                     
+                    # Latencia desde a primeira queda de HP ainda nao atendida
+                    if self._drop_time is not None:
+                        self._record_latency(ready)
+                    
                     # Callback
                     if self._on_heal_callback:
                         self._on_heal_callback(index, hp_percent, slot.hp_threshold)
@@ -248,6 +405,22 @@ class HealingModuleV2:
         
         return False
     
+    def _record_latency(self, ready):
+        """
+        Registra a latencia da queda de HP pendente ate a tecla.
+        
+        ready: fim do cooldown anterior (time.time). Se a queda chegou antes
+        disso, a espera do cooldown nao e latencia do bot: conta a partir
+        de quando a cura ficou possivel, no deferred_latency.
+        """
+        sent = time.perf_counter()
+        eligible = sent - (time.time() - ready)
+        if eligible > self._drop_time:
+            self.deferred_latency.add(sent - eligible)
+        else:
+            self.latency.add(sent - self._drop_time)
+        self._drop_time = None
+    
     def _press_hotkey(self, hotkey):
         """
         Pressiona uma hotkey no Tibia SEM tirar o foco da janela atual
@@ -294,10 +467,10 @@ class HealingModuleV2:
         try:
             # Key down
             win32api.PostMessage(self.tibia_hwnd, WM_KEYDOWN, vk_code, lparam_down)
-            time.sleep(0.015)
             
-            # Key up
-            win32api.PostMessage(self.tibia_hwnd, WM_KEYUP, vk_code, lparam_up)
+            # Key up agendado (nao bloqueia o loop)
+            self._key_releaser.schedule(KEY_PRESS_DURATION, win32api.PostMessage,
+                                        self.tibia_hwnd, WM_KEYUP, vk_code, lparam_up)
             
             return True
         except Exception as e:
@@ -321,46 +494,121 @@ class HealingModuleV2:
         
         ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(inp))
         
-        time.sleep(0.015)
-        
-        # Key up
-        inp.ki.dwFlags = KEYEVENTF_KEYUP
-        ctypes.windll.user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(inp))
+        # Key up agendado (nao bloqueia o loop)
+        up = INPUT()
+        up.type = INPUT_KEYBOARD
+        up.ki.wVk = vk_code
+        up.ki.wScan = scan_code
+        up.ki.dwFlags = KEYEVENTF_KEYUP
+        up.ki.time = 0
+        up.ki.dwExtraInfo = inp.ki.dwExtraInfo
+        
+        self._key_releaser.schedule(KEY_PRESS_DURATION, ctypes.windll.user32.SendInput,
+                                    1, ctypes.byref(up), ctypes.sizeof(up))
     
     def start_loop(self, interval=0.050):
         """
-        Inicia loop de execucao em thread separada
+        Inicia o loop de decisao (e o PlayerStateBus, se ainda nao roda)
         
-        interval: tempo entre verificacoes em segundos (50ms padrao)
+        interval: re-verificacao maxima sem mudanca de HP (50ms padrao).
+                  A reacao a uma queda de HP depende do intervalo do bus.
         """
         if self._thread and self._thread.is_alive():
             return
         
         self.running = True
+        if not self._timer_raised:
+            self._timer_raised = _set_timer_resolution(True)
+        
+        self.state_bus.start()
+        
         self._thread = threading.Thread(target=self._loop, args=(interval,), daemon=True)
         self._thread.start()
-        print(f"[HEALING] Loop iniciado (intervalo: {interval*1000:.0f}ms)")
+        print(f"[HEALING] Loop iniciado (leitor: {self.state_bus.interval*1000:.0f}ms, adaptativo)")
     
     def stop_loop(self):
         """
         Para o loop de execucao
         """
         self.running = False
+        self._wake()
         if self._thread:
             self._thread.join(timeout=1.0)
+        if self._owns_bus:
+            self.state_bus.stop()
+        if self._timer_raised:
+            _set_timer_resolution(False)
+            self._timer_raised = False
         print("[HEALING] Loop parado")
     
+    def _wake(self):
+        """Acorda a decisao (config mudou ou loop parando)"""
+        self._dirty = True
+        self.state_bus.wake()
+    
     def _loop(self, interval):
         """
-        Loop interno de execucao
+        Loop de decisao: dorme ate o estado do player mudar (ou o
+        cooldown acabar)
         """
+        retry_at = None
+        seq = None
+        last_hp = None
+        self._dirty = True
+        
         while self.running:
+            timeout = interval
+            if retry_at is not None:
+                timeout = max(0.0, min(interval, retry_at - time.time()))
+            
+            if self._dirty:
+                state = self.state_bus.latest
+            else:
+                state = self.state_bus.wait_for_change(seq, timeout)
+            self._dirty = False
+            
+            if not self.running:
+                break
+            
+            # Primeira queda de HP ainda nao atendida (timestamp da leitura)
+            if state.seq != seq:
+                seq = state.seq
+                if state.valid:
+                    if last_hp is not None and state.hp < last_hp and self._drop_time is None:
+                        self._drop_time = state.timestamp
+                    last_hp = state.hp
+            
+            retry_at = None
+            if not self.enabled or not state.valid:
+                continue
+            
             try:
-                self.execute_once()
+                hp_percent = state.hp_percent
+                
+                now = time.time()
+                if now - self.last_action_time < self.cooldown:
+                    # Em cooldown: reavalia assim que ele acabar
+                    retry_at = self.last_action_time + self.cooldown
+                    continue
+                
+                if self._decide(hp_percent, now):
+                    # Reavalia apos o cooldown (HP pode continuar baixo)
+                    retry_at = now + self.cooldown
+                else:
+                    # Queda que nao pediu cura nao conta na latencia
+                    self._drop_time = None
             except Exception as e:
                 print(f"[HEALING] Erro no loop: {e}")
-            
-            time.sleep(interval)
+    
+    def get_latency_stats(self):
+        """
+        Retorna dict com count, p50_ms, p95_ms, p99_ms, max_ms da latencia
+        queda de HP -> tecla enviada, e em "deferred" o mesmo resumo das
+        quedas que esperaram o cooldown (contadas do fim dele)
+        """
+        stats = self.latency.summary()
+        stats["deferred"] = self.deferred_latency.summary()
+        return stats
     
     def on_heal(self, callback):
         """
@@ -382,4 +630,34 @@ class HealingModuleV2:
             status = "ON" if slot.enabled else "OFF"
             lines.append(f"  Slot {i+1}: [{status}] {slot.hotkey} @ HP <= {slot.hp_threshold}%")
         
+        stats = self.latency.summary()
+        if stats["count"]:
+            lines.append("")
+            lines.append(f"Latencia (queda de HP -> tecla): p50={stats['p50_ms']:.1f}ms "
+                         f"p95={stats['p95_ms']:.1f}ms max={stats['max_ms']:.1f}ms ({stats['count']} curas)")
+            lines.append(self.latency.format())
+        
+        deferred = self.deferred_latency.summary()
+        if deferred["count"]:
+            lines.append(f"Apos cooldown (fim do cooldown -> tecla): p50={deferred['p50_ms']:.1f}ms "
+                         f"p95={deferred['p95_ms']:.1f}ms ({deferred['count']} curas)")
+        
         return "\n".join(lines)
+
+
+def _set_timer_resolution(enabled):
+    """
+    Liga/desliga timer de 1ms no Windows (sem isso time.sleep tem
+    granularidade de ~15.6ms e o leitor nao consegue rodar a 5ms).
+    Cada timeBeginPeriod precisa de um timeEndPeriod: retorna True se a
+    chamada foi feita.
+    """
+    if sys.platform != "win32":
+        return False
+    try:
+        if enabled:
+            return ctypes.windll.winmm.timeBeginPeriod(1) == 0
+        ctypes.windll.winmm.timeEndPeriod(1)
+        return True
+    except Exception:
+        return False
@@ -4,5 +4,9 @@ Modulo de leitura de tela
 """
 
 from .screen_reader import ScreenReader
+from .capture import Frame, FrameSource, GdiCapture, ImageCapture
+from .color_table import ColorTable
+from .bar_locator import BarLocator
 
-__all__ = ['ScreenReader']
+__all__ = ['ScreenReader', 'Frame', 'FrameSource', 'GdiCapture', 'ImageCapture',
+           'ColorTable', 'BarLocator']
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Bar Locator - Acha as barras de HP/MP em um screenshot do client
+
+set_hp_bar / set_mp_bar exigiam clicar nas pontas das barras, e as
+coordenadas ficavam erradas quando a janela mudava de lugar ou tamanho.
+
+O BarLocator, sobre um frame inteiro da area do client:
+1. Classifica todos os pixels de uma vez (ColorTable: bits HP/MP/EMPTY)
+2. Em cada linha, separa os trechos (run-length) de cor cheia que tem
+   fundo escuro dos dois lados (borda a esquerda, vazio/borda a direita)
+3. Junta trechos que comecam na mesma coluna em linhas consecutivas: um
+   retangulo com altura de barra (BAR_HEIGHT) e uma barra
+4. A largura vem da borda de cima/baixo: o trecho escuro da linha logo
+   acima (e abaixo) da barra vai de borda a borda
+
+HP e MP tem a mesma largura no client, entao vale a menor das
+estimativas, e a largura de uma barra vista 100% cheia fica guardada.
+A barra precisa ter algum pixel cheio para ser achada (HP 0 nao).
+"""
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .color_table import EMPTY, HP, MP
+
+
+# Limites de uma barra do client (pixels)
+BAR_WIDTH = (60, 400)
+BAR_HEIGHT = (3, 20)
+
+# Largura maxima da borda escura em volta das barras
+MAX_BORDER = 3
+
+# Linhas sem cor cheia toleradas dentro de uma barra (degrade + ruido
+# caindo entre duas faixas de cor)
+MAX_ROW_GAP = 2
+
+# Distancia maxima (vertical) entre as barras de HP e MP
+MAX_BAR_GAP = 60
+
+
+class BarLocator:
+    """
+    Uso:
+        locator = BarLocator(color_table)
+        bars = locator.locate(frame)          # Frame da area do client
+        if bars.get('hp'):
+            x, y, width, height = bars['hp']  # coordenadas de tela
+    """
+
+    def __init__(self, color_table):
+        self.color_table = color_table
+
+        # Largura de uma barra vista cheia (sobrevive a mudancas de janela)
+        self.bar_width = None
+
+    def _runs(self, flags, kind):
+        """
+        Trechos de cor cheia com fundo escuro dos dois lados:
+        lista de (y, primeiro pixel, cheios)
+        """
+        fill = (flags & kind) != 0
+        empty = (flags & EMPTY) != 0
+        height, width = fill.shape
+
+        # Inicio: cheio com borda escura a esquerda; fim: ultimo cheio do trecho
+        first = np.zeros_like(fill)
+        np.logical_and(fill[:, 1:], empty[:, :-1], out=first[:, 1:])
+        last = np.empty_like(fill)
+        np.logical_and(fill[:, :-1], ~fill[:, 1:], out=last[:, :-1])
+        last[:, -1] = fill[:, -1]
+
+        starts = np.flatnonzero(first)
+        if not starts.size:
+            return []
+        ends = np.flatnonzero(last)
+        ends = ends[np.searchsorted(ends, starts)]
+
+        # Vazio (ou borda) depois do trecho, dentro da mesma linha
+        counts = ends - starts + 1
+        keep = (counts <= BAR_WIDTH[1]) & ((ends + 1) % width != 0)
+        keep[keep] &= empty.ravel()[ends[keep] + 1]
+
+        rows, columns = np.divmod(starts[keep], width)
+        return list(zip(rows.tolist(), columns.tolist(), counts[keep].tolist()))
+
+    @staticmethod
+    def _border_width(empty, y, x):
+        """
+        Largura de borda a borda na linha y (trecho escuro que contem a
+        coluna x - 1 e segue para a direita) ou None
+        """
+        if not 0 <= y < empty.shape[0] or not empty[y, x - 1]:
+            return None
+        row = empty[y]
+        start = x - 1
+        while start > 0 and row[start - 1] and x - start <= MAX_BORDER:
+            start -= 1
+        border = x - start
+        if border > MAX_BORDER:
+            return None
+
+        stop = np.flatnonzero(~row[x:])
+        end = x + int(stop[0]) if stop.size else len(row)
+        width = end - border - x
+        return width if width >= BAR_WIDTH[0] else None
+
+    def _rectangles(self, runs, empty):
+        """
+        Junta trechos com o mesmo inicio em linhas consecutivas (ate
+        MAX_ROW_GAP linhas faltando no meio).
+        Retorna lista de (x, y, largura ou None, altura, cheia?)
+        """
+        groups = {}
+        found = []
+
+        def close(x, group):
+            top, bottom, longest = group
+            height = bottom - top + 1
+            if not BAR_HEIGHT[0] <= height <= BAR_HEIGHT[1]:
+                return
+            widths = [w for w in (self._border_width(empty, top - 1, x),
+                                  self._border_width(empty, bottom + 1, x)) if w]
+            width = min(widths) if widths else None
+            found.append((x, top, width, height, bool(width) and longest >= width))
+
+        for y, x, count in runs:
+            group = groups.get(x)
+            if group and y - group[1] <= MAX_ROW_GAP + 1:
+                group[1] = y
+                group[2] = max(group[2], count)
+                continue
+            if group:
+                close(x, group)
+            groups[x] = [y, y, count]
+
+        for x, group in groups.items():
+            close(x, group)
+        return found
+
+    def locate(self, frame):
+        """
+        Retangulos (x, y, largura, altura) das barras no frame, em
+        coordenadas de tela: {'hp': ..., 'mp': ...} (None se nao achou)
+        """
+        flags = self.color_table.classify(frame.array())
+        empty = (flags & EMPTY) != 0
+
+        hp = self._rectangles(self._runs(flags, HP), empty)
+        mp = self._rectangles(self._runs(flags, MP), empty)
+
+        # Melhor candidato: com borda achada, depois o mais alto
+        score = lambda rect: (rect[2] is not None, rect[3])
+        best_hp = max(hp, key=score, default=None)
+        best_mp = None
+        if mp:
+            if best_hp:
+                # MP perto do HP (mesma coluna, logo abaixo ou acima)
+                near = [rect for rect in mp if abs(rect[0] - best_hp[0]) <= MAX_BORDER
+                        and 0 < abs(rect[1] - best_hp[1]) <= MAX_BAR_GAP]
+                mp = near or mp
+            best_mp = max(mp, key=score)
+
+        # Largura: barra cheia e exata; senao a menor estimativa
+        for rect in (best_hp, best_mp):
+            if rect and rect[4]:
+                self.bar_width = rect[2]
+        widths = [rect[2] for rect in (best_hp, best_mp) if rect and rect[2]]
+        width = self.bar_width or (min(widths) if widths else None)
+
+        bars = {}
+        for name, rect in (('hp', best_hp), ('mp', best_mp)):
+            if rect is None:
+                bars[name] = None
+                continue
+            x, y, _, height, _ = rect
+            bars[name] = (x + frame.left, y + frame.top, width, height) if width else None
+        return bars
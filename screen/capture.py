@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Screen Capture - Backends plugaveis de captura de tela
+
+O ScreenReader lia cada pixel com GetDC(0) + GetPixel + ReleaseDC: uma
+ida ao compositor por pixel, 32 por barra a cada update. Agora ele pede
+um retangulo inteiro a um FrameSource e classifica a linha da barra de
+uma vez.
+
+Implementacoes:
+- GdiCapture:   tela do Windows (um BitBlt por update para uma DIB section
+                reutilizada, sem alocar nada entre capturas)
+- ImageCapture: screenshot em arquivo (PNG via Pillow ou RGB cru) ou array
+                em memoria - benchmarks e testes no Linux
+
+Todos devolvem um Frame: buffer de pixels + posicao na tela.
+"""
+
+import ctypes
+from ctypes import wintypes
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# Windows API
+SRCCOPY = 0x00CC0020
+DIB_RGB_COLORS = 0
+BI_RGB = 0
+
+
+class Frame:
+    """
+    Pixels de um retangulo da tela.
+
+    data: buffer linha a linha (de cima para baixo), 3 ou 4 bytes por pixel
+    channels: ordem dos canais ("RGB", "BGRA"...)
+    left, top: posicao do pixel (0, 0) na tela
+    """
+
+    def __init__(self, data, width, height, channels="RGB", left=0, top=0):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.left = left
+        self.top = top
+
+        self._bpp = len(channels)
+        self._order = tuple(channels.index(c) for c in "RGB")
+
+    @property
+    def rect(self):
+        return (self.left, self.top, self.left + self.width, self.top + self.height)
+
+    def contains(self, x, y):
+        return self.left <= x < self.left + self.width and self.top <= y < self.top + self.height
+
+    def array(self):
+        """Pixels como array NumPy (altura, largura, 3) RGB, sem copia"""
+        pixels = np.frombuffer(self.data, dtype=np.uint8,
+                               count=self.width * self.height * self._bpp)
+        pixels = pixels.reshape(self.height, self.width, self._bpp)
+        if self._order == (0, 1, 2):
+            return pixels[:, :, :3]
+        if self._order == (2, 1, 0):
+            return pixels[:, :, 2::-1]
+        return pixels[:, :, list(self._order)]
+
+    def pixel(self, x, y):
+        """(r, g, b) do pixel na posicao (x, y) da tela"""
+        pos = ((y - self.top) * self.width + (x - self.left)) * self._bpp
+        r, g, b = self._order
+        return (self.data[pos + r], self.data[pos + g], self.data[pos + b])
+
+    def row(self, y, x1, x2):
+        """
+        Pixels de x1 ate x2 (inclusive) na linha y da tela: array (n, 3)
+        com NumPy, senao lista de (r, g, b)
+        """
+        if NUMPY_AVAILABLE:
+            return self.array()[y - self.top, x1 - self.left:x2 - self.left + 1]
+        return [self.pixel(x, y) for x in range(x1, x2 + 1)]
+
+
+class FrameSource:
+    """
+    Interface de captura usada pelo ScreenReader.
+
+    Subclasses implementam grab(rect) -> Frame, com rect = (left, top,
+    right, bottom) em coordenadas de tela (right/bottom exclusivos).
+    """
+
+    def grab(self, rect):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# ============================================
+# WINDOWS (GDI)
+# ============================================
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+
+class GdiCapture(FrameSource):
+    """
+    Captura da tela do Windows: BitBlt do retangulo para uma DIB section
+    (32 bpp, de cima para baixo) que so e recriada quando o tamanho muda.
+    O Frame devolvido aponta para a propria DIB: vale ate o proximo grab.
+    """
+
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        self._gdi32 = ctypes.windll.gdi32
+
+        handle = wintypes.HANDLE
+        self._user32.GetDC.restype = handle
+        self._user32.GetDC.argtypes = [wintypes.HWND]
+        self._user32.ReleaseDC.argtypes = [wintypes.HWND, handle]
+        self._gdi32.CreateCompatibleDC.restype = handle
+        self._gdi32.CreateCompatibleDC.argtypes = [handle]
+        self._gdi32.CreateDIBSection.restype = handle
+        self._gdi32.CreateDIBSection.argtypes = [handle, ctypes.c_void_p, wintypes.UINT,
+                                                 ctypes.POINTER(ctypes.c_void_p), handle,
+                                                 wintypes.DWORD]
+        self._gdi32.SelectObject.restype = handle
+        self._gdi32.SelectObject.argtypes = [handle, handle]
+        self._gdi32.DeleteObject.argtypes = [handle]
+        self._gdi32.DeleteDC.argtypes = [handle]
+        self._gdi32.BitBlt.argtypes = [handle, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                       ctypes.c_int, handle, ctypes.c_int, ctypes.c_int,
+                                       wintypes.DWORD]
+
+        self._size = None
+        self._mem_dc = None
+        self._bitmap = None
+        self._previous = None
+        self._buffer = None
+
+    def _allocate(self, screen_dc, width, height):
+        self.close()
+
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = width
+        header.biHeight = -height  # negativo = linhas de cima para baixo
+        header.biPlanes = 1
+        header.biBitCount = 32
+        header.biCompression = BI_RGB
+
+        bits = ctypes.c_void_p()
+        self._mem_dc = self._gdi32.CreateCompatibleDC(screen_dc)
+        self._bitmap = self._gdi32.CreateDIBSection(self._mem_dc, ctypes.byref(header),
+                                                    DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+        if not self._bitmap or not bits.value:
+            self.close()
+            raise OSError("CreateDIBSection falhou")
+
+        self._previous = self._gdi32.SelectObject(self._mem_dc, self._bitmap)
+        self._buffer = (ctypes.c_ubyte * (width * height * 4)).from_address(bits.value)
+        self._size = (width, height)
+
+    def grab(self, rect):
+        left, top, right, bottom = rect
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Retangulo vazio: {rect}")
+
+        screen_dc = self._user32.GetDC(None)
+        try:
+            if self._size != (width, height):
+                self._allocate(screen_dc, width, height)
+            if not self._gdi32.BitBlt(self._mem_dc, 0, 0, width, height,
+                                      screen_dc, left, top, SRCCOPY):
+                raise OSError("BitBlt falhou")
+            self._gdi32.GdiFlush()
+        finally:
+            self._user32.ReleaseDC(None, screen_dc)
+
+        return Frame(self._buffer, width, height, "BGRA", left, top)
+
+    def close(self):
+        if self._mem_dc:
+            if self._previous:
+                self._gdi32.SelectObject(self._mem_dc, self._previous)
+            self._gdi32.DeleteDC(self._mem_dc)
+        if self._bitmap:
+            self._gdi32.DeleteObject(self._bitmap)
+        self._mem_dc = self._bitmap = self._previous = self._buffer = None
+        self._size = None
+
+
+# ============================================
+# ARQUIVO / MEMORIA
+# ============================================
+
+class ImageCapture(FrameSource):
+    """
+    Screenshot fixo fazendo papel de tela (benchmarks, testes, Linux).
+
+    Uso:
+        capture = ImageCapture.from_file("captura.png")
+        reader = ScreenReader(capture=capture)
+        capture.set_frame(outro_array)   # proximo "frame" do jogo
+    """
+
+    def __init__(self, pixels=None, width=0, height=0, left=0, top=0):
+        """
+        pixels: array NumPy (altura, largura, 3) RGB ou bytes RGB
+        left, top: posicao do screenshot na tela
+        """
+        self.left = left
+        self.top = top
+        self.frame = None
+        if pixels is not None:
+            self.set_frame(pixels, width, height)
+
+    @classmethod
+    def from_file(cls, path, width=None, height=None, left=0, top=0):
+        """PNG/BMP (Pillow) ou RGB cru (.rgb/.raw, precisa de width/height)"""
+        if path.lower().endswith(('.rgb', '.raw')):
+            if not width or not height:
+                raise ValueError("Frame cru precisa de width e height")
+            with open(path, 'rb') as f:
+                return cls(f.read(), width, height, left, top)
+
+        if not PIL_AVAILABLE:
+            raise RuntimeError("Pillow nao instalado. Execute: pip install Pillow")
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+            return cls(image.tobytes(), image.width, image.height, left, top)
+
+    def set_frame(self, pixels, width=0, height=0):
+        """Troca o screenshot (array (altura, largura, 3) ou bytes RGB)"""
+        if NUMPY_AVAILABLE and isinstance(pixels, np.ndarray):
+            height, width = pixels.shape[:2]
+            pixels = np.ascontiguousarray(pixels[:, :, :3], dtype=np.uint8).tobytes()
+        if len(pixels) < width * height * 3:
+            raise ValueError("Frame menor que width x height")
+        self.frame = Frame(pixels, width, height, "RGB", self.left, self.top)
+
+    def grab(self, rect):
+        if self.frame is None:
+            raise ValueError("Nenhum frame carregado")
+
+        left, top, right, bottom = rect
+        frame = self.frame
+        if not (frame.contains(left, top) and frame.contains(right - 1, bottom - 1)):
+            raise ValueError(f"Retangulo {rect} fora do frame {frame.rect}")
+
+        # Recorte (so as linhas pedidas, cada uma com a largura pedida)
+        width = right - left
+        start = left - frame.left
+        rows = []
+        for y in range(top - frame.top, bottom - frame.top):
+            pos = (y * frame.width + start) * 3
+            rows.append(frame.data[pos:pos + width * 3])
+        return Frame(b"".join(rows), width, bottom - top, "RGB", left, top)
+
+
+def default_capture():
+    """GdiCapture no Windows, None onde nao ha tela para capturar"""
+    if not hasattr(ctypes, "windll"):
+        return None
+    try:
+        return GdiCapture()
+    except Exception as e:
+        print(f"[SCREEN] Captura GDI indisponivel: {e}")
+        return None
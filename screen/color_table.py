@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Color Table - Classificador de cores das barras por tabela (LUT)
+
+is_hp_color / is_mp_color avaliam uma cadeia de comparacoes em Python por
+pixel. A ColorTable aplica as mesmas regras UMA vez sobre todas as cores
+(RGB quantizado) e guarda o resultado como bits de classe:
+
+    HP      cor de barra de HP (vermelho, laranja, amarelo, verde)
+    MP      cor de barra de MP (azul, roxo)
+    EMPTY   fundo vazio da barra (preto / cinza escuro)
+    POISON  verde de barra cheia (o mesmo verde do HP cheio / envenenado)
+
+Uma cor pode ter mais de um bit (ex: vermelho arroxeado e HP e MP).
+Classificar uma linha capturada vira uma indexacao NumPy:
+    flags = table.classify(pixels)      # pixels (..., 3) RGB
+    cheio = flags & HP
+
+bits=8: tabela exata de 16M entradas (16 MB); bits=5: 32K entradas, cada
+canal quantizado em 32 niveis (centro da celula). A tabela e gravada em
+disco (color_lut_*.bin) e so e recalculada se as regras mudarem.
+"""
+
+import os
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Bits de classe
+HP = 0x01
+MP = 0x02
+EMPTY = 0x04
+POISON = 0x08
+
+# Incrementar quando as regras de cor mudarem (invalida o cache)
+RULES_VERSION = 1
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+def _channels(pixels):
+    return (pixels[..., i].astype(np.int16) for i in range(3))
+
+
+def empty_color_mask(pixels):
+    """Fundo vazio da barra: preto / cinza escuro"""
+    r, g, b = _channels(pixels)
+    return (r < 50) & (g < 50) & (b < 50)
+
+
+def poison_color_mask(pixels):
+    """Verde de barra cheia (HP cheio ou envenenado)"""
+    r, g, b = _channels(pixels)
+    return ~empty_color_mask(pixels) & (g > 100) & (r < 150) & (b < 100)
+
+
+def hp_color_mask(pixels):
+    """Versao vetorizada de ScreenReader.is_hp_color (array (..., 3) RGB)"""
+    r, g, b = _channels(pixels)
+    red = (r > 100) & (g < 100) & (b < 100)
+    orange = (r > 150) & (g > 50) & (g < 150) & (b < 100)
+    yellow = (r > 150) & (g > 150) & (b < 100)
+    green = (g > 100) & (r < 150) & (b < 100)
+    return ~empty_color_mask(pixels) & (red | orange | yellow | green)
+
+
+def mp_color_mask(pixels):
+    """Versao vetorizada de ScreenReader.is_mp_color (array (..., 3) RGB)"""
+    r, g, b = _channels(pixels)
+    blue = b > 100
+    purple = (r > 80) & (b > 80) & (g < 100)
+    return ~empty_color_mask(pixels) & (blue | purple)
+
+
+def classify_colors(pixels):
+    """Bits de classe (uint8) de cada cor, direto pelas regras"""
+    flags = hp_color_mask(pixels).astype(np.uint8) * HP
+    flags |= mp_color_mask(pixels).astype(np.uint8) * MP
+    flags |= empty_color_mask(pixels).astype(np.uint8) * EMPTY
+    flags |= poison_color_mask(pixels).astype(np.uint8) * POISON
+    return flags
+
+
+class ColorTable:
+    """
+    Uso:
+        table = ColorTable.load()            # cache em disco ou constroi
+        flags = table.classify(frame.row(y, x1, x2))
+        if table.flags((r, g, b)) & HP: ...
+    """
+
+    def __init__(self, table, bits=8):
+        self.table = table
+        self.bits = bits
+        self._shift = 8 - bits
+
+    @classmethod
+    def build(cls, bits=8):
+        """Aplica as regras sobre todas as cores (uma fatia de R por vez)"""
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("ColorTable precisa do NumPy (pip install numpy)")
+
+        levels = 1 << bits
+        shift = 8 - bits
+        # Centro de cada celula quantizada
+        values = (np.arange(levels, dtype=np.int16) << shift) + ((1 << shift) >> 1)
+
+        g, b = np.meshgrid(values, values, indexing='ij')
+        table = np.empty(levels ** 3, dtype=np.uint8)
+        plane = levels * levels
+        pixels = np.empty((levels, levels, 3), dtype=np.int16)
+        pixels[..., 1] = g
+        pixels[..., 2] = b
+        for i, r in enumerate(values):
+            pixels[..., 0] = r
+            table[i * plane:(i + 1) * plane] = classify_colors(pixels).ravel()
+        return cls(table, bits)
+
+    @staticmethod
+    def cache_path(bits=8, directory=CACHE_DIR):
+        return os.path.join(directory, f"color_lut_v{RULES_VERSION}_{bits}bit.bin")
+
+    @classmethod
+    def load(cls, bits=8, directory=CACHE_DIR):
+        """Le a tabela do cache (color_lut_*.bin) ou constroi e grava"""
+        path = cls.cache_path(bits, directory)
+        size = 1 << (3 * bits)
+
+        try:
+            table = np.fromfile(path, dtype=np.uint8)
+            if len(table) == size:
+                return cls(table, bits)
+        except (OSError, ValueError):
+            pass
+
+        color_table = cls.build(bits)
+        try:
+            color_table.table.tofile(path)
+        except OSError as e:
+            print(f"[SCREEN] Nao foi possivel gravar {path}: {e}")
+        return color_table
+
+    def index(self, pixels):
+        """Indice na tabela de cada pixel (array (..., 3) RGB)"""
+        shift = self._shift
+        bits = self.bits
+        r = pixels[..., 0].astype(np.uint32)
+        g = pixels[..., 1].astype(np.uint32)
+        b = pixels[..., 2]
+        if shift:
+            r >>= shift
+            g >>= shift
+            b = b >> shift
+        r <<= 2 * bits
+        g <<= bits
+        r |= g
+        r |= b
+        return r
+
+    def classify(self, pixels):
+        """Bits de classe de cada pixel (mesmo formato sem o canal)"""
+        return self.table[self.index(pixels)]
+
+    def flags(self, color):
+        """Bits de classe de uma cor (r, g, b)"""
+        r, g, b = (channel >> self._shift for channel in color)
+        return int(self.table[(r << (2 * self.bits)) | (g << self.bits) | b])
@@ -1,10 +1,32 @@
 # -*- coding: utf-8 -*-
 """
 Leitor de tela - Le HP/MP das barras do Tibia por cor de pixel
+
+As barras sao capturadas por um FrameSource (screen/capture.py): um
+unico blit do retangulo das barras por update, e a linha inteira de cada
+barra e classificada de uma vez (NumPy + tabela de cores de
+screen/color_table.py) com precisao de 1 pixel.
+As posicoes das barras sao achadas sozinhas (screen/bar_locator.py) e
+acompanham a janela: se ela so mudou de lugar as barras sao deslocadas,
+se mudou de tamanho o frame da janela e varrido de novo.
+
+Sem backend de captura, cada pixel custa um GetPixel: a borda do trecho
+cheio (as barras enchem da esquerda, sem buracos) e achada por bissecao,
+~8 leituras em vez de 32 e tambem com precisao de 1 pixel.
 """
 
 import time
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .capture import default_capture
+from .color_table import HP, MP, ColorTable, hp_color_mask, mp_color_mask
+from .bar_locator import BarLocator
+
 try:
     import win32gui
     import win32api
@@ -15,12 +37,70 @@ except ImportError:
     print("[AVISO] pywin32 nao instalado")
 
 
+# Pixels depois da borda conferidos no refinamento da bissecao
+EDGE_REFINE = 1
+
+
+def find_fill_edge(is_filled, width, refine=EDGE_REFINE):
+    """
+    Pixels cheios de uma barra que enche da esquerda, por bissecao
+    (~log2(width) + refine leituras: 8 para a barra de 94 pixels).
+
+    is_filled: funcao(i) -> bool para o pixel i da barra (0 .. width-1)
+    refine: pixels conferidos depois da borda achada; se algum estiver
+            cheio (pixel do degrade/ruido classificado errado no meio do
+            trecho cheio), a bissecao continua dali
+
+    Retorna o numero de pixels cheios (indice da borda).
+    """
+    # Invariante: lo cheio, hi vazio (-1 e width sao bordas virtuais)
+    lo, hi = -1, width
+    while True:
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if is_filled(mid):
+                lo = mid
+            else:
+                hi = mid
+
+        # Refinamento local: o trecho vazio tem que continuar vazio
+        for i in range(hi + 1, min(width, hi + 1 + refine)):
+            if is_filled(i):
+                lo, hi = i, width
+                break
+        else:
+            return hi
+
+
 class ScreenReader:
     """
     Le HP e MP do Tibia atraves das barras na tela
     """
     
-    def __init__(self):
+    def __init__(self, capture=None):
+        """
+        capture: FrameSource (screen/capture.py). Se None, usa a captura
+                 GDI no Windows ou o GetPixel por pixel como fallback
+        """
+        self.capture = capture if capture is not None else default_capture()
+        
+        # Sem captura: 'bisect' (borda por bissecao) ou 'sampled' (30 amostras)
+        self.probe_mode = 'bisect'
+        
+        # Tabela de cores (LUT); sem NumPy valem as regras de is_hp_color/is_mp_color
+        self.color_table = None
+        if NUMPY_AVAILABLE:
+            try:
+                self.color_table = ColorTable.load()
+            except Exception as e:
+                print(f"[SCREEN] Tabela de cores indisponivel: {e}")
+        
+        # Localizacao automatica das barras (precisa de captura + tabela)
+        self.locator = BarLocator(self.color_table) if self.color_table is not None else None
+        self._bars_window = None       # janela quando as barras foram definidas
+        self._last_window_check = 0
+        self._window_check_interval = 0.5
+        
         self.tibia_hwnd = None
         self.window_rect = None
         
@@ -81,6 +161,73 @@ class ScreenReader:
         except:
             return None
     
+    def auto_locate(self, rect=None):
+        """
+        Acha as barras no frame da janela (BarLocator) e define as
+        posicoes. rect: retangulo da janela (padrao: get_window_rect)
+        """
+        if self.locator is None or self.capture is None:
+            return False
+        
+        rect = rect or self.get_window_rect()
+        if not rect:
+            return False
+        
+        try:
+            frame = self.capture.grab(rect)
+        except Exception as e:
+            print(f"[SCREEN] Erro na captura da janela: {e}")
+            return False
+        
+        start = time.perf_counter()
+        bars = self.locator.locate(frame)
+        if not bars.get('hp'):
+            return False
+        
+        self.set_hp_bar(*self._bar_endpoints(bars['hp']))
+        if bars.get('mp'):
+            self.set_mp_bar(*self._bar_endpoints(bars['mp']))
+        self._bars_window = rect
+        print(f"[SCREEN] Barras localizadas em {(time.perf_counter() - start) * 1000:.0f}ms")
+        return True
+    
+    @staticmethod
+    def _bar_endpoints(bar):
+        """(x, y, largura, altura) -> inicio/fim na linha do meio da barra"""
+        x, y, width, height = bar
+        middle = y + height // 2
+        return (x, middle), (x + width - 1, middle)
+    
+    def _check_window(self):
+        """
+        Acompanha a janela: deslocou -> desloca as barras; mudou de
+        tamanho -> localiza de novo (sem achar, as posicoes velhas saem)
+        """
+        rect = self.get_window_rect()
+        if not rect or rect == self._bars_window:
+            return
+        
+        old = self._bars_window
+        if old and (rect[2] - rect[0], rect[3] - rect[1]) == (old[2] - old[0], old[3] - old[1]):
+            dx, dy = rect[0] - old[0], rect[1] - old[1]
+            move = lambda pos: (pos[0] + dx, pos[1] + dy) if pos else pos
+            self.hp_bar_start, self.hp_bar_end = move(self.hp_bar_start), move(self.hp_bar_end)
+            self.mp_bar_start, self.mp_bar_end = move(self.mp_bar_start), move(self.mp_bar_end)
+            self._bars_window = rect
+            return
+        
+        if self.auto_locate(rect):
+            return
+        
+        if old:
+            # Janela mudou de tamanho e as barras nao foram achadas
+            self.hp_bar_start = self.hp_bar_end = None
+            self.mp_bar_start = self.mp_bar_end = None
+            self._bars_window = None
+        elif self.is_configured():
+            # Barras definidas a mao antes de conhecer a janela
+            self._bars_window = rect
+    
     def get_pixel_color(self, x, y):
         """
         Obtem cor de um pixel na tela
@@ -160,9 +307,41 @@ class ScreenReader:
         
         return False
     
-    def calculate_bar_percent(self, start_pos, end_pos, bar_type='hp'):
+    def _bar_rect(self, *bars):
+        """Retangulo (left, top, right, bottom) que cobre as barras dadas"""
+        xs = [x for start, end in bars for x in (start[0], end[0])]
+        ys = [y for start, end in bars for y in (start[1], end[1])]
+        return (min(xs), min(ys), max(xs) + 1, max(ys) + 1)
+    
+    def bar_fill(self, pixels, bar_type='hp'):
+        """
+        Pixels preenchidos de uma linha de barra (ate o ultimo pixel com
+        cor de barra). pixels: array (n, 3) RGB ou lista de (r, g, b)
+        """
+        if NUMPY_AVAILABLE and isinstance(pixels, np.ndarray):
+            if self.color_table is not None:
+                mask = self.color_table.classify(pixels) & (HP if bar_type == 'hp' else MP)
+            else:
+                mask = hp_color_mask(pixels) if bar_type == 'hp' else mp_color_mask(pixels)
+            filled = np.flatnonzero(mask)
+            return int(filled[-1]) + 1 if filled.size else 0
+        
+        is_filled = self._color_test(bar_type)
+        return find_fill_edge(lambda i: is_filled(tuple(pixels[i])), len(pixels))
+    
+    def _color_test(self, bar_type):
+        """funcao(cor) -> bool da barra (tabela de cores se carregada)"""
+        if self.color_table is not None:
+            bit = HP if bar_type == 'hp' else MP
+            flags = self.color_table.flags
+            return lambda color: bool(flags(color) & bit)
+        return self.is_hp_color if bar_type == 'hp' else self.is_mp_color
+    
+    def calculate_bar_percent(self, start_pos, end_pos, bar_type='hp', frame=None):
         """
         Calcula porcentagem da barra
+        
+        frame: Frame ja capturado que contem a barra (senao captura agora)
         """
         if not start_pos or not end_pos:
             return 100
@@ -174,15 +353,39 @@ class ScreenReader:
         if bar_width <= 0:
             return 100
         
+        if frame is None and self.capture is not None:
+            try:
+                frame = self.capture.grab(self._bar_rect((start_pos, end_pos)))
+            except Exception as e:
+                print(f"[SCREEN] Erro na captura: {e}")
+                frame = None
+        
+        if frame is None:
+            if self.probe_mode == 'sampled':
+                return self._calculate_bar_percent_sampled(x1, x2, y, bar_type)
+            return self._calculate_bar_percent_bisect(x1, x2, y, bar_type)
+        
+        # Linha inteira da barra, precisao de 1 pixel
+        pixels = frame.row(y, x1, x2)
+        percent = int(self.bar_fill(pixels, bar_type) * 100 / len(pixels))
+        return max(0, min(100, percent))
+    
+    def _calculate_bar_percent_bisect(self, x1, x2, y, bar_type):
+        """Fallback sem captura: borda do trecho cheio por bissecao (GetPixel)"""
+        is_filled = self._color_test(bar_type)
+        width = x2 - x1 + 1
+        filled = find_fill_edge(lambda i: is_filled(self.get_pixel_color(x1 + i, y)), width)
+        return max(0, min(100, int(filled * 100 / width)))
+    
+    def _calculate_bar_percent_sampled(self, x1, x2, y, bar_type):
+        """Fallback sem captura: 30 amostras com GetPixel"""
+        bar_width = x2 - x1
+        
         # Amostra mais pontos para precisao
         samples = 30
         step = bar_width / samples
         last_filled = 0
         
-        # Debug - mostra primeira e ultima cor
-        first_color = self.get_pixel_color(x1, y)
-        last_color = self.get_pixel_color(x2, y)
-        
         for i in range(samples):
             x = int(x1 + (i * step))
             color = self.get_pixel_color(x, y)
@@ -209,16 +412,34 @@ class ScreenReader:
             
         self._last_update = now
         
+        if now - self._last_window_check >= self._window_check_interval:
+            self._last_window_check = now
+            self._check_window()
+        
+        bars = []
+        if self.hp_bar_start and self.hp_bar_end:
+            bars.append((self.hp_bar_start, self.hp_bar_end))
+        if self.mp_bar_start and self.mp_bar_end:
+            bars.append((self.mp_bar_start, self.mp_bar_end))
+        
+        # Um blit so para as duas barras
+        frame = None
+        if bars and self.capture is not None:
+            try:
+                frame = self.capture.grab(self._bar_rect(*bars))
+            except Exception as e:
+                print(f"[SCREEN] Erro na captura: {e}")
+        
         # Le HP se configurado
         if self.hp_bar_start and self.hp_bar_end:
             self._hp_percent = self.calculate_bar_percent(
-                self.hp_bar_start, self.hp_bar_end, 'hp'
+                self.hp_bar_start, self.hp_bar_end, 'hp', frame
             )
         
         # Le MP se configurado
         if self.mp_bar_start and self.mp_bar_end:
             self._mp_percent = self.calculate_bar_percent(
-                self.mp_bar_start, self.mp_bar_end, 'mp'
+                self.mp_bar_start, self.mp_bar_end, 'mp', frame
             )
     
     def get_hp_percent(self):
@@ -248,6 +469,7 @@ class ScreenReader:
         """
         self.hp_bar_start = start_pos
         self.hp_bar_end = end_pos
+        self._bars_window = self.window_rect
         print(f"[SCREEN] HP Bar: {start_pos} -> {end_pos}")
     
     def set_mp_bar(self, start_pos, end_pos):
@@ -256,4 +478,5 @@ class ScreenReader:
         """
         self.mp_bar_start = start_pos
         self.mp_bar_end = end_pos
+        self._bars_window = self.window_rect
         print(f"[SCREEN] MP Bar: {start_pos} -> {end_pos}")
@@ -7,12 +7,21 @@ Criterios:
 3. MP_MAX diferente de HP_MAX
 4. Valor em HP+0x14 (possivel level) entre 1-2000
 5. Valor em HP+0x14 deve ser DIFERENTE de HP (nao confundir HP com level)
+
+Os criterios sao os mesmos do SmartScanner (memory/vector_scanner.py) e a
+varredura roda em paralelo pelo memory.parallel_scan.
 """
-import pymem
-import struct
-import ctypes
 import time
-from ctypes import wintypes
+
+try:
+    import pymem
+    PYMEM_AVAILABLE = True
+except ImportError:
+    PYMEM_AVAILABLE = False
+
+from memory.parallel_scan import ParallelScanner
+from memory.sources import as_source
+from memory.vector_scanner import NUMPY_AVAILABLE, STRUCT_SPAN, player_kernel
 
 OFFSET_HP_MAX = 0x8
 OFFSET_MP = 0x620
@@ -22,103 +31,31 @@ OFFSET_LEVEL = 0x14  # Possivel offset do level
 MEM_COMMIT = 0x1000
 PAGE_READWRITE = 0x04
 
-class MBI(ctypes.Structure):
-    _fields_ = [
-        ('BaseAddress', ctypes.c_void_p),
-        ('AllocationBase', ctypes.c_void_p),
-        ('AllocationProtect', wintypes.DWORD),
-        ('RegionSize', ctypes.c_size_t),
-        ('State', wintypes.DWORD),
-        ('Protect', wintypes.DWORD),
-        ('Type', wintypes.DWORD),
-    ]
-
-def find_player_v3(pm):
+def find_player_v3(pm, workers=None, progress_callback=None):
     """
     Encontra o player usando multiplos criterios
+    
+    pm: pymem.Pymem conectado ou qualquer MemorySource (dump, /proc/pid/mem)
+    workers: processos/threads da varredura (None = um por nucleo)
+    progress_callback: funcao(percent, message) para reportar progresso
     """
     print('=== SMART SCANNER V3 ===')
     start_time = time.time()
     
-    candidates = []
-    address = 0x100000000
-    mbi = MBI()
-    regions_scanned = 0
+    source = as_source(pm)
     
-    while address < 0x7FFFFFFFFFFF:
-        result = ctypes.windll.kernel32.VirtualQueryEx(
-            pm.process_handle, ctypes.c_void_p(address),
-            ctypes.byref(mbi), ctypes.sizeof(mbi))
-        if result == 0:
-            break
-        
-        if mbi.State == MEM_COMMIT and mbi.Protect == PAGE_READWRITE:
-            if mbi.RegionSize and mbi.RegionSize < 50*1024*1024:
-                try:
-                    data = pm.read_bytes(mbi.BaseAddress, mbi.RegionSize)
-                    regions_scanned += 1
-                    
-                    # Scanear cada 8 bytes (alinhado)
-                    for offset in range(0, len(data) - OFFSET_MP_MAX - 4, 8):
-                        try:
-                            hp = struct.unpack_from('<i', data, offset)[0]
-                            
-                            # Criterio 1: HP no range valido
-                            if not (150 <= hp <= 30000):
-                                continue
-                            
-                            hp_max = struct.unpack_from('<i', data, offset + OFFSET_HP_MAX)[0]
-                            
-                            # Criterio 2: HP == HP_MAX (vida cheia)
-                            if hp != hp_max:
-                                continue
-                            
-                            # Criterio 3: Verificar MP
-                            mp = struct.unpack_from('<i', data, offset + OFFSET_MP)[0]
-                            mp_max = struct.unpack_from('<i', data, offset + OFFSET_MP_MAX)[0]
-                            
-                            # MP_MAX deve ser diferente de HP_MAX
-                            if mp_max == hp_max:
-                                continue
-                            
-                            # MP deve estar no range valido
-                            if not (100 <= mp_max <= 100000):
-                                continue
-                            
-                            # MP deve ser > 0 (player com mana)
-                            if not (1 <= mp <= mp_max):
-                                continue
-                            
-                            # MP_MAX nao deve ser potencia de 2 (valores suspeitos de buffer)
-                            if mp_max in [256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 65792]:
-                                continue
-                            
-                            # Criterio 4: Verificar possivel level
-                            level = struct.unpack_from('<i', data, offset + OFFSET_LEVEL)[0]
-                            
-                            # Level deve ser diferente de HP (senao pode ser falso positivo)
-                            if level == hp:
-                                continue
-                            
-                            # Level deve estar no range 1-2000
-                            if not (1 <= level <= 2000):
-                                continue
-                            
-                            addr = mbi.BaseAddress + offset
-                            candidates.append({
-                                'addr': addr,
-                                'hp': hp,
-                                'hp_max': hp_max,
-                                'mp': mp,
-                                'mp_max': mp_max,
-                                'level': level
-                            })
-                        except:
-                            continue
-                except:
-                    pass
-        
-        address = (mbi.BaseAddress or 0) + (mbi.RegionSize or 0x10000)
+    regions = []
+    for region in source.region_map.regions(0x100000000):
+        if region.state == MEM_COMMIT and region.protect == PAGE_READWRITE:
+            if region.size and region.size < 50*1024*1024:
+                regions.append((region.base, region.size))
+    
+    # Criterios 1-5 aplicados pelo kernel (NumPy -> threads, Python -> processos)
+    scheduler = ParallelScanner(source, workers=workers,
+                                mode="thread" if NUMPY_AVAILABLE else "process")
+    candidates = scheduler.scan(regions, player_kernel(), overlap=STRUCT_SPAN,
+                                progress_callback=progress_callback)
+    regions_scanned = len(regions)
     
     elapsed = time.time() - start_time
     print(f'Regioes escaneadas: {regions_scanned}')